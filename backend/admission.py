@@ -0,0 +1,199 @@
+"""
+Admission Control
+Separate concurrency limits and wait queues for interactive and batch
+endpoints, so whole-book requests cannot starve single-farmer lookups.
+
+Each request class admits up to `concurrency` requests at a time and
+queues up to `queue_size` more in arrival order. A request that finds the
+queue full is shed immediately with 429, and one still queued when its
+class's deadline passes is shed with 503; both carry a Retry-After
+estimated from the class's recent service time and queue depth. The
+deadline bounds time spent waiting for a slot, since work already running
+in the thread pool cannot be interrupted. AdmissionMiddleware (plain ASGI)
+classifies requests by method and path and holds the slot until the
+response, including a streamed one, has been sent.
+"""
+
+import asyncio
+import json
+import math
+import os
+from collections import deque
+from time import perf_counter
+from typing import Optional
+
+from engines.instrumentation import stage
+
+# Weight of the latest request in the service time moving average
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """A request was shed; carries the HTTP status and Retry-After seconds."""
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionClass:
+    """A concurrency limit with a bounded FIFO wait queue and a wait deadline."""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, timeout: float):
+        if concurrency < 1 or queue_size < 0 or timeout <= 0:
+            raise ValueError(f"Invalid admission limits for '{name}'")
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "deadline": 0}
+        self.service_time = 0.0
+        self._waiters = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: the queue ahead drained at the recent service rate."""
+        return max(1, math.ceil(self.service_time * (self.queued + 1) / self.concurrency))
+
+    async def acquire(self) -> None:
+        """Wait for a slot, or raise Overloaded when the queue is full or the deadline passes."""
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected["queue_full"] += 1
+            raise Overloaded(429, self.retry_after(), f"{self.name} queue is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # A slot handed over right at the deadline still counts (wait_for returns)
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.rejected["deadline"] += 1
+            raise Overloaded(503, self.retry_after(), f"{self.name} queue wait exceeded {self.timeout:g}s")
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot that was already handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        self.admitted += 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, seconds: Optional[float] = None) -> None:
+        """Free a slot (handing it to the next waiter), recording how long it was held."""
+        if seconds is not None:
+            self.service_time += SERVICE_TIME_ALPHA * (seconds - self.service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "timeout": self.timeout,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "service_time": round(self.service_time, 4),
+        }
+
+
+def class_from_env(name: str, concurrency: int, queue_size: int, timeout: float) -> AdmissionClass:
+    """An AdmissionClass whose defaults BNPL_<NAME>_CONCURRENCY / _QUEUE / _TIMEOUT override."""
+    prefix = f"BNPL_{name.upper()}_"
+    return AdmissionClass(
+        name,
+        int(os.environ.get(prefix + "CONCURRENCY", concurrency)),
+        int(os.environ.get(prefix + "QUEUE", queue_size)),
+        float(os.environ.get(prefix + "TIMEOUT", timeout)),
+    )
+
+
+class AdmissionController:
+    """
+    Maps requests to admission classes: exact (method, path) routes first
+    (a None class exempts the route), then path prefixes.
+    """
+
+    def __init__(self, classes: list, routes: dict, prefixes: Optional[list] = None):
+        self.classes = {admission.name: admission for admission in classes}
+        self._routes = {key: self.classes[name] if name else None for key, name in routes.items()}
+        self._prefixes = [(prefix, self.classes[name]) for prefix, name in (prefixes or [])]
+
+    def classify(self, method: str, path: str) -> Optional[AdmissionClass]:
+        """The class a request is admitted under, or None if it is not limited."""
+        key = (method, path)
+        if key in self._routes:
+            return self._routes[key]
+        for prefix, admission in self._prefixes:
+            if path.startswith(prefix):
+                return admission
+        return None
+
+    def stats(self) -> dict:
+        return {name: admission.stats() for name, admission in self.classes.items()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting requests through an AdmissionController."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        admission = self.controller.classify(scope["method"], scope["path"])
+        if admission is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            with stage("queue"):
+                await admission.acquire()
+        except Overloaded as exc:
+            await _reject(send, exc)
+            return
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(perf_counter() - started)
+
+
+async def _reject(send, exc: Overloaded) -> None:
+    body = json.dumps({"detail": str(exc)}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": exc.status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(exc.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1 @@
+"""Performance benchmarks for the scoring, matching and explanation engines."""
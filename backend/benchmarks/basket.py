@@ -0,0 +1,110 @@
+"""
+Basket Solver Benchmark
+Measures budget-fitting latency of the greedy and optimal solvers, alone
+and as part of match_products, on synthetic catalogs of increasing size.
+
+Usage (from the backend directory):
+    python -m benchmarks.basket --sizes 100 1000 5000
+"""
+
+import argparse
+import copy
+import random
+import statistics
+import time
+from typing import Optional
+
+from engines.basket import SOLVERS, fit_to_budget
+from engines.product_matching import ProductCatalog, match_products
+
+CATEGORIES = ["seeds", "fertilizer", "pesticide", "irrigation", "equipment"]
+
+
+def synthetic_catalog(size: int, seed: int = 42) -> ProductCatalog:
+    """A catalog of `size` products, all compatible with wheat."""
+    rng = random.Random(seed)
+    products = []
+    for i in range(size):
+        per_hectare = rng.random() < 0.7
+        products.append({
+            "product_id": f"S{i:05d}",
+            "category": rng.choice(CATEGORIES),
+            "name": f"Synthetic product {i}",
+            "unit_price": round(rng.uniform(0.5, 40.0) if per_hectare else rng.uniform(50, 1500), 2),
+            "unit": "kg" if per_hectare else "piece",
+            "compatible_crops": ["wheat"] if rng.random() < 0.6 else ["all"],
+            "quantity_per_hectare": round(rng.uniform(0.5, 20.0), 1) if per_hectare else 0,
+        })
+    return ProductCatalog(products)
+
+
+FARMER = {
+    "farmer_id": "BENCH",
+    "crop_type": "wheat",
+    "farm_size_hectares": 12,
+    "years_experience": 8,
+    "requested_amount": 5000,
+    "requested_products": CATEGORIES,
+}
+
+
+def _percentiles(timings: list) -> tuple:
+    timings = sorted(timings)
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+
+def bench(catalog: ProductCatalog, solver: str, repeat: int) -> dict:
+    # Unbounded budget returns every candidate, sorted, before trimming
+    unbounded = {**FARMER, "requested_amount": float("inf")}
+    candidates = match_products(unbounded, float("inf"), catalog=catalog)["recommendations"]
+
+    solve_timings = []
+    for _ in range(repeat):
+        recs = copy.deepcopy(candidates)
+        started = time.perf_counter()
+        _, total_cost, solver_used = fit_to_budget(recs, 5000, solver)
+        solve_timings.append((time.perf_counter() - started) * 1000)
+
+    match_timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        match_products(FARMER, 5000, catalog=catalog, solver=solver)
+        match_timings.append((time.perf_counter() - started) * 1000)
+
+    solve_p50, solve_p99 = _percentiles(solve_timings)
+    match_p50, match_p99 = _percentiles(match_timings)
+    return {
+        "candidates": len(candidates),
+        "solve_p50_ms": solve_p50,
+        "solve_p99_ms": solve_p99,
+        "match_p50_ms": match_p50,
+        "match_p99_ms": match_p99,
+        "solver_used": solver_used,
+        "total_cost": total_cost,
+    }
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.basket")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 2000, 5000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'SKUs':>6}  {'solver':<8} {'solve p50':>10} {'solve p99':>10} "
+        f"{'match p50':>10} {'match p99':>10}  {'used':<16} {'cost':>6}"
+    )
+    for size in args.sizes:
+        catalog = synthetic_catalog(size)
+        for solver in SOLVERS:
+            r = bench(catalog, solver, args.repeat)
+            print(
+                f"{size:>6}  {solver:<8} {r['solve_p50_ms']:>10.2f} {r['solve_p99_ms']:>10.2f} "
+                f"{r['match_p50_ms']:>10.2f} {r['match_p99_ms']:>10.2f}  "
+                f"{r['solver_used']:<16} {r['total_cost']:>6}"
+            )
+    print("(all timings in ms)")
+
+
+if __name__ == "__main__":
+    main()
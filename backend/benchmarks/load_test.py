@@ -0,0 +1,173 @@
+"""
+HTTP Load Test
+Drives the API with many concurrent keep-alive connections and reports
+requests/sec and latency percentiles per endpoint.
+
+Uses only the standard library (asyncio streams, HTTP/1.1), so it can be
+pointed at any running server. Without --url it starts `uvicorn main:app`
+on a free local port for the duration of the run.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --concurrency 200 --duration 10
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --path /api/v1/dashboard/F001
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    "/api/v1/dashboard/F001",
+    "/api/v1/risk-score/F007",
+    "/api/v1/product-match/F013",
+    "/api/v1/farmers/F003",
+]
+
+
+async def _request(reader, writer, host: str, path: str) -> int:
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode())
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value.strip())
+    if length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _worker(host: str, port: int, paths: list, deadline: float, samples: dict, errors: list) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                status = await _request(reader, writer, host, path)
+            except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                errors.append(str(exc))
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            elapsed = time.perf_counter() - started
+            if status >= 400:
+                errors.append(f"HTTP {status} for {path}")
+            samples.setdefault(path, []).append(elapsed)
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def summarize(samples: dict, duration: float) -> dict:
+    report = {}
+    everything = sorted(v for values in samples.values() for v in values)
+    for path, values in list(samples.items()) + [("ALL", everything)]:
+        values = sorted(values)
+        report[path] = {
+            "requests": len(values),
+            "rps": round(len(values) / duration, 1),
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 0.99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+        }
+    return report
+
+
+async def run_load(url: str, paths: list, concurrency: int, duration: float) -> dict:
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    samples, errors = {}, []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(host, port, paths, deadline, samples, errors) for _ in range(concurrency)
+    ))
+    report = summarize(samples, time.perf_counter() - started)
+    report["ALL"]["errors"] = len(errors)
+    return report
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir,
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test")
+    parser.add_argument("--url", help="base URL of a running server (default: start one)")
+    parser.add_argument("--path", action="append", help="endpoint path to hit (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        server = _start_server(port)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        # Warm up caches before measuring
+        asyncio.run(run_load(url, args.path or DEFAULT_PATHS, 4, 0.5))
+        report = asyncio.run(run_load(url, args.path or DEFAULT_PATHS, args.concurrency, args.duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'path':<32} {'reqs':>8} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for path, row in report.items():
+        print(
+            f"{path:<32} {row['requests']:>8} {row['rps']:>9} {row['p50_ms']:>8} "
+            f"{row['p95_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8}"
+        )
+    print(f"errors: {report['ALL']['errors']}  (latencies in ms, concurrency {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Farmer Record Benchmark
+Compares memory per farmer and scoring throughput of plain farmer dicts
+(as parsed from JSON) against compact FarmerRecords.
+
+Usage (from the backend directory):
+    python -m benchmarks.records --farmers 200000
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Optional
+
+from benchmarks.synthetic import synthetic_farmers
+from engines.batch_scoring import score_batch
+from engines.records import records_frame, to_records
+from engines.scoring import calculate_risk_score
+
+
+def synthetic_book_json(size: int, seed: int = 42) -> str:
+    """JSON for `size` synthetic farmers."""
+    return json.dumps(list(synthetic_farmers(size, seed)))
+
+
+def _measure(build) -> tuple:
+    """(object, bytes retained by it) for the object returned by build()."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return obj, retained
+
+
+def _throughput(fn, items: list) -> float:
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - started)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.records")
+    parser.add_argument("--farmers", type=int, default=200000)
+    parser.add_argument("--sample", type=int, default=20000, help="Farmers scored one at a time")
+    args = parser.parse_args(argv)
+
+    payload = synthetic_book_json(args.farmers)
+    dicts, dict_bytes = _measure(lambda: json.loads(payload))
+    records, record_bytes = _measure(lambda: to_records(json.loads(payload)))
+
+    sample = min(args.sample, args.farmers)
+    dict_rate = _throughput(calculate_risk_score, dicts[:sample])
+    record_rate = _throughput(calculate_risk_score, records[:sample])
+
+    started = time.perf_counter()
+    score_batch(dicts)
+    dict_batch = args.farmers / (time.perf_counter() - started)
+    started = time.perf_counter()
+    score_batch(records_frame(records))
+    record_batch = args.farmers / (time.perf_counter() - started)
+
+    print(f"{args.farmers} farmers")
+    print(f"{'':<14} {'bytes/farmer':>13} {'scalar/s':>10} {'batch/s':>12}")
+    print(f"{'dict':<14} {dict_bytes / args.farmers:>13.0f} {dict_rate:>10.0f} {dict_batch:>12.0f}")
+    print(f"{'FarmerRecord':<14} {record_bytes / args.farmers:>13.0f} {record_rate:>10.0f} {record_batch:>12.0f}")
+    print(f"memory saved: {1 - record_bytes / dict_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
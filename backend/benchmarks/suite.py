@@ -0,0 +1,409 @@
+"""
+Benchmark Suite
+Times the scoring, matching and explanation engines and the main HTTP
+endpoints with one harness, and gates regressions against a baseline.
+
+Every case is timed call by call and reports ops/sec, latency percentiles
+and the peak memory traced while it runs (measured in a separate pass,
+since tracemalloc slows the timed one down). Engine cases run on
+synthetic farmers from benchmarks.synthetic; the batch case scores a
+whole synthetic book per call (ops are rows), as does the bulk dashboard
+case per farmer in the request. HTTP cases call the FastAPI
+app in-process through its ASGI interface, so they cover routing,
+caching and encoding without sockets. The app serves a synthetic book
+(--http-rows) with the score store off, and each per-farmer endpoint is
+timed twice: "[miss]" clears the result cache before every (untimed)
+request, so it measures scoring, matching and explanation cost, and
+"[hit]" repeats requests for farmers already cached.
+
+A run saved with --save can be compared with --compare: a case whose
+ops/sec falls more than --threshold below the baseline fails the run
+(exit status 1). Timings only compare on the same machine, so save the
+baseline from the base branch and compare the change in the same job.
+
+Usage (from the backend directory):
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.2
+    python -m benchmarks.suite --only scoring --rows 100000 --batch-rows 1000000
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, NamedTuple, Optional
+
+from benchmarks.synthetic import synthetic_farmers, synthetic_products
+
+DEFAULT_THRESHOLD = 0.15
+
+# Per-farmer endpoints, timed with and without result cache hits
+HTTP_FARMER_PATHS = {
+    "http.risk_score": "/api/v1/risk-score/{farmer_id}",
+    "http.product_match": "/api/v1/product-match/{farmer_id}",
+    "http.explain": "/api/v1/risk-score/{farmer_id}/explain",
+    "http.dashboard": "/api/v1/dashboard/{farmer_id}",
+}
+HTTP_LIST_PATHS = {
+    "http.farmers": "/api/v1/farmers?limit=100",
+    "http.summary": "/api/v1/dashboard/all/summary?limit=100",
+}
+BULK_DASHBOARD_IDS = 50
+# Distinct farmers the [hit] cases cycle through (all cached up front)
+HIT_SET_SIZE = 1000
+
+
+class Case(NamedTuple):
+    name: str
+    # args -> (function, list of argument tuples, rows per call[, untimed
+    # callable run before every call])
+    setup: Callable[[argparse.Namespace], tuple]
+
+
+def _farmers(args: argparse.Namespace) -> list:
+    return list(synthetic_farmers(args.rows, args.seed))
+
+
+def _setup_risk_score(args):
+    from engines.scoring import calculate_risk_score
+    return calculate_risk_score, [(farmer,) for farmer in _farmers(args)], 1
+
+
+def _setup_history_score(args):
+    from engines.scoring import calculate_bnpl_history_score
+    items = [(f["previous_bnpl_count"], f["previous_bnpl_status"]) for f in _farmers(args)]
+    return calculate_bnpl_history_score, items, 1
+
+
+def _setup_match_products(args):
+    from engines.product_matching import ProductCatalog, get_catalog, match_products
+    from engines.scoring import calculate_risk_score
+    catalog = ProductCatalog(synthetic_products(args.products, args.seed)) if args.products else get_catalog()
+    farmers = _farmers(args)[:args.calls]
+    items = [(farmer, calculate_risk_score(farmer)["bnpl_limit"]) for farmer in farmers]
+    return lambda farmer, limit: match_products(farmer, limit, catalog=catalog), items, 1
+
+
+def _setup_explanation(detail: str):
+    def setup(args):
+        from engines.explainability import generate_explanation
+        from engines.scoring import calculate_risk_score
+        farmers = _farmers(args)
+        items = [(farmer, calculate_risk_score(farmer)) for farmer in farmers]
+        return lambda farmer, score: generate_explanation(farmer, score, detail=detail), items, 1
+    return setup
+
+
+def _setup_score_batch(args):
+    import pandas as pd
+    from engines.batch_scoring import score_batch
+    frame = pd.DataFrame(list(synthetic_farmers(args.batch_rows, args.seed)))
+    return score_batch, [(frame,)], len(frame)
+
+
+class _InProcessClient:
+    """Sends requests to the app through ASGI, with its lifespan entered."""
+
+    def __init__(self, rows: int, seed: int):
+        # Keep the benchmark hermetic: no on-disk score store, and a
+        # synthetic book large enough that misses really are misses
+        os.environ.setdefault("BNPL_SCORE_STORE", "")
+        book = tempfile.NamedTemporaryFile("w", suffix=".json", encoding="utf-8", delete=False)
+        with book:
+            json.dump(list(synthetic_farmers(rows, seed)), book)
+        self._book = book.name
+        os.environ["BNPL_FARMERS_PATH"] = self._book
+        import main
+        self.app = main.app
+        self.result_cache = main.result_cache
+        self._runner = asyncio.Runner()
+        self._lifespan = self.app.router.lifespan_context(self.app)
+        self._runner.run(self._lifespan.__aenter__())
+        self.farmer_ids = [farmer["farmer_id"] for farmer in main.farmer_repository.all()]
+
+    async def _request(self, method: str, path: str, body: bytes = b"") -> int:
+        path, _, query = path.partition("?")
+        headers = [(b"host", b"benchmark")]
+        if body:
+            headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("benchmark", 80),
+        }
+        status = 0
+
+        async def receive() -> dict:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(scope, receive, send)
+        return status
+
+    def get(self, path: str) -> None:
+        status = self._runner.run(self._request("GET", path))
+        if status != 200:
+            raise RuntimeError(f"GET {path} returned {status}")
+
+    def post(self, path: str, content) -> None:
+        status = self._runner.run(self._request("POST", path, json.dumps(content).encode("utf-8")))
+        if status != 200:
+            raise RuntimeError(f"POST {path} returned {status}")
+
+    def close(self) -> None:
+        self._runner.run(self._lifespan.__aexit__(None, None, None))
+        self._runner.close()
+        os.remove(self._book)
+
+
+_client = None
+
+
+def _http_client(args: argparse.Namespace) -> _InProcessClient:
+    global _client
+    if _client is None:
+        _client = _InProcessClient(args.http_rows, args.seed)
+    return _client
+
+
+def _http_farmer_ids(client: _InProcessClient, cached: bool) -> list:
+    """Farmers for a [hit] case (a small set, cached here) or a [miss] case (the whole book)."""
+    ids = client.farmer_ids
+    if not cached:
+        return ids
+    return ids[:HIT_SET_SIZE]
+
+
+def _setup_http(template: str, cached: bool):
+    def setup(args):
+        client = _http_client(args)
+        ids = _http_farmer_ids(client, cached)
+        paths = [template.format(farmer_id=ids[i % len(ids)]) for i in range(args.requests)]
+        if cached:
+            for path in paths[:len(ids)]:
+                client.get(path)
+            return client.get, [(path,) for path in paths], 1
+        return client.get, [(path,) for path in paths], 1, client.result_cache.clear
+    return setup
+
+
+def _setup_http_list(template: str):
+    def setup(args):
+        client = _http_client(args)
+        return client.get, [(template,)] * args.requests, 1
+    return setup
+
+
+def _setup_http_bulk_dashboard(cached: bool):
+    def setup(args):
+        client = _http_client(args)
+        ids = _http_farmer_ids(client, cached)
+        items = [
+            ({"farmer_ids": [ids[(i * BULK_DASHBOARD_IDS + j) % len(ids)] for j in range(BULK_DASHBOARD_IDS)]},)
+            for i in range(args.requests // BULK_DASHBOARD_IDS)
+        ]
+
+        def post(content):
+            client.post("/api/v1/dashboard/bulk", content)
+
+        if cached:
+            for content, in items:
+                post(content)
+            return post, items, BULK_DASHBOARD_IDS
+        return post, items, BULK_DASHBOARD_IDS, client.result_cache.clear
+    return setup
+
+
+CASES = [
+    Case("scoring.calculate_risk_score", _setup_risk_score),
+    Case("scoring.calculate_bnpl_history_score", _setup_history_score),
+    Case("product_matching.match_products", _setup_match_products),
+    Case("explainability.generate_explanation", _setup_explanation("full")),
+    Case("explainability.generate_explanation[compact]", _setup_explanation("compact")),
+    Case("batch_scoring.score_batch", _setup_score_batch),
+] + [
+    Case(f"{name}[{kind}]", _setup_http(path, kind == "hit"))
+    for name, path in HTTP_FARMER_PATHS.items()
+    for kind in ("miss", "hit")
+] + [Case(name, _setup_http_list(path)) for name, path in HTTP_LIST_PATHS.items()] + [
+    Case(f"http.dashboard_bulk[{kind}]", _setup_http_bulk_dashboard(kind == "hit")) for kind in ("miss", "hit")
+]
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def _timed_run(fn, items: list, before: Optional[Callable] = None) -> list:
+    timings = []
+    append = timings.append
+    clock = time.perf_counter_ns
+    for item in items:
+        if before is not None:
+            before()
+        started = clock()
+        fn(*item)
+        append(clock() - started)
+    return timings
+
+
+def _peak_memory(fn, items: list, before: Optional[Callable] = None) -> int:
+    """Peak bytes allocated (beyond what was live before) while running `items`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        for item in items:
+            if before is not None:
+                before()
+            fn(*item)
+        return tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(case: Case, args: argparse.Namespace) -> dict:
+    """Time one case: best of `args.repeat` runs, then a traced pass for memory."""
+    fn, items, rows_per_call, *hooks = case.setup(args)
+    before = hooks[0] if hooks else None
+    for item in items[:args.warmup]:
+        if before is not None:
+            before()
+        fn(*item)
+
+    best = None
+    for _ in range(args.repeat):
+        gc.collect()
+        timings = _timed_run(fn, items, before)
+        if best is None or sum(timings) < sum(best):
+            best = timings
+
+    best.sort()
+    total_seconds = sum(best) / 1e9
+    return {
+        "calls": len(best),
+        "ops_per_sec": round(len(best) * rows_per_call / total_seconds, 1),
+        "p50_us": round(_percentile(best, 0.50) / 1000, 2),
+        "p95_us": round(_percentile(best, 0.95) / 1000, 2),
+        "p99_us": round(_percentile(best, 0.99) / 1000, 2),
+        "peak_kib": round(_peak_memory(fn, items[:args.memory_calls], before) / 1024, 1),
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Names of the cases whose ops/sec fell more than `threshold` below the baseline."""
+    regressions = []
+    for name, row in report["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        row["baseline_ops_per_sec"] = base["ops_per_sec"]
+        row["change"] = round(row["ops_per_sec"] / base["ops_per_sec"] - 1, 4)
+        if row["change"] < -threshold:
+            regressions.append(name)
+    return regressions
+
+
+def _print_report(report: dict) -> None:
+    print(
+        f"{'case':<46} {'calls':>7} {'ops/s':>12} {'p50 us':>9} {'p95 us':>9} "
+        f"{'p99 us':>9} {'peak KiB':>10} {'vs base':>8}"
+    )
+    for name, row in report["cases"].items():
+        change = f"{row['change']:+.1%}" if "change" in row else ""
+        print(
+            f"{name:<46} {row['calls']:>7} {row['ops_per_sec']:>12.1f} {row['p50_us']:>9.2f} "
+            f"{row['p95_us']:>9.2f} {row['p99_us']:>9.2f} {row['peak_kib']:>10.1f} {change:>8}"
+        )
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--only", nargs="+", help="run cases whose name contains any of these")
+    parser.add_argument("--rows", type=int, default=20000, help="farmers per engine case")
+    parser.add_argument("--calls", type=int, default=5000, help="farmers for match_products")
+    parser.add_argument("--batch-rows", type=int, default=100000, help="farmers per score_batch call")
+    parser.add_argument("--products", type=int, default=0, help="synthetic catalog size (0: bundled)")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per HTTP case")
+    parser.add_argument("--http-rows", type=int, default=20000, help="synthetic farmers served to HTTP cases")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--memory-calls", type=int, default=1000, help="calls traced for peak memory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", metavar="PATH", help="write the report as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to gate against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed ops/sec drop vs the baseline (fraction)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    cases = [c for c in CASES if not args.only or any(pattern in c.name for pattern in args.only)]
+    config = {
+        key: getattr(args, key)
+        for key in ("rows", "calls", "batch_rows", "products", "requests", "http_rows", "seed")
+    }
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "node": platform.node(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "config": config,
+        },
+        "cases": {},
+    }
+    try:
+        for case in cases:
+            report["cases"][case.name] = run_case(case, args)
+    finally:
+        if _client is not None:
+            _client.close()
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("config") != config:
+            print(f"warning: baseline was run with {baseline['meta'].get('config')}", file=sys.stderr)
+        regressions = compare(report, baseline, args.threshold)
+        report["regressions"] = regressions
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+        if args.compare:
+            if regressions:
+                print(f"REGRESSION (> {args.threshold:.0%} slower): {', '.join(regressions)}")
+            else:
+                print(f"no regressions beyond {args.threshold:.0%}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Synthetic Data Generator
+Deterministic farmer and product generators for benchmarks, scaling to
+millions of rows.
+
+Farmers draw their enum-like fields (region, farm type, crop, BNPL status,
+volatility) from the vocabulary of the bundled dataset and the scoring
+model's lookup tables, with independent numeric fields, so every scoring
+branch is exercised. Products are spread over the bundled catalog's
+categories and crops. Both are generators: a 10^6-row book can be
+streamed to disk without being held in memory.
+
+Usage (from the backend directory):
+    python -m benchmarks.synthetic --farmers 1000000 -o book.ndjson
+    python -m benchmarks.synthetic --products 5000 -o products.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Iterator, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+_vocabulary = None
+
+
+def vocabulary() -> dict:
+    """Distinct values of the enum-like fields, from the bundled data."""
+    global _vocabulary
+    if _vocabulary is None:
+        with open(os.path.join(DATA_DIR, "farmers.json"), "r", encoding="utf-8") as f:
+            farmers = json.load(f)
+        with open(os.path.join(DATA_DIR, "products.json"), "r", encoding="utf-8") as f:
+            products = json.load(f)
+        with open(os.path.join(DATA_DIR, "models", "scoring_model.json"), "r", encoding="utf-8") as f:
+            tables = json.load(f)["tables"]
+
+        def values(field: str, table: Optional[str] = None) -> list:
+            found = {farmer[field] for farmer in farmers}
+            if table:
+                found |= set(tables[table]["values"])
+            return sorted(found)
+
+        _vocabulary = {
+            "region": values("region", "region"),
+            "farm_type": values("farm_type", "farm_type"),
+            "crop_type": values("crop_type"),
+            "previous_bnpl_status": values("previous_bnpl_status"),
+            "seasonal_revenue_volatility": values("seasonal_revenue_volatility", "volatility"),
+            "names": sorted({farmer["name"] for farmer in farmers}),
+            "category": sorted({product["category"] for product in products}),
+        }
+    return _vocabulary
+
+
+def synthetic_farmers(count: int, seed: int = 42, start: int = 0) -> Iterator[dict]:
+    """`count` farmer profiles with ids S0000000, S0000001, ... from `start`."""
+    vocab = vocabulary()
+    rng = random.Random(seed)
+    choice = rng.choice
+    randint = rng.randint
+    for i in range(start, start + count):
+        bnpl_count = randint(0, 8)
+        status = "no_history" if bnpl_count == 0 else choice(vocab["previous_bnpl_status"])
+        yield {
+            "farmer_id": f"S{i:07d}",
+            "name": choice(vocab["names"]),
+            "region": choice(vocab["region"]),
+            "farm_type": choice(vocab["farm_type"]),
+            "crop_type": choice(vocab["crop_type"]),
+            "farm_size_hectares": randint(1, 200),
+            "years_experience": randint(0, 35),
+            "previous_bnpl_count": bnpl_count,
+            "previous_bnpl_status": status,
+            "average_monthly_revenue": randint(200, 9000),
+            "seasonal_revenue_volatility": choice(vocab["seasonal_revenue_volatility"]),
+            "land_ownership": rng.random() < 0.6,
+            "has_irrigation": rng.random() < 0.5,
+            "has_bank_loan": rng.random() < 0.3,
+            "requested_amount": randint(5, 150) * 100,
+            "requested_products": rng.sample(vocab["category"], randint(1, 3)),
+        }
+
+
+def synthetic_products(count: int, seed: int = 42) -> list:
+    """`count` catalog products over the bundled categories and crops."""
+    vocab = vocabulary()
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        per_hectare = rng.random() < 0.7
+        crops = ["all"] if rng.random() < 0.2 else rng.sample(vocab["crop_type"], rng.randint(1, 3))
+        products.append({
+            "product_id": f"SP{i:06d}",
+            "category": rng.choice(vocab["category"]),
+            "name": f"Synthetic product {i}",
+            "name_az": f"Sintetik məhsul {i}",
+            "unit_price": round(rng.uniform(0.5, 40.0) if per_hectare else rng.uniform(50, 1500), 2),
+            "unit": "kg" if per_hectare else "piece",
+            "compatible_crops": crops,
+            "quantity_per_hectare": round(rng.uniform(0.5, 20.0), 1) if per_hectare else 0,
+        })
+    return products
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.synthetic")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--farmers", type=int, help="write this many farmers as NDJSON")
+    group.add_argument("--products", type=int, help="write this many products as a JSON array")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.farmers is not None:
+            for farmer in synthetic_farmers(args.farmers, args.seed):
+                out.write(json.dumps(farmer, ensure_ascii=False))
+                out.write("\n")
+        else:
+            json.dump(synthetic_products(args.products, args.seed), out, ensure_ascii=False, indent=2)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
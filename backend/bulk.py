@@ -0,0 +1,93 @@
+"""
+Bulk Scoring Streams
+Parses uploaded NDJSON / CSV farmer rows and yields NDJSON score results
+chunk by chunk, so neither the upload nor the response is held in memory.
+"""
+
+import codecs
+import csv
+import json
+from typing import Iterator
+
+from pydantic import BaseModel, ValidationError
+
+from engines.batch_scoring import score_batch, to_score_results
+from responses import dumps
+
+STREAM_CHUNK_SIZE = 5000
+
+
+def iter_ndjson_rows(fileobj) -> Iterator[tuple]:
+    """
+    Yield (line_number, row_or_error) for each non-blank line of a binary
+    NDJSON file. Lines that are not UTF-8 or not JSON yield the error.
+    """
+    for line_no, raw in enumerate(fileobj, start=1):
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            yield line_no, exc
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, exc
+
+
+def iter_csv_rows(fileobj) -> Iterator[tuple]:
+    """
+    Yield (line_number, row) for each record of a binary CSV file; the
+    header is line 1 and a record spanning lines reports its last one.
+    Invalid UTF-8 is replaced (U+FFFD), so it fails validation per row.
+    """
+    reader = csv.DictReader(codecs.getreader("utf-8")(fileobj, errors="replace"))
+    for row in reader:
+        # Empty cells fall back to the model defaults
+        yield reader.line_num, {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def _encode(record: dict) -> bytes:
+    return dumps(record) + b"\n"
+
+
+def _score_chunk(pending: list) -> bytes:
+    """Score the valid rows of `pending` and encode every row in input order."""
+    farmers = [farmer for _, farmer, _ in pending if farmer is not None]
+    results = iter(to_score_results(score_batch(farmers)) if farmers else ())
+    return b"".join(
+        _encode({"line": line_no, "error": error} if farmer is None else {"line": line_no, **next(results)})
+        for line_no, farmer, error in pending
+    )
+
+
+def stream_scores(
+    rows: Iterator[tuple],
+    model: type[BaseModel],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Validate rows against `model`, score them in chunks and yield NDJSON.
+
+    Every output record carries the input `line` it answers and records
+    come out in input order. Invalid rows do not abort the stream; they
+    are reported in place as {"line": n, "error": "..."} records.
+    """
+    pending = []  # (line_no, farmer or None, error or None)
+    for line_no, row in rows:
+        if isinstance(row, Exception):
+            kind = "UTF-8" if isinstance(row, UnicodeDecodeError) else "JSON"
+            pending.append((line_no, None, f"Invalid {kind}: {row}"))
+        else:
+            try:
+                pending.append((line_no, model.model_validate(row).model_dump(), None))
+            except ValidationError as exc:
+                pending.append((line_no, None, str(exc)))
+
+        if len(pending) >= chunk_size:
+            yield _score_chunk(pending)
+            pending = []
+
+    if pending:
+        yield _score_chunk(pending)
@@ -0,0 +1,118 @@
+"""
+Result Cache
+Memoizes per-farmer engine results (risk score, product match,
+explanation) so repeated dashboard views are served without recomputation.
+
+Entries are keyed by farmer_id and carry a fingerprint made of a content
+hash of the farmer profile plus the scoring model version; a lookup with a
+different fingerprint is a miss. Entries are evicted least-recently-used
+beyond `maxsize` and expire after `ttl` seconds.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Optional
+
+from engines.model import get_active_model
+
+
+def _jsonable(value):
+    # Mappings that are not dicts (FarmerRecord) hash like the equivalent dict
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def content_hash(record) -> str:
+    """Stable content hash of a JSON-serializable record (any Mapping hashes like its dict)."""
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), default=_jsonable)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def profile_fingerprint(farmer: dict) -> str:
+    """Content hash of a farmer profile combined with the active model version."""
+    return f"{content_hash(farmer)}:{get_active_model().version}"
+
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache of per-farmer result entries."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._part_counts = {}  # part -> [hits, misses]
+        self._entries = OrderedDict()  # farmer_id -> (fingerprint, expires_at, parts)
+        self._lock = threading.Lock()
+
+    def entry(self, farmer: dict) -> dict:
+        """
+        The mutable dict of cached result parts for this farmer version.
+        A fresh empty dict replaces any stale or expired entry.
+        """
+        return self._lookup(farmer)
+
+    def _lookup(self, farmer: dict, part: Optional[str] = None, count_miss: bool = False) -> dict:
+        """
+        entry(), counting a hit or miss on `part` under the same lock (a miss
+        only when `count_miss` is set).
+        """
+        farmer_id = farmer["farmer_id"]
+        fingerprint = profile_fingerprint(farmer)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(farmer_id)
+            if cached is not None and cached[0] == fingerprint and cached[1] > now:
+                self._entries.move_to_end(farmer_id)
+                parts = cached[2]
+            else:
+                parts = {}
+                self._entries[farmer_id] = (fingerprint, now + self.ttl, parts)
+                self._entries.move_to_end(farmer_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            if part is not None:
+                if part in parts:
+                    self.hits += 1
+                    self._part_counts.setdefault(part, [0, 0])[0] += 1
+                elif count_miss:
+                    self.misses += 1
+                    self._part_counts.setdefault(part, [0, 0])[1] += 1
+            return parts
+
+    def get(self, farmer: dict, part: str):
+        """The cached `part` for this farmer, or None (a miss is not counted)."""
+        return self._lookup(farmer, part).get(part)
+
+    def get_or_compute(self, farmer: dict, part: str, compute: Callable[[], object]):
+        """Return the cached `part` for this farmer, computing it on a miss."""
+        parts = self._lookup(farmer, part, count_miss=True)
+        if part in parts:
+            return parts[part]
+        value = compute()
+        parts[part] = value
+        return value
+
+    def part_stats(self) -> dict:
+        """part -> (hits, misses) since startup."""
+        with self._lock:
+            return {part: tuple(counts) for part, counts in self._part_counts.items()}
+
+    def invalidate(self, farmer_id: Optional[str] = None) -> None:
+        """Drop one farmer's entry, or everything when no id is given."""
+        with self._lock:
+            if farmer_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(farmer_id, None)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._entries)
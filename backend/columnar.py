@@ -0,0 +1,491 @@
+"""
+Columnar Dataset Files
+A compact, column-oriented binary encoding of the farmer dataset that
+server processes memory-map instead of parsing.
+
+compile_file() converts farmers.json (or NDJSON) once; ColumnarTable opens
+the result read-only with mmap. Numeric and boolean columns are NumPy
+views straight onto the mapping, enum-like strings (region, crop type,
+status...) are dictionary codes, free text is an offsets + UTF-8 blob
+pair, and a sorted farmer_id index answers lookups by binary search.
+compile_file() also stores each row's content hash (cache.content_hash),
+so change detection downstream compares hashes instead of keeping
+decoded rows around.
+Because the mapping is file-backed and never written, every worker that
+opens the same file shares its pages through the OS page cache: N workers
+cost one copy of the data. Rows are materialized as plain dicts only when
+they are accessed.
+
+File layout: MAGIC, an 8-byte little-endian header length, a JSON header
+(row count, columns, buffer offsets) and the buffers, each 64-byte aligned.
+
+Usage (from the backend directory):
+    python -m columnar data/farmers.json -o data/farmers.bnplcol
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+
+MAGIC = b"BNPLCOL1"
+FORMAT_VERSION = 1
+ALIGN = 64
+COLUMNAR_SUFFIX = ".bnplcol"
+CHUNK_ROWS = 4096
+
+# A string column becomes a dictionary-coded category when it repeats enough
+MAX_CATEGORIES = 65535
+CATEGORY_RATIO = 0.5
+
+_MISSING = object()
+
+
+def _code_dtype(count: int) -> str:
+    return "<u1" if count <= 0xFF else "<u2" if count <= 0xFFFF else "<u4"
+
+
+def _infer_kind(values: list) -> str:
+    present = [v for v in values if v is not _MISSING]
+    if all(isinstance(v, bool) for v in present):
+        return "bool"
+    if all(isinstance(v, int) and not isinstance(v, bool) and -2**63 <= v < 2**63 for v in present):
+        return "int"
+    if all(isinstance(v, float) for v in present):
+        return "float"
+    if all(v is None or isinstance(v, str) for v in present):
+        distinct = len(set(present))
+        if distinct <= MAX_CATEGORIES and distinct <= max(1, len(present) * CATEGORY_RATIO):
+            return "category"
+        if all(isinstance(v, str) for v in present):
+            return "string"
+    if all(isinstance(v, list) and all(isinstance(item, str) for item in v) for v in present):
+        return "category_list"
+    return "json"
+
+
+def _blob(encoded: list) -> tuple:
+    """(uint64 offsets, concatenated bytes) for a list of byte strings."""
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def _encode_column(values: list, kind: str) -> tuple:
+    """(buffers {name: ndarray or bytes}, header extras) for one column."""
+    present = [v for v in values if v is not _MISSING]
+    fill = {"bool": False, "int": 0, "float": 0.0}.get(kind)
+    dense = [fill if v is _MISSING else v for v in values]
+    if kind == "bool":
+        return {"values": np.array(dense, dtype="<u1")}, {}
+    if kind == "int":
+        return {"values": np.array(dense, dtype="<i8")}, {}
+    if kind == "float":
+        return {"values": np.array(dense, dtype="<f8")}, {}
+    if kind == "category":
+        categories = sorted(set(present), key=lambda v: (v is None, v or ""))
+        codes = {value: code for code, value in enumerate(categories)}
+        array = np.array([codes.get(v, 0) for v in values], dtype=_code_dtype(len(categories)))
+        return {"codes": array}, {"categories": categories}
+    if kind == "category_list":
+        categories = sorted({item for v in present for item in v})
+        codes = {value: code for code, value in enumerate(categories)}
+        lengths = [0 if v is _MISSING else len(v) for v in values]
+        offsets = np.zeros(len(values) + 1, dtype="<u8")
+        np.cumsum(lengths, out=offsets[1:])
+        flat = np.array(
+            [codes[item] for v in present for item in v], dtype=_code_dtype(len(categories))
+        )
+        return {"offsets": offsets, "codes": flat}, {"categories": categories}
+    if kind == "string":
+        offsets, data = _blob([b"" if v is _MISSING else v.encode("utf-8") for v in values])
+        return {"offsets": offsets, "data": data}, {}
+    encoded = [b"" if v is _MISSING else json.dumps(v, ensure_ascii=False).encode("utf-8") for v in values]
+    offsets, data = _blob(encoded)
+    return {"offsets": offsets, "data": data}, {}
+
+
+def write_table(
+    records: list,
+    path: str,
+    key: str = "farmer_id",
+    source: Optional[dict] = None,
+    fingerprint: Optional[Callable[[dict], str]] = None,
+) -> dict:
+    """
+    Write `records` (dicts) to `path` in the columnar format, atomically.
+    `key` must be a unique string field; `source` is stored in the header
+    (compile_file records the source file's mtime and size there) and
+    `fingerprint(record)`, if given, is stored per row. Returns the header.
+    """
+    fields = []
+    seen = set()
+    for record in records:
+        for name in record:
+            if name not in seen:
+                seen.add(name)
+                fields.append(name)
+    if records and key not in seen:
+        raise ValueError(f"Records have no '{key}' field")
+
+    buffers = []  # (bytes-like, dtype or None)
+    columns = []
+
+    def add_buffer(data) -> list:
+        if isinstance(data, np.ndarray):
+            buffers.append((data.tobytes(), data.dtype.str))
+            return [len(buffers) - 1, data.dtype.str, len(data)]
+        buffers.append((data, None))
+        return [len(buffers) - 1, None, len(data)]
+
+    for name in fields:
+        values = [record.get(name, _MISSING) for record in records]
+        kind = _infer_kind(values)
+        column_buffers, extras = _encode_column(values, kind)
+        column = {"name": name, "kind": kind, **extras}
+        column["buffers"] = {buffer: add_buffer(data) for buffer, data in column_buffers.items()}
+        if any(v is _MISSING for v in values):
+            present = np.array([v is not _MISSING for v in values], dtype="<u1")
+            column["buffers"]["present"] = add_buffer(present)
+        columns.append(column)
+
+    keys = [record[key] for record in records]
+    if len(set(keys)) != len(keys) or not all(isinstance(k, str) for k in keys):
+        raise ValueError(f"'{key}' must be a unique string")
+    encoded_keys = [k.encode("utf-8") for k in keys]
+    order = np.argsort(np.array(encoded_keys, dtype=object), kind="stable").astype("<u4")
+    width = max((len(k) for k in encoded_keys), default=1) or 1
+    sorted_keys = np.array([encoded_keys[i] for i in order], dtype=f"S{width}")
+    index = {"field": key, "keys": add_buffer(sorted_keys), "rows": add_buffer(order)}
+    fingerprints = None
+    if fingerprint is not None:
+        encoded = [fingerprint(record).encode("ascii") for record in records]
+        width = max((len(value) for value in encoded), default=1) or 1
+        fingerprints = add_buffer(np.array(encoded, dtype=f"S{width}"))
+
+    # Buffer offsets are relative to the data section, which starts aligned
+    offsets = []
+    position = 0
+    for data, _ in buffers:
+        position += -position % ALIGN
+        offsets.append(position)
+        position += len(data)
+
+    def locate(ref: list) -> list:
+        number, dtype, count = ref
+        return [offsets[number], dtype, count]
+
+    for column in columns:
+        column["buffers"] = {name: locate(ref) for name, ref in column["buffers"].items()}
+    index["keys"] = locate(index["keys"])
+    index["rows"] = locate(index["rows"])
+    header = {
+        "format": FORMAT_VERSION,
+        "rows": len(records),
+        "columns": columns,
+        "index": index,
+        "fingerprints": locate(fingerprints) if fingerprints is not None else None,
+        "source": source or {},
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix = len(MAGIC) + 8 + len(header_bytes)
+    padding = -prefix % ALIGN
+
+    temporary = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header_bytes) + padding))
+            f.write(header_bytes)
+            f.write(b" " * padding)
+            written = 0
+            for (data, _), offset in zip(buffers, offsets):
+                f.write(b"\0" * (offset - written))
+                f.write(data)
+                written = offset + len(data)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return header
+
+
+def _source_stamp(source: str) -> dict:
+    stat = os.stat(source)
+    return {"path": os.path.basename(source), "mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a columnar dataset file")
+        (length,) = struct.unpack("<Q", f.read(8))
+        return json.loads(f.read(length))
+
+
+def is_stale(source: str, target: str) -> bool:
+    """True if `target` is missing, unreadable or was compiled from another version of `source`."""
+    try:
+        stamp = read_header(target)["source"]
+    except (OSError, ValueError):
+        return True
+    current = _source_stamp(source)
+    return stamp.get("mtime") != current["mtime"] or stamp.get("size") != current["size"]
+
+
+def compile_file(source: str, target: str, key: str = "farmer_id") -> dict:
+    """Compile a JSON array or NDJSON dataset file into `target`. Returns the header."""
+    from cache import content_hash
+    from engines.batch import iter_farmers
+
+    stamp = _source_stamp(source)
+    return write_table(list(iter_farmers(source)), target, key=key, source=stamp, fingerprint=content_hash)
+
+
+def compile_if_stale(source: str, target: str, key: str = "farmer_id") -> bool:
+    """Recompile `target` if `source` changed since it was built. Returns True if it did."""
+    if not is_stale(source, target):
+        return False
+    compile_file(source, target, key=key)
+    return True
+
+
+class _Column:
+    """Decoder for one column of a mapped table."""
+
+    def __init__(self, table: "ColumnarTable", spec: dict):
+        self.name = spec["name"]
+        self.kind = spec["kind"]
+        self.categories = spec.get("categories")
+        self._mm = table._mm
+        self._base = table._data_start
+        buffers = {name: table._array(ref) for name, ref in spec["buffers"].items()}
+        self._values = buffers.get("values")
+        self._codes = buffers.get("codes")
+        self._offsets = buffers.get("offsets")
+        self._present = buffers.get("present")
+        if "data" in spec["buffers"]:
+            self._data_start = self._base + spec["buffers"]["data"][0]
+        if self.categories is not None:
+            self._lookup = np.empty(len(self.categories), dtype=object)
+            self._lookup[:] = self.categories
+
+    def _bytes(self, row: int) -> bytes:
+        start = self._data_start
+        return self._mm[start + int(self._offsets[row]):start + int(self._offsets[row + 1])]
+
+    def value(self, row: int):
+        if self._present is not None and not self._present[row]:
+            return _MISSING
+        kind = self.kind
+        if kind == "int" or kind == "float":
+            return self._values.item(row)
+        if kind == "bool":
+            return bool(self._values[row])
+        if kind == "category":
+            return self.categories[self._codes[row]]
+        if kind == "category_list":
+            categories = self.categories
+            start, stop = int(self._offsets[row]), int(self._offsets[row + 1])
+            return [categories[code] for code in self._codes[start:stop].tolist()]
+        if kind == "string":
+            return self._bytes(row).decode("utf-8")
+        return json.loads(self._bytes(row))
+
+    def take(self, rows: np.ndarray) -> list:
+        """Values at `rows` (an index array), _MISSING where the field is absent."""
+        kind = self.kind
+        if kind == "int" or kind == "float":
+            values = self._values[rows].tolist()
+        elif kind == "bool":
+            values = self._values[rows].astype(bool).tolist()
+        elif kind == "category":
+            values = self._lookup[self._codes[rows]].tolist()
+        elif kind == "category_list":
+            categories = self.categories
+            codes = self._codes
+            starts = self._offsets[rows].tolist()
+            stops = self._offsets[rows + 1].tolist()
+            values = [
+                [categories[code] for code in codes[start:stop].tolist()]
+                for start, stop in zip(starts, stops)
+            ]
+        else:
+            mm = self._mm
+            base = self._data_start
+            starts = self._offsets[rows].tolist()
+            stops = self._offsets[rows + 1].tolist()
+            if kind == "string":
+                values = [mm[base + start:base + stop].decode("utf-8") for start, stop in zip(starts, stops)]
+            else:
+                values = [json.loads(mm[base + start:base + stop]) for start, stop in zip(starts, stops)]
+        if self._present is not None:
+            present = self._present[rows].tolist()
+            values = [value if flag else _MISSING for value, flag in zip(values, present)]
+        return values
+
+
+class ColumnarTable:
+    """Read-only, memory-mapped view of a columnar dataset file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a columnar dataset file")
+        (length,) = struct.unpack_from("<Q", self._mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._mm[start:start + length])
+        if self.header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version {self.header.get('format')}")
+        self._data_start = start + length
+        self._rows = self.header["rows"]
+        self._columns = [_Column(self, spec) for spec in self.header["columns"]]
+        self._by_name = {column.name: column for column in self._columns}
+        self.fields = [column.name for column in self._columns]
+        self._sparse = any(column._present is not None for column in self._columns)
+        index = self.header["index"]
+        self.key = index["field"]
+        self._keys = self._array(index["keys"])
+        self._key_rows = self._array(index["rows"])
+        fingerprints = self.header.get("fingerprints")
+        self._fingerprints = self._array(fingerprints) if fingerprints else None
+
+    def _array(self, ref: list) -> np.ndarray:
+        offset, dtype, count = ref
+        return np.frombuffer(self._mm, dtype=dtype or "u1", count=count, offset=self._data_start + offset)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def row(self, position: int) -> dict:
+        """The record at `position` as a new dict."""
+        if self._sparse:
+            return {
+                column.name: value
+                for column in self._columns
+                if (value := column.value(position)) is not _MISSING
+            }
+        return {column.name: column.value(position) for column in self._columns}
+
+    def take(self, positions: np.ndarray) -> list:
+        """The records at `positions` as new dicts, decoded column by column."""
+        names = self.fields
+        columns = [column.take(positions) for column in self._columns]
+        if self._sparse:
+            return [
+                {name: value for name, value in zip(names, values) if value is not _MISSING}
+                for values in zip(*columns)
+            ]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def fingerprints(self, positions: Optional[np.ndarray] = None) -> Optional[list]:
+        """Stored content hashes of all records (or of `positions`), None if not compiled in."""
+        if self._fingerprints is None:
+            return None
+        selected = self._fingerprints if positions is None else self._fingerprints[positions]
+        return [value.decode("ascii") for value in selected.tolist()]
+
+    def rows(self, positions: Optional[np.ndarray] = None) -> "Rows":
+        """A lazy sequence over all records, or over `positions`."""
+        return Rows(self, positions)
+
+    def find(self, key: str) -> Optional[int]:
+        """Row position of the record whose key field equals `key`."""
+        encoded = key.encode("utf-8")
+        if len(encoded) > self._keys.dtype.itemsize or encoded.endswith(b"\0"):
+            return None
+        slot = int(np.searchsorted(self._keys, encoded))
+        if slot < len(self._keys) and self._keys[slot] == encoded:
+            return int(self._key_rows[slot])
+        return None
+
+    def get(self, key: str) -> Optional[dict]:
+        position = self.find(key)
+        return None if position is None else self.row(position)
+
+    def where(self, field: str, value) -> np.ndarray:
+        """Positions of the records whose `field` equals `value`, in file order."""
+        column = self._by_name.get(field)
+        if column is None:
+            return np.empty(0, dtype=np.intp)
+        if column.kind == "category":
+            try:
+                code = column.categories.index(value)
+            except ValueError:
+                return np.empty(0, dtype=np.intp)
+            matches = column._codes == code
+            if column._present is not None:
+                matches &= column._present.astype(bool)
+            return np.flatnonzero(matches)
+        return np.array(
+            [position for position in range(self._rows) if column.value(position) == value], dtype=np.intp
+        )
+
+
+class Rows(Sequence):
+    """Lazy sequence of records of a ColumnarTable; iteration decodes in chunks."""
+
+    __slots__ = ("_table", "_positions")
+
+    def __init__(self, table: ColumnarTable, positions: Optional[np.ndarray] = None):
+        self._table = table
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._table) if self._positions is None else len(self._positions)
+
+    def _position(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return index if self._positions is None else int(self._positions[index])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = np.arange(len(self._table)) if self._positions is None else self._positions
+            return Rows(self._table, positions[index])
+        return self._table.row(self._position(index))
+
+    def fingerprints(self) -> Optional[list]:
+        """Stored content hashes of these records, in order (None if the file has none)."""
+        return self._table.fingerprints(self._positions)
+
+    def __iter__(self) -> Iterator[dict]:
+        take = self._table.take
+        for start in range(0, len(self), CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, len(self))
+            positions = np.arange(start, stop) if self._positions is None else self._positions[start:stop]
+            yield from take(positions)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m columnar")
+    parser.add_argument("source", help="farmers JSON array or NDJSON file")
+    parser.add_argument("-o", "--output", help=f"output file (default: source with {COLUMNAR_SUFFIX})")
+    parser.add_argument("--key", default="farmer_id", help="unique string field to index")
+    args = parser.parse_args(argv)
+
+    target = args.output or os.path.splitext(args.source)[0] + COLUMNAR_SUFFIX
+    header = compile_file(args.source, target, key=args.key)
+    kinds = ", ".join(f"{column['name']}:{column['kind']}" for column in header["columns"])
+    print(
+        f"{header['rows']} rows -> {target} ({os.path.getsize(target)} bytes, "
+        f"source {os.path.getsize(args.source)} bytes)\n{kinds}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
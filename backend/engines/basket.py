@@ -0,0 +1,144 @@
+"""
+Basket Solvers
+Fit sorted product recommendations into a farmer's BNPL budget.
+
+- greedy:  take items in priority order, pro-rating the first item that
+           overflows (the original matching behaviour)
+- optimal: knapsack over the budget discretized into AZN steps,
+           maximizing total priority-weighted match score, then topping up
+           with one pro-rated item like greedy. Falls back to greedy when
+           the DP exceeds its time budget.
+"""
+
+import math
+import time
+
+import numpy as np
+
+from engines.instrumentation import timed
+
+SOLVERS = ("greedy", "optimal")
+
+PRIORITY_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+
+# DP resolution in AZN; prices are rounded up so the budget is never exceeded
+DEFAULT_RESOLUTION = 10.0
+DEFAULT_TIME_BUDGET = 0.05  # seconds
+
+
+def _pro_rate(rec: dict, remaining: float) -> None:
+    """Reduce a recommendation's quantity so it costs `remaining`."""
+    ratio = remaining / rec["estimated_price"]
+    rec["estimated_price"] = round(remaining)
+    rec["estimated_quantity"] = f"~{round(ratio * 100)}% of full quantity"
+
+
+def solve_greedy(recommendations: list, budget: float) -> tuple:
+    """Greedy fill in list order. Returns (selected, total_cost)."""
+    total_cost = 0
+    selected = []
+    for rec in recommendations:
+        remaining = budget - total_cost
+        if remaining <= 0:
+            break
+        if rec["estimated_price"] <= remaining:
+            total_cost += rec["estimated_price"]
+            selected.append(rec)
+        elif remaining >= 100:
+            # Include at reduced quantity to fit budget
+            _pro_rate(rec, remaining)
+            total_cost += rec["estimated_price"]
+            selected.append(rec)
+    return selected, total_cost
+
+
+def solve_optimal(
+    recommendations: list,
+    budget: float,
+    resolution: float = DEFAULT_RESOLUTION,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+):
+    """
+    Maximize sum(priority weight * match score) with total price <= budget.
+
+    Items with equal value are interchangeable except for price, so an
+    optimal basket only ever takes the k cheapest items of each value
+    class. That turns the 0/1 knapsack into a bounded knapsack over a
+    handful of value classes, each solved with one vectorized step.
+
+    The DP takes items whole; any leftover budget then goes to unselected
+    items in input order, pro-rating the last one. Returns (selected,
+    total_cost) in input order, or None if the time budget ran out.
+    """
+    deadline = time.perf_counter() + time_budget
+    capacity = int(budget // resolution) if budget > 0 else 0
+
+    classes = {}
+    for i, rec in enumerate(recommendations):
+        weight = math.ceil(rec["estimated_price"] / resolution)
+        value = PRIORITY_WEIGHTS.get(rec["priority"], 0) * rec["match_score"]
+        if weight <= capacity and value > 0:
+            classes.setdefault(value, []).append((weight, i))
+
+    cells = np.arange(capacity + 1)
+    best = np.zeros(capacity + 1)
+    steps = []
+    for value, members in classes.items():
+        if time.perf_counter() > deadline:
+            return None
+        members.sort()
+        cumulative = np.cumsum([0] + [weight for weight, _ in members])
+        cumulative = cumulative[cumulative <= capacity]
+        # candidate[k, c]: take the k cheapest of this class at capacity c
+        source = cells[None, :] - cumulative[:, None]
+        candidate = np.where(
+            source >= 0,
+            best[np.maximum(source, 0)] + value * np.arange(len(cumulative))[:, None],
+            -np.inf,
+        )
+        taken = candidate.argmax(axis=0)
+        best = candidate[taken, cells]
+        steps.append((members, cumulative, taken))
+
+    chosen = set()
+    remaining = capacity
+    for members, cumulative, taken in reversed(steps):
+        k = taken[remaining]
+        chosen.update(i for _, i in members[:k])
+        remaining -= cumulative[k]
+    total_cost = sum(recommendations[i]["estimated_price"] for i in chosen)
+
+    # Spend what the discretization left over, pro-rating as greedy does
+    # (whole items still fit below 100 AZN; only a pro-rated one needs 100)
+    for i, rec in enumerate(recommendations):
+        remaining = budget - total_cost
+        if remaining <= 0:
+            break
+        if i in chosen:
+            continue
+        if rec["estimated_price"] <= remaining:
+            total_cost += rec["estimated_price"]
+            chosen.add(i)
+        elif remaining >= 100:
+            _pro_rate(rec, remaining)
+            total_cost += rec["estimated_price"]
+            chosen.add(i)
+
+    selected = [recommendations[i] for i in sorted(chosen)]
+    return selected, total_cost
+
+
+@timed("matching.basket")
+def fit_to_budget(recommendations: list, budget: float, solver: str = "greedy") -> tuple:
+    """
+    Run the requested solver. Returns (selected, total_cost, solver_used);
+    solver_used is "greedy_fallback" when the optimal solver timed out.
+    """
+    if solver == "optimal":
+        solved = solve_optimal(recommendations, budget)
+        if solved is not None:
+            return solved[0], solved[1], "optimal"
+        return (*solve_greedy(recommendations, budget), "greedy_fallback")
+    if solver != "greedy":
+        raise ValueError(f"Unknown solver: {solver}")
+    return (*solve_greedy(recommendations, budget), "greedy")
@@ -0,0 +1,249 @@
+"""
+Offline Batch Scorer
+Re-scores a whole farmers file without going through the HTTP API.
+
+Farmers are read in chunks, sharded across a process pool and scored with
+calculate_risk_score (optionally followed by match_products and
+generate_explanation). Results are written in input order as NDJSON, CSV
+or Parquet, with progress and throughput reported on stderr. Only a few
+chunks per worker are in flight at once, so a slow writer holds back the
+reader instead of letting scored chunks pile up in memory.
+
+Usage (from the backend directory):
+    python -m engines.batch data/farmers.json -o scores.csv --products --explain
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+from typing import Iterator, Optional
+
+from engines.scoring import calculate_risk_score
+from engines.product_matching import match_products
+from engines.explainability import generate_explanation
+
+OUTPUT_FORMATS = ("ndjson", "csv", "parquet")
+
+# Chunks submitted ahead of the writer, per worker process
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+def iter_farmers(path: str) -> Iterator[dict]:
+    """Yield farmers from a JSON array file or, streamed, from an NDJSON file."""
+    if path.endswith((".ndjson", ".jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+def iter_chunks(farmers: Iterator[dict], chunk_size: int) -> Iterator[list]:
+    """Group farmers into lists of at most `chunk_size`."""
+    farmers = iter(farmers)
+    while True:
+        chunk = list(islice(farmers, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def process_farmer(farmer: dict, with_products: bool, with_explanation: bool) -> dict:
+    score = calculate_risk_score(farmer)
+    record = dict(score)
+    if with_products:
+        record["products"] = match_products(farmer, score["bnpl_limit"])
+    if with_explanation:
+        record["summary"] = generate_explanation(farmer, score)["summary"]
+    return record
+
+
+def _process_chunk(args: tuple) -> list:
+    chunk, with_products, with_explanation = args
+    return [process_farmer(f, with_products, with_explanation) for f in chunk]
+
+
+def _imap_bounded(pool: Pool, func, work: Iterator, window: int) -> Iterator:
+    """pool.imap(func, work) in input order, with at most `window` items submitted and not yet consumed."""
+    pending = deque()
+    for item in work:
+        if len(pending) >= window:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (item,)))
+    while pending:
+        yield pending.popleft().get()
+
+
+def _flatten(record: dict, prefix: str = "") -> dict:
+    """Flatten nested dicts for tabular output; lists are JSON-encoded."""
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}_"))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value, ensure_ascii=False)
+        else:
+            flat[name] = value
+    return flat
+
+
+class _NdjsonWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, records: list) -> None:
+        self._file.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = None
+
+    def write(self, records: list) -> None:
+        rows = [_flatten(r) for r in records]
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0]), extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+        self._path = path
+        self._writer = None
+
+    def write(self, records: list) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist([_flatten(r) for r in records])
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+WRITERS = {"ndjson": _NdjsonWriter, "csv": _CsvWriter, "parquet": _ParquetWriter}
+
+
+def _infer_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "json"):
+        return "ndjson"
+    if ext in OUTPUT_FORMATS:
+        return ext
+    return "ndjson"
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    output_format: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    with_products: bool = False,
+    with_explanation: bool = False,
+    progress=sys.stderr,
+) -> dict:
+    """Score every farmer in `input_path` and write the results. Returns run stats."""
+    output_format = output_format or _infer_format(output_path)
+    workers = workers or os.cpu_count() or 1
+    writer = WRITERS[output_format](output_path)
+
+    work = (
+        (chunk, with_products, with_explanation)
+        for chunk in iter_chunks(iter_farmers(input_path), chunk_size)
+    )
+
+    processed = 0
+    started = time.perf_counter()
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        if pool:
+            results = _imap_bounded(pool, _process_chunk, work, workers * CHUNKS_IN_FLIGHT_PER_WORKER)
+        else:
+            results = map(_process_chunk, work)
+        for records in results:
+            writer.write(records)
+            processed += len(records)
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                progress.write(f"\rscored {processed:,} farmers  {processed / elapsed:,.0f}/s")
+                progress.flush()
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "farmers": processed,
+        "seconds": round(elapsed, 3),
+        "farmers_per_second": round(processed / elapsed) if elapsed > 0 else 0,
+        "workers": workers,
+        "output": output_path,
+        "format": output_format,
+    }
+    if progress is not None:
+        progress.write(
+            f"\nDone: {processed:,} farmers in {elapsed:.2f}s "
+            f"({stats['farmers_per_second']:,}/s, {workers} workers) -> {output_path}\n"
+        )
+    return stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m engines.batch",
+        description="Offline BNPL batch scorer",
+    )
+    parser.add_argument("input", help="farmers file (.json array or .ndjson/.jsonl)")
+    parser.add_argument("-o", "--output", required=True, help="output file")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, help="output format (default: from extension)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=1000, help="farmers per work item")
+    parser.add_argument("--products", action="store_true", help="include product recommendations")
+    parser.add_argument("--explain", action="store_true", help="include the explanation summary")
+    parser.add_argument("-q", "--quiet", action="store_true", help="suppress progress output")
+    args = parser.parse_args(argv)
+
+    run_batch(
+        args.input,
+        args.output,
+        output_format=args.format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        with_products=args.products,
+        with_explanation=args.explain,
+        progress=None if args.quiet else sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+BNPL History Status Parser
+Compiles `previous_bnpl_status` strings ("all_on_time", "2_late_3_on_time",
+...) into late / on-time counts and a status kind, which the scoring model
+maps to the history base score.
+
+The number of distinct status strings is tiny compared to the number of
+applications, so each string is parsed once and kept in a bounded LRU
+cache. parse_status_column() applies the same parser to a whole column
+by parsing only its distinct values.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# A "late" or "on_time" token, optionally preceded by a count token
+_EVENT_PATTERN = re.compile(r"(?:^|_)(?:(\d+)_)?(late|on_time)(?=_|$)")
+
+STATUS_CACHE_SIZE = 4096
+
+
+# Status kinds, in the order they are tested
+STATUS_KINDS = ("all_on_time", "late", "on_time", "unknown")
+
+
+class BnplStatus(NamedTuple):
+    late_count: int
+    on_time_count: int
+    kind: str
+
+    @property
+    def late_ratio(self) -> float:
+        total = self.late_count + self.on_time_count
+        return self.late_count / total if total > 0 else 0.5
+
+
+@lru_cache(maxsize=STATUS_CACHE_SIZE)
+def parse_status(status: str) -> BnplStatus:
+    """Parse a payment status string into late / on-time counts and its kind."""
+    late_count = 0
+    on_time_count = 0
+    for match in _EVENT_PATTERN.finditer(status):
+        count = int(match.group(1)) if match.group(1) else 1
+        if match.group(2) == "late":
+            late_count += count
+        else:
+            on_time_count += count
+
+    if status == "all_on_time":
+        kind = "all_on_time"
+    elif "late" in status:
+        kind = "late"
+    elif "on_time" in status:
+        kind = "on_time"
+    else:
+        kind = "unknown"
+
+    return BnplStatus(late_count, on_time_count, kind)
+
+
+def parse_status_column(statuses) -> pd.DataFrame:
+    """
+    Parse a column of status strings, evaluating each distinct value once.
+    Returns late_count / on_time_count / late_ratio columns and `kind` as
+    codes into STATUS_KINDS.
+    """
+    codes, uniques = pd.factorize(pd.Series(statuses))
+    parsed = [parse_status(s) for s in uniques]
+    late = np.array([p.late_count for p in parsed], dtype=np.int64)
+    on_time = np.array([p.on_time_count for p in parsed], dtype=np.int64)
+    ratio = np.array([p.late_ratio for p in parsed], dtype=np.float64)
+    kind = np.array([STATUS_KINDS.index(p.kind) for p in parsed], dtype=np.int64)
+    return pd.DataFrame({
+        "late_count": late[codes],
+        "on_time_count": on_time[codes],
+        "late_ratio": ratio[codes],
+        "kind": kind[codes],
+    })
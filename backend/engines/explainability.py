@@ -1,201 +1,249 @@
 """
 Explainability Engine
 Generates human-readable explanations for risk scoring decisions.
+
+Each factor is classified into a bracket (e.g. region "excellent" /
+"good" / "moderate") and its narrative comes from a template keyed by
+(factor, bracket) in the locale's message catalog (engines.messages).
+Explanations come in two levels of detail: "compact" carries the numbers,
+labels and icons only, and "full" also renders the factor descriptions
+and the summary. Rendered descriptions are cached per locale, since
+farmers share a small set of (bracket, value, points) combinations.
+generate_explanations() explains a whole batch against one model and
+locale with the same shared tables.
 """
 
+from functools import lru_cache
+from typing import Optional
 
-def generate_explanation(farmer_data: dict, score_result: dict) -> dict:
-    """Generate a detailed, human-readable explanation of the risk score."""
-    explanation = score_result["explanation"]
-    raw = score_result["raw_scores"]
+from engines.instrumentation import timed
+from engines.messages import ENGLISH, MessageCatalog, get_messages
+from engines.model import FACTORS, ScoringModel, get_active_model
 
-    factors = []
+DETAIL_LEVELS = ("compact", "full")
+
+# Factors in the order they are presented
+EXPLAINED_FACTORS = (
+    "region",
+    "experience",
+    "revenue",
+    "history",
+    "land_ownership",
+    "irrigation",
+    "bank_loan",
+    "farm_type",
+)
 
-    # Region factor
+
+# Classifiers: (farmer, raw score, catalog) -> (bracket, display value,
+# icon, value the description template shows)
+
+def _classify_region(farmer_data: dict, raw: float, messages: MessageCatalog) -> tuple:
     region = farmer_data["region"]
-    region_score = raw["region"]
-    if region_score >= 80:
-        region_desc = "excellent agricultural zone"
-    elif region_score >= 70:
-        region_desc = "good agricultural zone"
-    else:
-        region_desc = "moderate agricultural zone"
-
-    factors.append({
-        "factor": "Region",
-        "value": region,
-        "raw_score": region_score,
-        "weighted_contribution": explanation["region_contribution"],
-        "max_contribution": 12.0,
-        "icon": "check" if region_score >= 70 else "warning",
-        "description": f"Region ({region}): +{explanation['region_contribution']} points ({region_desc})",
-    })
-
-    # Experience factor
+    bracket = "excellent" if raw >= 80 else "good" if raw >= 70 else "moderate"
+    return bracket, region, "check" if raw >= 70 else "warning", region
+
+
+def _classify_experience(farmer_data: dict, raw: float, messages: MessageCatalog) -> tuple:
     years = farmer_data["years_experience"]
-    exp_score = raw["experience"]
     if years >= 10:
-        exp_desc = "highly experienced farmer"
+        bracket = "highly_experienced"
     elif years >= 5:
-        exp_desc = "experienced farmer"
+        bracket = "experienced"
     elif years >= 3:
-        exp_desc = "developing farmer"
+        bracket = "developing"
     else:
-        exp_desc = "new farmer"
-
-    factors.append({
-        "factor": "Experience",
-        "value": f"{years} years",
-        "raw_score": exp_score,
-        "weighted_contribution": explanation["experience_contribution"],
-        "max_contribution": 15.0,
-        "icon": "check" if exp_score >= 65 else "warning",
-        "description": f"Experience ({years} years): +{explanation['experience_contribution']} points ({exp_desc})",
-    })
-
-    # Revenue factor
-    revenue = farmer_data["average_monthly_revenue"]
+        bracket = "new"
+    value = messages.experience(years)
+    return bracket, value, "check" if raw >= 65 else "warning", value
+
+
+def _classify_revenue(farmer_data: dict, raw: float, messages: MessageCatalog) -> tuple:
     volatility = farmer_data["seasonal_revenue_volatility"]
-    rev_score = raw["revenue"]
-    if volatility == "low":
-        vol_desc = "stable income"
-    elif volatility == "medium":
-        vol_desc = "moderate seasonality"
-    else:
-        vol_desc = "high seasonality risk"
-
-    factors.append({
-        "factor": "Revenue Pattern",
-        "value": f"{revenue} AZN/month ({volatility} volatility)",
-        "raw_score": rev_score,
-        "weighted_contribution": explanation["revenue_contribution"],
-        "max_contribution": 20.0,
-        "icon": "check" if rev_score >= 60 else "warning",
-        "description": f"Revenue Pattern: +{explanation['revenue_contribution']} points ({vol_desc})",
-    })
-
-    # BNPL history factor
-    bnpl_count = farmer_data["previous_bnpl_count"]
-    bnpl_status = farmer_data["previous_bnpl_status"]
-    hist_score = raw["history"]
-    if bnpl_count == 0:
-        hist_desc = "no previous BNPL history"
-    elif bnpl_status == "all_on_time":
-        hist_desc = f"{bnpl_count} on-time payments"
-    else:
-        hist_desc = f"mixed payment record ({bnpl_status.replace('_', ' ')})"
-
-    factors.append({
-        "factor": "BNPL History",
-        "value": bnpl_status.replace("_", " "),
-        "raw_score": hist_score,
-        "weighted_contribution": explanation["history_contribution"],
-        "max_contribution": 15.0,
-        "icon": "check" if hist_score >= 60 else "warning",
-        "description": f"BNPL History: +{explanation['history_contribution']} points ({hist_desc})",
-    })
-
-    # Land Ownership factor
-    owns_land = farmer_data.get("land_ownership", False)
-    land_score = raw["land_ownership"]
-    land_desc = "owns the farmland" if owns_land else "rents / does not own farmland"
-
-    factors.append({
-        "factor": "Land Ownership",
-        "value": "Owner" if owns_land else "Not Owner",
-        "raw_score": land_score,
-        "weighted_contribution": explanation["land_ownership_contribution"],
-        "max_contribution": 12.0,
-        "icon": "check" if owns_land else "warning",
-        "description": f"Land Ownership: +{explanation['land_ownership_contribution']} points ({land_desc})",
-    })
-
-    # Irrigation factor
-    has_irrigation = farmer_data.get("has_irrigation", False)
-    irr_score = raw["irrigation"]
-    irr_desc = "has irrigation system" if has_irrigation else "no irrigation system"
-
-    factors.append({
-        "factor": "Irrigation System",
-        "value": "Yes" if has_irrigation else "No",
-        "raw_score": irr_score,
-        "weighted_contribution": explanation["irrigation_contribution"],
-        "max_contribution": 8.0,
-        "icon": "check" if has_irrigation else "warning",
-        "description": f"Irrigation System: +{explanation['irrigation_contribution']} points ({irr_desc})",
-    })
-
-    # Bank Loan factor
-    has_loan = farmer_data.get("has_bank_loan", False)
-    loan_score = raw["bank_loan"]
-    loan_desc = "has existing bank loan (debt burden)" if has_loan else "no existing bank loan"
-
-    factors.append({
-        "factor": "Bank Loan",
-        "value": "Has Loan" if has_loan else "No Loan",
-        "raw_score": loan_score,
-        "weighted_contribution": explanation["bank_loan_contribution"],
-        "max_contribution": 10.0,
-        "icon": "warning" if has_loan else "check",
-        "description": f"Bank Loan: +{explanation['bank_loan_contribution']} points ({loan_desc})",
-    })
-
-    # Farm type factor
+    bracket = volatility if volatility in ("low", "medium") else "high"
+    value = messages.revenue(farmer_data["average_monthly_revenue"], volatility)
+    return bracket, value, "check" if raw >= 60 else "warning", None
+
+
+def _classify_history(farmer_data: dict, raw: float, messages: MessageCatalog) -> tuple:
+    status = messages.status(farmer_data["previous_bnpl_status"])
+    count = farmer_data["previous_bnpl_count"]
+    icon = "check" if raw >= 60 else "warning"
+    if count == 0:
+        return "none", status, icon, None
+    if farmer_data["previous_bnpl_status"] == "all_on_time":
+        return "on_time", status, icon, count
+    return "mixed", status, icon, status
+
+
+def _classify_flag(field: str, factor: str, yes: str, no: str, good: str) -> callable:
+    yes_key = (factor, yes)
+    no_key = (factor, no)
+    yes_icon = "check" if good == yes else "warning"
+    no_icon = "check" if good == no else "warning"
+
+    def classify(farmer_data: dict, raw: float, messages: MessageCatalog) -> tuple:
+        if farmer_data.get(field, False):
+            return yes, messages.flags[yes_key], yes_icon, None
+        return no, messages.flags[no_key], no_icon, None
+
+    return classify
+
+
+def _classify_farm_type(farmer_data: dict, raw: float, messages: MessageCatalog) -> tuple:
     farm_type = farmer_data["farm_type"]
-    ft_score = raw["farm_type"]
-    factors.append({
-        "factor": "Farm Type",
-        "value": farm_type.replace("_", " ").title(),
-        "raw_score": ft_score,
-        "weighted_contribution": explanation["farm_type_contribution"],
-        "max_contribution": 8.0,
-        "icon": "check" if ft_score >= 75 else "warning",
-        "description": f"Farm Type ({farm_type}): +{explanation['farm_type_contribution']} points",
-    })
-
-    # Build summary
-    score = score_result["risk_score"]
-    decision = score_result["decision"]
-    category = score_result["risk_category"]
-
-    if decision == "Refused":
-        summary = (
-            f"{farmer_data['name']} - LOAN REQUEST REFUSED. Risk score {score}/100 is below the minimum threshold of 50. "
-            f"Multiple risk factors identified including "
-            + (("no land ownership, " if not owns_land else ""))
-            + (("existing bank loan, " if has_loan else ""))
-            + (("no irrigation system, " if not has_irrigation else ""))
-            + f"resulting in too high a risk for BNPL approval."
-        )
-    elif category == "Low":
-        summary = (
-            f"{farmer_data['name']} presents a low-risk profile with a score of {score}/100. "
-            f"Strong indicators across all factors. "
-            f"APPROVED for maximum BNPL limit of {score_result['bnpl_limit']:,} AZN with {score_result['recommended_installment_months']}-month term."
-        )
-    elif category == "Medium":
-        summary = (
-            f"{farmer_data['name']} presents a moderate-risk profile with a score of {score}/100. "
-            f"Positive indicators balanced with some areas of concern. "
-            f"APPROVED for BNPL limit of {score_result['bnpl_limit']:,} AZN with {score_result['recommended_installment_months']}-month term."
-        )
+    described = messages.farm_types.get(farm_type, farm_type)
+    return "any", messages.farm_type(farm_type), "check" if raw >= 75 else "warning", described
+
+
+# (factor, contribution key, classifier), in presentation order
+_FACTOR_SPECS = tuple(
+    (factor, f"{factor}_contribution", classify)
+    for factor, classify in (
+        ("region", _classify_region),
+        ("experience", _classify_experience),
+        ("revenue", _classify_revenue),
+        ("history", _classify_history),
+        ("land_ownership", _classify_flag("land_ownership", "land_ownership", "owner", "not_owner", "owner")),
+        ("irrigation", _classify_flag("has_irrigation", "irrigation", "yes", "no", "yes")),
+        ("bank_loan", _classify_flag("has_bank_loan", "bank_loan", "loan", "no_loan", "no_loan")),
+        ("farm_type", _classify_farm_type),
+    )
+)
+assert tuple(spec[0] for spec in _FACTOR_SPECS) == EXPLAINED_FACTORS
+
+
+def render_description(
+    factor: str, bracket: str, value, points: float, messages: MessageCatalog = ENGLISH
+) -> str:
+    """The description of one factor, rendered once per locale and distinct input."""
+    return messages.render_description(factor, bracket, value, points)
+
+
+def _render_summary(farmer_data: dict, score_result: dict, brackets: dict, messages: MessageCatalog) -> str:
+    concerns = ""
+    if score_result["decision"] == "Refused":
+        template = messages.summaries["refused"]
+        concerns = "".join(text for (factor, bracket), text in messages.concerns if brackets[factor] == bracket)
     else:
-        summary = (
-            f"{farmer_data['name']} presents a higher-risk profile with a score of {score}/100. "
-            f"Limited history or concerning indicators suggest caution. "
-            f"APPROVED for reduced BNPL limit of {score_result['bnpl_limit']:,} AZN with {score_result['recommended_installment_months']}-month short term."
-        )
+        template = messages.summaries.get(score_result["risk_category"], messages.summaries["other"])
+    return template.format(
+        name=farmer_data["name"],
+        score=score_result["risk_score"],
+        limit=score_result["bnpl_limit"],
+        months=score_result["recommended_installment_months"],
+        concerns=concerns,
+    )
+
+
+@lru_cache(maxsize=16)
+def max_contributions(model: ScoringModel) -> dict:
+    """Maximum weighted points per factor under the scoring model."""
+    return {factor: round(model.weights[factor] * 100, 1) for factor in FACTORS}
+
+
+def _explain(
+    farmer_data: dict, score_result: dict, max_contribution: dict, full: bool, messages: MessageCatalog
+) -> dict:
+    contributions = score_result["explanation"]
+    raw = score_result["raw_scores"]
+    labels = messages.labels
+    render = messages.render_description
 
+    factors = []
+    brackets = {}
+    for factor, contribution_key, classify in _FACTOR_SPECS:
+        raw_score = raw[factor]
+        bracket, value, icon, described = classify(farmer_data, raw_score, messages)
+        points = contributions[contribution_key]
+        if full:
+            brackets[factor] = bracket
+            factors.append({
+                "factor": labels[factor],
+                "value": value,
+                "raw_score": raw_score,
+                "weighted_contribution": points,
+                "max_contribution": max_contribution[factor],
+                "icon": icon,
+                "description": render(factor, bracket, described, points),
+            })
+        else:
+            factors.append({
+                "factor": labels[factor],
+                "value": value,
+                "raw_score": raw_score,
+                "weighted_contribution": points,
+                "max_contribution": max_contribution[factor],
+                "icon": icon,
+            })
+
+    if full:
+        return {
+            "farmer_id": farmer_data["farmer_id"],
+            "farmer_name": farmer_data["name"],
+            "risk_score": score_result["risk_score"],
+            "risk_category": score_result["risk_category"],
+            "decision": score_result["decision"],
+            "summary": _render_summary(farmer_data, score_result, brackets, messages),
+            "factors": factors,
+            "bnpl_limit": score_result["bnpl_limit"],
+            "installment_months": score_result["recommended_installment_months"],
+            "late_payment_probability": score_result["late_payment_probability"],
+            "confidence_level": score_result["confidence_level"],
+            "detail": "full",
+        }
     return {
         "farmer_id": farmer_data["farmer_id"],
         "farmer_name": farmer_data["name"],
-        "risk_score": score,
-        "risk_category": category,
-        "decision": decision,
-        "summary": summary,
+        "risk_score": score_result["risk_score"],
+        "risk_category": score_result["risk_category"],
+        "decision": score_result["decision"],
         "factors": factors,
         "bnpl_limit": score_result["bnpl_limit"],
         "installment_months": score_result["recommended_installment_months"],
         "late_payment_probability": score_result["late_payment_probability"],
         "confidence_level": score_result["confidence_level"],
+        "detail": "compact",
     }
+
+
+def _check_detail(detail: str) -> bool:
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail must be one of: {', '.join(DETAIL_LEVELS)}")
+    return detail == "full"
+
+
+@timed("explanation")
+def generate_explanation(
+    farmer_data: dict,
+    score_result: dict,
+    model: Optional[ScoringModel] = None,
+    detail: str = "full",
+    locale: Optional[str] = None,
+) -> dict:
+    """
+    Explain a risk score in `locale` (English by default or if the locale
+    is not loaded). `detail="compact"` skips rendering the factor
+    descriptions and the summary text.
+    """
+    full = _check_detail(detail)
+    max_contribution = max_contributions(model or get_active_model())
+    return _explain(farmer_data, score_result, max_contribution, full, get_messages(locale))
+
+
+@timed("explanation")
+def generate_explanations(
+    farmers: list,
+    score_results: list,
+    model: Optional[ScoringModel] = None,
+    detail: str = "compact",
+    locale: Optional[str] = None,
+) -> list:
+    """Explain many scores against one model and locale, sharing the message and contribution tables."""
+    full = _check_detail(detail)
+    max_contribution = max_contributions(model or get_active_model())
+    messages = get_messages(locale)
+    return [
+        _explain(farmer, score, max_contribution, full, messages)
+        for farmer, score in zip(farmers, score_results)
+    ]
@@ -0,0 +1,78 @@
+"""
+Engine Instrumentation
+Timing hooks for the engines, off unless an observer is installed.
+
+Engine entry points are wrapped with @timed("stage"), and application
+code can time its own steps with `with stage("name"):`. Each completed
+call is reported to the observer installed with set_observer() as
+(stage, seconds). With no observer, a wrapped call costs one global read
+and `stage()` returns a shared no-op context manager, so the hooks stay
+in place permanently.
+"""
+
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Optional
+
+_observer = None
+
+
+def set_observer(observer: Optional[Callable[[str, float], None]]) -> None:
+    """Report stage timings to `observer(stage, seconds)`, or stop with None."""
+    global _observer
+    _observer = observer
+
+
+def timed(name: str) -> Callable:
+    """Decorator reporting each call of the wrapped function as stage `name`."""
+
+    def decorate(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            observer = _observer
+            if observer is None:
+                return fn(*args, **kwargs)
+            started = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observer(name, perf_counter() - started)
+
+        return wrapper
+
+    return decorate
+
+
+class _Stage:
+    __slots__ = ("name", "observer", "started")
+
+    def __init__(self, name: str, observer: Callable[[str, float], None]):
+        self.name = name
+        self.observer = observer
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.observer(self.name, perf_counter() - self.started)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """Context manager reporting the enclosed block as stage `name`."""
+    observer = _observer
+    return _NO_STAGE if observer is None else _Stage(name, observer)
@@ -0,0 +1,343 @@
+"""
+Explanation Message Catalogs
+Localized text for explanations: factor labels, description and summary
+templates, and the display values of enum-like farmer fields.
+
+English is built in and is the fallback for every other locale. Further
+locales are JSON files in data/locales/ (named by language tag, e.g.
+az.json) whose sections override the English entries they name. Each file
+is compiled once into a MessageCatalog of flat lookup tables, and every
+template is test-formatted at load so a broken catalog fails at startup
+rather than on a request. Rendered factor descriptions and display values
+are cached per catalog, so each locale formats a given input once and
+adding locales adds no per-request formatting cost.
+"""
+
+import json
+import os
+from typing import Optional
+
+from engines.bnpl_history import parse_status
+
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "locales")
+DEFAULT_LOCALE = "en"
+DESCRIPTION_CACHE_SIZE = 16384
+
+FACTOR_LABELS = {
+    "region": "Region",
+    "experience": "Experience",
+    "revenue": "Revenue Pattern",
+    "history": "BNPL History",
+    "land_ownership": "Land Ownership",
+    "irrigation": "Irrigation System",
+    "bank_loan": "Bank Loan",
+    "farm_type": "Farm Type",
+}
+
+# (factor, bracket) -> description template. {points} is the weighted
+# contribution and {value} the factor input the description names.
+DESCRIPTION_TEMPLATES = {
+    ("region", "excellent"): "Region ({value}): +{points} points (excellent agricultural zone)",
+    ("region", "good"): "Region ({value}): +{points} points (good agricultural zone)",
+    ("region", "moderate"): "Region ({value}): +{points} points (moderate agricultural zone)",
+    ("experience", "highly_experienced"): "Experience ({value}): +{points} points (highly experienced farmer)",
+    ("experience", "experienced"): "Experience ({value}): +{points} points (experienced farmer)",
+    ("experience", "developing"): "Experience ({value}): +{points} points (developing farmer)",
+    ("experience", "new"): "Experience ({value}): +{points} points (new farmer)",
+    ("revenue", "low"): "Revenue Pattern: +{points} points (stable income)",
+    ("revenue", "medium"): "Revenue Pattern: +{points} points (moderate seasonality)",
+    ("revenue", "high"): "Revenue Pattern: +{points} points (high seasonality risk)",
+    ("history", "none"): "BNPL History: +{points} points (no previous BNPL history)",
+    ("history", "on_time"): "BNPL History: +{points} points ({value} on-time payments)",
+    ("history", "mixed"): "BNPL History: +{points} points (mixed payment record ({value}))",
+    ("land_ownership", "owner"): "Land Ownership: +{points} points (owns the farmland)",
+    ("land_ownership", "not_owner"): "Land Ownership: +{points} points (rents / does not own farmland)",
+    ("irrigation", "yes"): "Irrigation System: +{points} points (has irrigation system)",
+    ("irrigation", "no"): "Irrigation System: +{points} points (no irrigation system)",
+    ("bank_loan", "loan"): "Bank Loan: +{points} points (has existing bank loan (debt burden))",
+    ("bank_loan", "no_loan"): "Bank Loan: +{points} points (no existing bank loan)",
+    ("farm_type", "any"): "Farm Type ({value}): +{points} points",
+}
+
+# Display values of the yes/no factors, by bracket
+FLAG_VALUES = {
+    ("land_ownership", "owner"): "Owner",
+    ("land_ownership", "not_owner"): "Not Owner",
+    ("irrigation", "yes"): "Yes",
+    ("irrigation", "no"): "No",
+    ("bank_loan", "loan"): "Has Loan",
+    ("bank_loan", "no_loan"): "No Loan",
+}
+
+# Display value templates of the numeric factors
+VALUE_TEMPLATES = {
+    "experience": "{years} years",
+    "revenue": "{revenue} AZN/month ({volatility} volatility)",
+}
+
+SUMMARY_TEMPLATES = {
+    "refused": (
+        "{name} - LOAN REQUEST REFUSED. Risk score {score}/100 is below the minimum threshold of 50. "
+        "Multiple risk factors identified including {concerns}"
+        "resulting in too high a risk for BNPL approval."
+    ),
+    "Low": (
+        "{name} presents a low-risk profile with a score of {score}/100. "
+        "Strong indicators across all factors. "
+        "APPROVED for maximum BNPL limit of {limit:,} AZN with {months}-month term."
+    ),
+    "Medium": (
+        "{name} presents a moderate-risk profile with a score of {score}/100. "
+        "Positive indicators balanced with some areas of concern. "
+        "APPROVED for BNPL limit of {limit:,} AZN with {months}-month term."
+    ),
+    "other": (
+        "{name} presents a higher-risk profile with a score of {score}/100. "
+        "Limited history or concerning indicators suggest caution. "
+        "APPROVED for reduced BNPL limit of {limit:,} AZN with {months}-month short term."
+    ),
+}
+
+# Concerns listed in a refusal summary, in order
+REFUSAL_CONCERNS = (
+    (("land_ownership", "not_owner"), "no land ownership, "),
+    (("bank_loan", "loan"), "existing bank loan, "),
+    (("irrigation", "no"), "no irrigation system, "),
+)
+
+# Sample arguments each kind of template is test-formatted with
+_SAMPLE_ARGS = {
+    "descriptions": {"value": "x", "points": 1.0},
+    "values": {"years": 1, "revenue": 1, "volatility": "x"},
+    "summaries": {"name": "x", "score": 1.0, "limit": 1, "months": 1, "concerns": ""},
+    "status_counts": {"n": 1},
+}
+
+# Payment history event kinds a locale's `status_counts` templates cover,
+# in the order they are rendered
+STATUS_COUNT_KINDS = ("on_time", "late")
+
+
+def _readable(value: str) -> str:
+    return value.replace("_", " ")
+
+
+def _pair_key(key: str, section: str) -> tuple:
+    factor, sep, bracket = key.partition(".")
+    if not sep:
+        raise ValueError(f"{section} keys are 'factor.bracket', got {key!r}")
+    return factor, bracket
+
+
+class MessageCatalog:
+    """Compiled message tables of one locale."""
+
+    SECTIONS = (
+        "labels", "descriptions", "flags", "values", "summaries", "concerns",
+        "farm_types", "volatility", "statuses", "status_counts",
+    )
+
+    def __init__(self, locale: str, tables: dict):
+        self.locale = locale
+        self.name = tables.get("name", locale)
+        self.labels = dict(tables["labels"])
+        self.descriptions = dict(tables["descriptions"])
+        self.flags = dict(tables["flags"])
+        self.values = dict(tables["values"])
+        self.summaries = dict(tables["summaries"])
+        self.concerns = tuple(tables["concerns"])
+        # Enum value -> display text; values missing here fall back to the
+        # English rendering of the raw value
+        self.farm_types = dict(tables.get("farm_types", {}))
+        self.volatility = dict(tables.get("volatility", {}))
+        self.statuses = dict(tables.get("statuses", {}))
+        # "{n} late" / "{n} on time" templates; without them (English) other
+        # statuses are shown as the readable raw value
+        self.status_counts = dict(tables.get("status_counts", {}))
+        self._descriptions = {}
+        self._statuses = {}
+        self._experience = {}
+        self._revenue = {}
+        self._validate()
+
+    def _validate(self) -> None:
+        for section, templates in (
+            ("descriptions", self.descriptions.values()),
+            ("values", self.values.values()),
+            ("summaries", self.summaries.values()),
+            ("status_counts", self.status_counts.values()),
+        ):
+            for template in templates:
+                try:
+                    template.format(**_SAMPLE_ARGS[section])
+                except (KeyError, IndexError, ValueError) as e:
+                    raise ValueError(f"Invalid {section} template in locale {self.locale!r}: {template!r} ({e})")
+        for section, table, expected in (
+            ("descriptions", self.descriptions, DESCRIPTION_TEMPLATES),
+            ("flags", self.flags, FLAG_VALUES),
+            ("labels", self.labels, FACTOR_LABELS),
+            ("summaries", self.summaries, SUMMARY_TEMPLATES),
+        ):
+            if set(table) != set(expected):
+                raise ValueError(
+                    f"Locale {self.locale!r} {section} must cover exactly: {sorted(expected)}"
+                )
+        if self.status_counts and set(self.status_counts) != set(STATUS_COUNT_KINDS):
+            raise ValueError(
+                f"Locale {self.locale!r} status_counts must cover exactly: {sorted(STATUS_COUNT_KINDS)}"
+            )
+
+    @classmethod
+    def english(cls) -> "MessageCatalog":
+        return cls(DEFAULT_LOCALE, {
+            "name": "English",
+            "labels": FACTOR_LABELS,
+            "descriptions": DESCRIPTION_TEMPLATES,
+            "flags": FLAG_VALUES,
+            "values": VALUE_TEMPLATES,
+            "summaries": SUMMARY_TEMPLATES,
+            "concerns": REFUSAL_CONCERNS,
+        })
+
+    def extend(self, locale: str, overrides: dict) -> "MessageCatalog":
+        """A catalog for `locale` with `overrides` (a parsed locale file) over this one."""
+        unknown = set(overrides) - set(self.SECTIONS) - {"name"}
+        if unknown:
+            raise ValueError(f"Unknown sections in locale {locale!r}: {sorted(unknown)}")
+        concerns = dict(self.concerns)
+        for key, text in overrides.get("concerns", {}).items():
+            key = _pair_key(key, "concerns")
+            if key not in concerns:
+                raise ValueError(f"Unknown concern {key} in locale {locale!r}")
+            concerns[key] = text
+        return MessageCatalog(locale, {
+            "name": overrides.get("name", locale),
+            "labels": {**self.labels, **overrides.get("labels", {})},
+            "descriptions": {
+                **self.descriptions,
+                **{_pair_key(k, "descriptions"): v for k, v in overrides.get("descriptions", {}).items()},
+            },
+            "flags": {
+                **self.flags,
+                **{_pair_key(k, "flags"): v for k, v in overrides.get("flags", {}).items()},
+            },
+            "values": {**self.values, **overrides.get("values", {})},
+            "summaries": {**self.summaries, **overrides.get("summaries", {})},
+            "concerns": tuple((key, concerns[key]) for key, _ in self.concerns),
+            "farm_types": {**self.farm_types, **overrides.get("farm_types", {})},
+            "volatility": {**self.volatility, **overrides.get("volatility", {})},
+            "statuses": {**self.statuses, **overrides.get("statuses", {})},
+            "status_counts": {**self.status_counts, **overrides.get("status_counts", {})},
+        })
+
+    def experience(self, years: int) -> str:
+        text = self._experience.get(years)
+        if text is None:
+            text = self._experience[years] = self.values["experience"].format(years=years)
+        return text
+
+    def revenue(self, revenue: float, volatility: str) -> str:
+        key = (revenue, volatility)
+        text = self._revenue.get(key)
+        if text is None:
+            if len(self._revenue) >= DESCRIPTION_CACHE_SIZE:
+                self._revenue.clear()
+            text = self._revenue[key] = self.values["revenue"].format(
+                revenue=revenue, volatility=self.volatility.get(volatility, volatility)
+            )
+        return text
+
+    def farm_type(self, farm_type: str) -> str:
+        text = self.farm_types.get(farm_type)
+        return text if text is not None else _readable(farm_type).title()
+
+    def status(self, status: str) -> str:
+        """A fixed status name, else the late / on-time counts it parses to."""
+        text = self.statuses.get(status)
+        if text is not None:
+            return text
+        text = self._statuses.get(status)
+        if text is None:
+            if len(self._statuses) >= DESCRIPTION_CACHE_SIZE:
+                self._statuses.clear()
+            text = self._statuses[status] = self._render_status(status)
+        return text
+
+    def _render_status(self, status: str) -> str:
+        if not self.status_counts:
+            return _readable(status)
+        parsed = parse_status(status)
+        counts = {"on_time": parsed.on_time_count, "late": parsed.late_count}
+        parts = [self.status_counts[kind].format(n=counts[kind]) for kind in STATUS_COUNT_KINDS if counts[kind]]
+        return ", ".join(parts) if parts else _readable(status)
+
+    def render_description(self, factor: str, bracket: str, value, points: float) -> str:
+        """The description of one factor, rendered once per distinct input."""
+        key = (factor, bracket, value, points)
+        text = self._descriptions.get(key)
+        if text is None:
+            if len(self._descriptions) >= DESCRIPTION_CACHE_SIZE:
+                self._descriptions.clear()
+            text = self._descriptions[key] = self.descriptions[factor, bracket].format(value=value, points=points)
+        return text
+
+
+ENGLISH = MessageCatalog.english()
+
+_catalogs = {DEFAULT_LOCALE: ENGLISH}
+
+
+def load_catalogs(directory: str = LOCALES_DIR) -> dict:
+    """Compile every locale file in `directory` and make them the available catalogs."""
+    global _catalogs
+    catalogs = {DEFAULT_LOCALE: ENGLISH}
+    if os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            locale, ext = os.path.splitext(filename)
+            if ext != ".json":
+                continue
+            with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+            locale = locale.lower()
+            catalogs[locale] = ENGLISH.extend(locale, overrides)
+    _catalogs = catalogs
+    return catalogs
+
+
+def available_locales() -> dict:
+    """Locale tag -> display name of every loaded catalog."""
+    return {locale: catalog.name for locale, catalog in _catalogs.items()}
+
+
+def get_messages(locale: Optional[str] = None) -> MessageCatalog:
+    """The catalog for `locale`, or English if it is not loaded."""
+    return _catalogs.get(locale, ENGLISH) if locale else ENGLISH
+
+
+def negotiate_locale(accept_language: Optional[str]) -> str:
+    """
+    The loaded locale that best matches an Accept-Language header, by
+    q-value and then header order; a region tag ("az-AZ") matches its
+    language ("az"). Falls back to English.
+    """
+    if not accept_language:
+        return DEFAULT_LOCALE
+    ranked = []
+    for position, item in enumerate(accept_language.split(",")):
+        tag, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        if tag and quality > 0:
+            ranked.append((-quality, position, tag.strip().lower()))
+    for _, _, tag in sorted(ranked):
+        if tag == "*":
+            return DEFAULT_LOCALE
+        for candidate in (tag, tag.split("-")[0]):
+            if candidate in _catalogs:
+                return candidate
+    return DEFAULT_LOCALE
@@ -0,0 +1,292 @@
+"""
+Scoring Model
+Loads versioned scoring model definitions (weights, lookup tables, bracket
+thresholds, decision tiers) and compiles them for fast evaluation.
+
+A definition is a JSON (or, with PyYAML installed, YAML) file such as
+data/models/scoring_model.json. ScoringModel compiles it once into flat
+tuples and bisect tables shared by the scalar, batch and what-if paths.
+The active model lives in a ModelRegistry and is replaced atomically, so a
+running server can hot-swap models without restarting; every result is
+stamped with the version of the model that produced it.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from bisect import bisect_right
+from typing import Callable, Optional
+
+from engines.bnpl_history import BnplStatus
+
+FACTORS = (
+    "region",
+    "farm_type",
+    "experience",
+    "revenue",
+    "history",
+    "land_ownership",
+    "irrigation",
+    "bank_loan",
+)
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "models")
+DEFAULT_MODEL_PATH = os.environ.get(
+    "BNPL_SCORING_MODEL", os.path.join(MODELS_DIR, "scoring_model.json")
+)
+
+
+def load_model_definition(path: str) -> dict:
+    """Read a model definition from a .json or .yaml/.yml file."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML model definitions require PyYAML (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+class _Bracket:
+    """Compiled `if x >= threshold` chain: points[i] applies below thresholds[i]."""
+
+    __slots__ = ("thresholds", "points")
+
+    def __init__(self, spec: dict, name: str):
+        self.thresholds = tuple(spec["thresholds"])
+        self.points = tuple(spec["points"])
+        if len(self.points) != len(self.thresholds) + 1:
+            raise ValueError(f"Bracket '{name}' needs exactly one more point than thresholds")
+        if list(self.thresholds) != sorted(self.thresholds):
+            raise ValueError(f"Bracket '{name}' thresholds must be ascending")
+
+    def __call__(self, value: float):
+        return self.points[bisect_right(self.thresholds, value)]
+
+
+class _Tier:
+    __slots__ = ("min_score", "span", "decision", "category", "limit", "months", "late_slope", "late_floor")
+
+    def __init__(self, spec: dict):
+        self.min_score = spec["min_score"]
+        self.span = spec.get("span")
+        self.decision = spec["decision"]
+        self.category = spec["category"]
+        self.limit = tuple(spec["limit"])
+        self.months = tuple(spec["months"])
+        self.late_slope = spec["late_slope"]
+        self.late_floor = spec["late_floor"]
+
+    def scale(self, bounds: tuple, ratio: float):
+        low, high = bounds
+        if low == high:
+            return low
+        return round(low + ratio * (high - low))
+
+    def evaluate(self, risk_score: float) -> tuple:
+        ratio = (risk_score - self.min_score) / self.span if self.span else 0.0
+        return (
+            self.decision,
+            self.category,
+            self.scale(self.limit, ratio),
+            self.scale(self.months, ratio),
+            max(self.late_floor, round(100 - risk_score * self.late_slope)),
+        )
+
+
+class ScoringModel:
+    """A compiled, immutable scoring model definition."""
+
+    def __init__(self, definition: dict):
+        self.definition = definition
+        self.version = str(definition["version"])
+
+        weights = definition["weights"]
+        missing = [f for f in FACTORS if f not in weights]
+        if missing:
+            raise ValueError(f"Model {self.version} has no weight for: {', '.join(missing)}")
+        self.weights = {factor: weights[factor] for factor in FACTORS}
+        self.weight_vector = tuple(self.weights[f] for f in FACTORS)
+
+        tables = definition["tables"]
+        self.tables = {
+            name: (dict(spec["values"]), spec["default"]) for name, spec in tables.items()
+        }
+        for name in ("region", "farm_type", "volatility"):
+            if name not in self.tables:
+                raise ValueError(f"Model {self.version} is missing the '{name}' table")
+
+        brackets = definition["brackets"]
+        self.experience = _Bracket(brackets["experience"], "experience")
+        self.revenue_magnitude = _Bracket(brackets["revenue"], "revenue")
+        self.late_ratio = _Bracket(brackets["late_ratio"], "late_ratio")
+
+        revenue = definition["revenue"]
+        self.magnitude_weight = revenue["magnitude_weight"]
+        self.volatility_weight = revenue["volatility_weight"]
+
+        self.history = dict(definition["history"])
+        self.flags = {name: (spec["yes"], spec["no"]) for name, spec in definition["flags"].items()}
+
+        self.tiers = tuple(_Tier(spec) for spec in definition["tiers"])
+        floors = [t.min_score for t in self.tiers[:-1]]
+        if self.tiers[-1].min_score is not None or floors != sorted(floors, reverse=True):
+            raise ValueError(
+                f"Model {self.version} tiers must be in descending min_score order "
+                "and end with a catch-all tier (min_score null)"
+            )
+
+        confidence = definition["confidence"]
+        self.confidence_base = confidence["base"]
+        self.confidence_per_loan = confidence["per_loan"]
+        self.confidence_max_bonus = confidence["max_bonus"]
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScoringModel":
+        return cls(load_model_definition(path))
+
+    # --- Factor evaluation ---
+
+    def lookup(self, table: str, key: str):
+        values, default = self.tables[table]
+        return values.get(key, default)
+
+    def revenue_score(self, avg_monthly_revenue: float, seasonal_volatility: str) -> float:
+        magnitude = self.revenue_magnitude(avg_monthly_revenue)
+        volatility = self.lookup("volatility", seasonal_volatility)
+        return magnitude * self.magnitude_weight + volatility * self.volatility_weight
+
+    def status_score(self, status: BnplStatus):
+        """Base history score for a parsed payment status."""
+        if status.kind == "late":
+            return self.late_ratio(status.late_ratio)
+        return self.history[status.kind]
+
+    def history_score(self, count: int, status: BnplStatus):
+        history = self.history
+        if count == 0:
+            return history["no_history"]
+        bonus = min(count * history["bonus_per_loan"], history["max_bonus"])
+        return min(self.status_score(status) + bonus, history["max_score"])
+
+    def flag_score(self, flag: str, value: bool):
+        yes, no = self.flags[flag]
+        return yes if value else no
+
+    def factor_scores(self, farmer_data: dict, status: BnplStatus) -> dict:
+        """All eight raw factor scores for a farmer, given its parsed BNPL status."""
+        region_values, region_default = self.tables["region"]
+        farm_values, farm_default = self.tables["farm_type"]
+        land_yes, land_no = self.flags["land_ownership"]
+        irrigation_yes, irrigation_no = self.flags["irrigation"]
+        loan_yes, loan_no = self.flags["bank_loan"]
+        return {
+            "region": region_values.get(farmer_data["region"], region_default),
+            "farm_type": farm_values.get(farmer_data["farm_type"], farm_default),
+            "experience": self.experience(farmer_data["years_experience"]),
+            "revenue": self.revenue_score(
+                farmer_data["average_monthly_revenue"], farmer_data["seasonal_revenue_volatility"]
+            ),
+            "history": self.history_score(farmer_data["previous_bnpl_count"], status),
+            "land_ownership": land_yes if farmer_data.get("land_ownership", False) else land_no,
+            "irrigation": irrigation_yes if farmer_data.get("has_irrigation", False) else irrigation_no,
+            "bank_loan": loan_yes if farmer_data.get("has_bank_loan", False) else loan_no,
+        }
+
+    # --- Aggregation ---
+
+    def weighted_score(self, raw: dict) -> float:
+        """Weighted sum of raw factor scores (left to right), rounded to 0.1."""
+        w = self.weight_vector
+        total = raw[FACTORS[0]] * w[0]
+        for i in range(1, len(FACTORS)):
+            total = total + raw[FACTORS[i]] * w[i]
+        return round(total, 1)
+
+    def tier(self, risk_score: float) -> tuple:
+        """(decision, category, bnpl_limit, installment_months, late_probability)"""
+        for tier in self.tiers[:-1]:
+            if risk_score >= tier.min_score:
+                return tier.evaluate(risk_score)
+        return self.tiers[-1].evaluate(risk_score)
+
+    def confidence(self, previous_bnpl_count: int) -> float:
+        bonus = min(previous_bnpl_count * self.confidence_per_loan, self.confidence_max_bonus)
+        return round(self.confidence_base + bonus, 1)
+
+
+class ModelRegistry:
+    """
+    Holds the active ScoringModel and swaps it atomically when the
+    definition file changes or reload() is called.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._model: Optional[ScoringModel] = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_swap_listener(self, callback: Callable[[ScoringModel], None]) -> None:
+        """Call `callback(new_model)` after every model swap."""
+        self._listeners.append(callback)
+
+    @property
+    def active(self) -> ScoringModel:
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._load_locked()
+            model = self._model
+        return model
+
+    def _load_locked(self) -> ScoringModel:
+        mtime = os.path.getmtime(self.path)
+        model = ScoringModel.from_file(self.path)
+        self._swap_locked(model)
+        self._mtime = mtime
+        return model
+
+    def _swap_locked(self, model: ScoringModel) -> None:
+        self._model = model
+        for callback in self._listeners:
+            callback(model)
+
+    def reload(self) -> ScoringModel:
+        """Recompile the definition file and make it active. Raises on invalid definitions."""
+        with self._lock:
+            return self._load_locked()
+
+    def activate(self, model: ScoringModel) -> None:
+        """Make an already compiled model active."""
+        with self._lock:
+            self._swap_locked(model)
+
+    def refresh_if_changed(self) -> bool:
+        """Reload if the file's mtime changed; an invalid file keeps the current model."""
+        with self._lock:
+            try:
+                if os.path.getmtime(self.path) != self._mtime:
+                    self._load_locked()
+                    return True
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        return False
+
+    async def watch(self) -> None:
+        """Poll the definition file every `reload_interval` seconds off the event loop."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await asyncio.to_thread(self.refresh_if_changed)
+
+
+registry = ModelRegistry(DEFAULT_MODEL_PATH)
+
+
+def get_active_model() -> ScoringModel:
+    return registry.active
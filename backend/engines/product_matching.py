@@ -4,8 +4,14 @@ Matches agricultural products to farmer profiles based on crop type,
 farm size, budget, and seasonal timing.
 """
 
+import hashlib
 import json
 import os
+from functools import lru_cache
+from typing import Optional
+
+from engines.basket import fit_to_budget
+from engines.instrumentation import timed
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 
@@ -15,43 +21,128 @@ def load_products() -> list:
         return json.load(f)
 
 
-def match_products(farmer_data: dict, bnpl_limit: float) -> dict:
+# Entries kept by each per-catalog memo; crop types and requested names come
+# from clients, so the memos are LRU-bounded rather than growing per string
+CATALOG_MEMO_SIZE = 1024
+
+# Requested-product aliases that do not substring-match their category
+REQUEST_ALIASES = {
+    "organic_seeds": "seeds",
+    "organic_fertilizer": "fertilizer",
+}
+
+
+def _category_priority(category: str) -> str:
+    if category in ["seeds", "animal_feed"]:
+        return "high"
+    elif category in ["fertilizer", "veterinary_supplies"]:
+        return "high"
+    elif category in ["pesticide", "irrigation"]:
+        return "medium"
+    return "low"
+
+
+class ProductCatalog:
+    """
+    Product list indexed for matching.
+
+    Products are bucketed by compatible crop (with the "all" products merged
+    into every bucket, preserving catalog order) and by category, and
+    requested-product names are resolved to category sets once and cached.
+    The candidates for a (crop, wanted categories) pair are also cached, so
+    farmers with the same crop and requests share one scan of the bucket.
+    Each of these memos keeps the CATALOG_MEMO_SIZE most recently used keys.
+    """
+
+    def __init__(self, products: list):
+        self.products = products
+        # Content hash of the product list, identifies the catalog version
+        payload = json.dumps(products, sort_keys=True, separators=(",", ":"))
+        self.version = hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+        self.categories = []
+        self.by_category = {}
+        self._universal = []
+        self._by_crop = {}
+        self.for_crop = lru_cache(maxsize=CATALOG_MEMO_SIZE)(self._for_crop)
+        self.candidates = lru_cache(maxsize=CATALOG_MEMO_SIZE)(self._candidates)
+        self.resolve_request = lru_cache(maxsize=CATALOG_MEMO_SIZE)(self._resolve_request)
+
+        for position, product in enumerate(products):
+            category = product["category"]
+            if category not in self.by_category:
+                self.categories.append(category)
+            self.by_category.setdefault(category, []).append(product)
+            entry = (position, product, category, _category_priority(category))
+            compatible = product["compatible_crops"]
+            if "all" in compatible:
+                self._universal.append(entry)
+            for crop in compatible:
+                if crop != "all":
+                    self._by_crop.setdefault(crop, []).append(entry)
+
+    def _for_crop(self, crop_type: str) -> list:
+        """Products compatible with a crop, in catalog order."""
+        merged = {e[0]: e for e in self._by_crop.get(crop_type, []) + self._universal}
+        return [merged[position] for position in sorted(merged)]
+
+    def _candidates(self, crop_type: str, wanted: frozenset) -> list:
+        """Products compatible with a crop and in one of the `wanted` categories, in catalog order."""
+        return [entry for entry in self.for_crop(crop_type) if entry[2] in wanted]
+
+    def _resolve_request(self, requested: str) -> frozenset:
+        """Categories a requested product name refers to."""
+        return frozenset(
+            category for category in self.categories
+            if requested in category or category in requested
+            or REQUEST_ALIASES.get(requested) == category
+        )
+
+    def resolve_requests(self, requested: list) -> frozenset:
+        categories = frozenset()
+        for name in requested:
+            categories = categories | self.resolve_request(name)
+        return categories
+
+
+_catalog = None
+
+
+def get_catalog() -> ProductCatalog:
+    """
+    Shared catalog, built from products.json on first use and kept for the
+    life of the process: product changes need a restart.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = ProductCatalog(load_products())
+    return _catalog
+
+
+@timed("matching")
+def match_products(
+    farmer_data: dict,
+    bnpl_limit: float,
+    catalog: Optional[ProductCatalog] = None,
+    solver: str = "greedy",
+) -> dict:
     """
     Match products to a farmer profile based on:
     - Crop type compatibility
     - Farm size requirements
     - Budget constraints (BNPL limit)
     - Requested product categories
+
+    `solver` selects the budget fitting strategy (see engines.basket).
     """
-    products = load_products()
+    catalog = catalog or get_catalog()
     crop_type = farmer_data["crop_type"]
     farm_size = farmer_data["farm_size_hectares"]
     budget = min(farmer_data.get("requested_amount", bnpl_limit), bnpl_limit)
-    requested_categories = farmer_data.get("requested_products", [])
+    wanted = catalog.resolve_requests(farmer_data.get("requested_products", []))
 
     recommendations = []
 
-    for product in products:
-        compatible = product["compatible_crops"]
-        if crop_type not in compatible and "all" not in compatible:
-            continue
-
-        category = product["category"]
-        # Map requested product names to categories
-        category_match = False
-        for req in requested_categories:
-            if req in category or category in req:
-                category_match = True
-                break
-            # Handle special mappings
-            if req == "organic_seeds" and category == "seeds":
-                category_match = True
-            elif req == "organic_fertilizer" and category == "fertilizer":
-                category_match = True
-
-        if not category_match:
-            continue
-
+    for _, product, category, priority in catalog.candidates(crop_type, wanted):
         # Calculate quantity and price
         qty_per_ha = product.get("quantity_per_hectare", 0)
         if qty_per_ha > 0:
@@ -65,16 +156,6 @@ def match_products(farmer_data: dict, bnpl_limit: float) -> dict:
         # Calculate match score
         match_score = _calculate_match_score(product, farmer_data)
 
-        # Determine priority
-        if category in ["seeds", "animal_feed"]:
-            priority = "high"
-        elif category in ["fertilizer", "veterinary_supplies"]:
-            priority = "high"
-        elif category in ["pesticide", "irrigation"]:
-            priority = "medium"
-        else:
-            priority = "low"
-
         recommendations.append({
             "product_id": product["product_id"],
             "category": category,
@@ -93,29 +174,17 @@ def match_products(farmer_data: dict, bnpl_limit: float) -> dict:
         key=lambda x: (priority_order.get(x["priority"], 3), -x["match_score"])
     )
 
-    # Trim to budget - fit products within budget, reducing quantities if needed
-    total_cost = 0
-    budget_recommendations = []
-    for rec in recommendations:
-        remaining = budget - total_cost
-        if remaining <= 0:
-            break
-        if rec["estimated_price"] <= remaining:
-            total_cost += rec["estimated_price"]
-            budget_recommendations.append(rec)
-        elif remaining >= 100:
-            # Include at reduced quantity to fit budget
-            ratio = remaining / rec["estimated_price"]
-            rec["estimated_price"] = round(remaining)
-            rec["estimated_quantity"] = f"~{round(ratio * 100)}% of full quantity"
-            total_cost += rec["estimated_price"]
-            budget_recommendations.append(rec)
-
-    return {
+    # Trim to budget - fit products within budget
+    budget_recommendations, total_cost, solver_used = fit_to_budget(recommendations, budget, solver)
+
+    result = {
         "farmer_id": farmer_data["farmer_id"],
         "recommendations": budget_recommendations,
         "total_estimated_cost": total_cost,
     }
+    if solver != "greedy":
+        result["solver"] = solver_used
+    return result
 
 
 def _calculate_match_score(product: dict, farmer_data: dict) -> int:
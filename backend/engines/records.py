@@ -0,0 +1,131 @@
+"""
+Compact Farmer Records
+A memory-compact, read-only farmer representation for large in-process books.
+
+A farmer dict carries its own hash table of 16 string keys, and every
+string value is a separate object per row. FarmerRecord stores the same
+fields in `__slots__` (no per-row dict), interns the enum-like strings
+(region, farm_type, crop_type, volatility, BNPL status) so rows share
+one object per distinct value, and shares one tuple per distinct
+requested-products list.
+
+FarmerRecord implements the read-only mapping protocol (`record["region"]`,
+`record.get(...)`, `**record`), so calculate_risk_score, match_products,
+generate_explanation and the what-if engine accept it in place of a dict.
+"""
+
+import sys
+from collections.abc import Mapping
+
+import pandas as pd
+
+FARMER_FIELDS = (
+    "farmer_id",
+    "name",
+    "region",
+    "farm_type",
+    "crop_type",
+    "farm_size_hectares",
+    "years_experience",
+    "previous_bnpl_count",
+    "previous_bnpl_status",
+    "average_monthly_revenue",
+    "seasonal_revenue_volatility",
+    "land_ownership",
+    "has_irrigation",
+    "has_bank_loan",
+    "requested_amount",
+    "requested_products",
+)
+_FIELD_SET = frozenset(FARMER_FIELDS)
+
+# Low-cardinality string fields shared across rows
+INTERNED_FIELDS = ("region", "farm_type", "crop_type", "previous_bnpl_status", "seasonal_revenue_volatility")
+
+_product_lists = {}
+
+
+def _shared_products(products) -> tuple:
+    key = tuple(sys.intern(p) for p in products)
+    return _product_lists.setdefault(key, key)
+
+
+class FarmerRecord(Mapping):
+    """Slotted, read-only farmer profile. Optional fields may be absent."""
+
+    __slots__ = FARMER_FIELDS
+
+    def __init__(self, **fields):
+        for field, value in fields.items():
+            if field not in _FIELD_SET:
+                raise TypeError(f"Unknown farmer field: {field}")
+            if field in INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            elif field == "requested_products" and value is not None:
+                value = _shared_products(value)
+            object.__setattr__(self, field, value)
+
+    @classmethod
+    def from_dict(cls, farmer: Mapping) -> "FarmerRecord":
+        return cls(**farmer)
+
+    def to_dict(self) -> dict:
+        data = dict(self.items())
+        if "requested_products" in data:
+            data["requested_products"] = list(data["requested_products"])
+        return data
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FarmerRecord is read-only")
+
+    def __getitem__(self, key: str):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return default
+
+    def __contains__(self, key) -> bool:
+        return key in _FIELD_SET and hasattr(self, key)
+
+    def __iter__(self):
+        return (field for field in FARMER_FIELDS if hasattr(self, field))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        return (_rebuild, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"FarmerRecord({self.to_dict()!r})"
+
+
+def _rebuild(data: dict) -> FarmerRecord:
+    return FarmerRecord(**data)
+
+
+def to_records(farmers) -> list:
+    """Convert farmer dicts to FarmerRecords."""
+    return [FarmerRecord(**farmer) for farmer in farmers]
+
+
+def records_frame(records: list) -> pd.DataFrame:
+    """
+    Column-wise frame of FarmerRecords for score_batch, with the
+    enum-like fields as pandas categoricals.
+    """
+    columns = {}
+    for field in FARMER_FIELDS:
+        values = [record.get(field) for record in records]
+        if field in INTERNED_FIELDS:
+            columns[field] = pd.Categorical(values)
+        else:
+            columns[field] = values
+    return pd.DataFrame(columns)
@@ -0,0 +1,88 @@
+"""
+What-If Scoring Engine
+Answers "what happens if this farmer gets irrigation / pays off the bank
+loan / ..." for many scenarios at once.
+
+The risk score is a weighted sum of eight independent factors, so each
+scenario only re-evaluates the factors whose input fields it overrides and
+reuses the base farmer's raw scores for the rest. The sum, rounding and
+decision tier are then applied exactly as in calculate_risk_score, so a
+scenario result always equals a full re-score of the overridden profile.
+"""
+
+from typing import Optional
+
+from engines.instrumentation import timed
+from engines.model import ScoringModel, get_active_model
+from engines.scoring import FACTOR_INPUTS, calculate_factor_score, calculate_risk_score
+
+# Inverse of FACTOR_INPUTS: farmer field -> factors that read it
+FIELD_FACTORS = {}
+for _factor, _fields in FACTOR_INPUTS.items():
+    for _field in _fields:
+        FIELD_FACTORS.setdefault(_field, []).append(_factor)
+
+
+def _affected_factors(overrides: dict) -> list:
+    factors = []
+    for field in overrides:
+        for factor in FIELD_FACTORS.get(field, ()):
+            if factor not in factors:
+                factors.append(factor)
+    return factors
+
+
+def evaluate_scenario(
+    farmer_data: dict, base: dict, overrides: dict, model: Optional[ScoringModel] = None
+) -> dict:
+    """Score one set of field overrides against a precomputed base result."""
+    model = model or get_active_model()
+    affected = _affected_factors(overrides)
+    raw = base["raw_scores"]
+    if affected:
+        scenario_farmer = {**farmer_data, **overrides}
+        raw = dict(raw)
+        for factor in affected:
+            raw[factor] = calculate_factor_score(factor, scenario_farmer, model)
+
+    risk_score = model.weighted_score(raw)
+    decision, category, bnpl_limit, installment_months, late_probability = model.tier(risk_score)
+    count = overrides.get("previous_bnpl_count", farmer_data.get("previous_bnpl_count", 0))
+
+    base_contributions = base["explanation"]
+    return {
+        "overrides": overrides,
+        "risk_score": risk_score,
+        "risk_score_delta": round(risk_score - base["risk_score"], 1),
+        "risk_category": category,
+        "decision": decision,
+        "decision_changed": decision != base["decision"],
+        "bnpl_limit": bnpl_limit,
+        "bnpl_limit_delta": bnpl_limit - base["bnpl_limit"],
+        "recommended_installment_months": installment_months,
+        "late_payment_probability": late_probability,
+        "confidence_level": model.confidence(count),
+        "contribution_deltas": {
+            factor: round(
+                round(raw[factor] * model.weights[factor], 1) - base_contributions[f"{factor}_contribution"], 1
+            )
+            for factor in affected
+        },
+    }
+
+
+@timed("what_if")
+def run_scenarios(farmer_data: dict, scenarios: list, base: Optional[dict] = None) -> dict:
+    """
+    Score the base farmer once (or reuse `base`, its calculate_risk_score
+    result), then every scenario incrementally.
+    """
+    model = get_active_model()
+    if base is None or base.get("model_version") != model.version:
+        base = calculate_risk_score(farmer_data, model)
+    return {
+        "farmer_id": farmer_data["farmer_id"],
+        "model_version": model.version,
+        "base": base,
+        "scenarios": [evaluate_scenario(farmer_data, base, overrides, model) for overrides in scenarios],
+    }
@@ -0,0 +1,175 @@
+"""
+Listing Queries
+Cursor-paginated, filtered, sorted and field-projected views over a list
+of row dicts (farmer profiles, summary rows).
+
+A ListingIndex is built once per dataset version: a hash index per filter
+field and a sorted (key, farmer_id) index per sort field. A page walks
+the sort index from the cursor position and stops after `limit` matches,
+so its cost depends on the page size rather than the size of the book.
+Cursors are opaque keyset positions (last sort key + farmer_id), so pages
+stay consistent while rows are added or removed between requests.
+"""
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(key, farmer_id: str) -> str:
+    payload = json.dumps([key, farmer_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, farmer_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return key, farmer_id
+
+
+def parse_fields(fields: Optional[str], available) -> Optional[list]:
+    """Split a comma-separated projection, rejecting unknown field names."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if available and unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def parse_sort(sort: str) -> tuple:
+    """`field` sorts ascending, `-field` descending."""
+    if sort.startswith("-"):
+        return sort[1:], True
+    return sort, False
+
+
+class ListingIndex:
+    """Filter and sort indexes over one immutable version of a row list."""
+
+    def __init__(self, rows: list, filter_fields: tuple, sort_fields: tuple, range_field: Optional[str] = None):
+        self.rows = rows
+        self.filter_fields = filter_fields
+        self.sort_fields = sort_fields
+        self.range_field = range_field
+        self.fields = set(rows[0]) if rows else set()
+        if range_field is not None and range_field not in sort_fields:
+            raise ValueError("range_field must also be a sort field")
+
+        # One pass over the rows, so lazily decoded rows are each read once
+        self._by_value = {field: {} for field in filter_fields}
+        columns = {field: [] for field in (*sort_fields, "farmer_id")}
+        for position, row in enumerate(rows):
+            for field in filter_fields:
+                self._by_value[field].setdefault(row[field], []).append(position)
+            for field, column in columns.items():
+                column.append(row[field])
+        self._range_values = columns[range_field] if range_field is not None else None
+
+        ids = columns["farmer_id"]
+        self._order = {}
+        for field in sort_fields:
+            values = columns[field]
+            ordered = sorted(range(len(ids)), key=lambda p: (values[p], ids[p]))
+            self._order[field] = ([(values[p], ids[p]) for p in ordered], ordered)
+
+    def _candidates(self, filters: dict) -> Optional[set]:
+        """Positions matching all equality filters (None when unfiltered)."""
+        candidates = None
+        for field, value in filters.items():
+            if value is None:
+                continue
+            if field not in self._by_value:
+                raise ValueError(f"Cannot filter on '{field}'")
+            positions = self._by_value[field].get(value, ())
+            candidates = set(positions) if candidates is None else candidates.intersection(positions)
+        return candidates
+
+    def query(
+        self,
+        filters: Optional[dict] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        sort: str = "farmer_id",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[list] = None,
+    ) -> dict:
+        """
+        One page of rows matching `filters` (field -> value) and the
+        inclusive [min_value, max_value] range on `range_field`.
+        Returns the projected items, the total match count and the cursor
+        of the next page (None on the last page).
+        """
+        field, descending = parse_sort(sort)
+        if field not in self._order:
+            raise ValueError(f"Cannot sort by '{field}'; use one of: {', '.join(self.sort_fields)}")
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        candidates = self._candidates(filters or {})
+        ranged = min_value is not None or max_value is not None
+        low = float("-inf") if min_value is None else min_value
+        high = float("inf") if max_value is None else max_value
+        rows = self.rows
+        range_field = self.range_field
+        range_values = self._range_values
+
+        def matches(position: int) -> bool:
+            if candidates is not None and position not in candidates:
+                return False
+            return not ranged or low <= range_values[position] <= high
+
+        keys, ordered = self._order[field]
+        if field == range_field and ranged:
+            # The range is contiguous in this sort order
+            start, stop = self._range_bounds(keys, low, high)
+        else:
+            start, stop = 0, len(keys)
+
+        if cursor is not None:
+            position = tuple(decode_cursor(cursor))
+            try:
+                if descending:
+                    stop = min(stop, bisect_left(keys, position))
+                else:
+                    start = max(start, bisect_right(keys, position))
+            except TypeError:
+                raise ValueError("Cursor does not match the sort order")
+
+        if candidates is not None:
+            total = sum(1 for p in candidates if matches(p))
+        elif ranged:
+            range_start, range_stop = self._range_bounds(self._order[range_field][0], low, high)
+            total = range_stop - range_start
+        else:
+            total = len(rows)
+
+        # Collect one row past the page to know whether another page follows
+        walk = range(stop - 1, start - 1, -1) if descending else range(start, stop)
+        page = []
+        for i in walk:
+            if matches(ordered[i]):
+                page.append(i)
+                if limit is not None and len(page) > limit:
+                    break
+        next_cursor = None
+        if limit is not None and len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(*keys[page[-1]])
+
+        page = [rows[ordered[i]] for i in page]
+        if fields is not None:
+            page = [{name: row[name] for name in fields} for row in page]
+        return {"items": page, "total": total, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _range_bounds(keys: list, low: float, high: float) -> tuple:
+        return bisect_left(keys, (low,)), bisect_right(keys, (high, "\uffff"))
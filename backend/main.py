@@ -3,25 +3,145 @@ BNPL Risk Scoring Engine - FastAPI Application
 Digital Umbrella Aqrar Challenge
 """
 
-import json
+import asyncio
+import hmac
+import logging
 import os
-from typing import Optional
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Iterator, Literal, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from engines.scoring import calculate_risk_score
-from engines.product_matching import match_products
-from engines.explainability import generate_explanation
+from engines.model import registry as model_registry
+from engines.batch_scoring import score_batch, to_score_results
+from engines.what_if import run_scenarios
+from engines.product_matching import get_catalog, match_products
+from engines.explainability import generate_explanation, generate_explanations
+from engines.messages import available_locales, load_catalogs, negotiate_locale
+from engines.instrumentation import set_observer, stage
+from repository import FarmerRepository
+from cache import ResultCache, content_hash
+from store import open_store
+from responses import EncodedJSON, FastJSONResponse, dumps, encoded_response
+from portfolio import DIMENSIONS, Portfolio
+from listing import ListingIndex, parse_fields
+from bulk import iter_csv_rows, iter_ndjson_rows, stream_scores
+from shadow import ShadowScorer, load_challengers
+from metrics import Metrics, MetricsMiddleware, admission_collector, cache_collector
+from admission import AdmissionController, AdmissionMiddleware, class_from_env
+from profiler import MAX_SECONDS as MAX_PROFILE_SECONDS, SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+# BNPL_FARMERS_PATH may point at a compiled columnar file (see serve.py)
+farmer_repository = FarmerRepository(os.environ.get("BNPL_FARMERS_PATH", os.path.join(DATA_DIR, "farmers.json")))
+result_cache = ResultCache()
+farmer_repository.add_reload_listener(result_cache.clear)
+model_registry.add_swap_listener(lambda model: result_cache.clear())
+portfolio = Portfolio()
+# Opened in lifespan, so importing the app never creates or touches the file
+score_store = None
+STORE_REFRESH_INTERVAL = 2.0
+# Workers started by serve.py only read the store; the launcher refreshes it
+STORE_REFRESH = os.environ.get("BNPL_STORE_REFRESH", "1") != "0"
+shadow_scorer = ShadowScorer(
+    os.environ.get("BNPL_SHADOW_DB", os.path.join(DATA_DIR, "shadow_results.sqlite3")),
+    load_challengers(),
+    sample_rate=float(os.environ.get("BNPL_SHADOW_SAMPLE_RATE", "1.0")),
+)
+# BNPL_METRICS=0 leaves the engines' timing hooks uninstalled and drops the middleware
+metrics = Metrics() if os.environ.get("BNPL_METRICS", "1") != "0" else None
+if metrics is not None:
+    set_observer(metrics.observe_stage)
+    metrics.add_collector(cache_collector(result_cache))
+# Whole-book endpoints get their own small concurrency limit and queue, so
+# they cannot crowd out single-farmer requests (BNPL_ADMISSION=0 disables)
+BATCH_ROUTES = {
+    ("POST", "/api/v1/risk-score/batch"): "batch",
+    ("POST", "/api/v1/risk-score/stream"): "batch",
+    ("POST", "/api/v1/dashboard/bulk"): "batch",
+    ("GET", "/api/v1/dashboard/all/summary"): "batch",
+    ("GET", "/api/v1/portfolio"): "batch",
+    ("GET", "/api/v1/admission"): None,
+    ("POST", "/api/v1/admin/profile"): None,
+}
+admission = None
+if os.environ.get("BNPL_ADMISSION", "1") != "0":
+    admission = AdmissionController(
+        [class_from_env("interactive", 64, 256, 2.0), class_from_env("batch", 1, 8, 30.0)],
+        BATCH_ROUTES,
+        prefixes=[("/api/v1/", "interactive")],
+    )
+    if metrics is not None:
+        metrics.add_collector(admission_collector(admission))
+# Admin endpoints (model reload, profiling) are only served when a token is configured
+ADMIN_TOKEN = os.environ.get("BNPL_ADMIN_TOKEN", "")
+_profile_lock = asyncio.Lock()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global score_store
+    score_store = await asyncio.to_thread(open_store)
+    # Parse the datasets once up front so no request pays for it, and
+    # watch for changes in the background so no request touches the disk
+    await farmer_repository.aload()
+    await asyncio.to_thread(get_catalog)
+    await asyncio.to_thread(lambda: model_registry.active)
+    await asyncio.to_thread(load_catalogs)
+    await current_portfolio()
+    watchers = [
+        asyncio.create_task(farmer_repository.watch()),
+        asyncio.create_task(model_registry.watch()),
+    ]
+    if score_store is not None and STORE_REFRESH:
+        watchers.append(asyncio.create_task(refresh_score_store()))
+    shadow_scorer.start()
+    yield
+    for watcher in watchers:
+        watcher.cancel()
+    await asyncio.to_thread(shadow_scorer.stop)
+    if score_store is not None:
+        score_store.close()
+        score_store = None
+
+
+async def refresh_score_store() -> None:
+    """Re-score stale rows of the score store whenever the farmers, model or catalog change."""
+    synced = None
+    while True:
+        current = (farmer_repository.version, model_registry.active.version, get_catalog().version)
+        if current != synced:
+            try:
+                farmers, fingerprints = farmer_repository.all_with_fingerprints()
+                await asyncio.to_thread(score_store.refresh, farmers, fingerprints=fingerprints)
+                synced = current
+            except Exception:
+                # Reads fall back to computing on the fly; retry on the next poll
+                logger.exception("Score store refresh failed")
+        await asyncio.sleep(STORE_REFRESH_INTERVAL)
+
 
 app = FastAPI(
     title="BNPL Risk Scoring Engine",
     description="AI-based BNPL Risk Scoring and Product Matching for Agricultural Trade Platform",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Added first so it runs inside CORS: shed responses still carry CORS headers
+if admission is not None:
+    app.add_middleware(AdmissionMiddleware, controller=admission)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,21 +149,247 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
-
+if metrics is not None:
+    app.add_middleware(
+        MetricsMiddleware, metrics=metrics, timing_header=os.environ.get("BNPL_SERVER_TIMING", "1") != "0"
+    )
 
 def load_farmers() -> list:
-    with open(os.path.join(DATA_DIR, "farmers.json"), "r", encoding="utf-8") as f:
-        return json.load(f)
+    return farmer_repository.all()
 
 
 def get_farmer_by_id(farmer_id: str) -> Optional[dict]:
-    farmers = load_farmers()
-    for farmer in farmers:
-        if farmer["farmer_id"] == farmer_id:
-            return farmer
-    return None
+    with stage("lookup"):
+        return farmer_repository.get(farmer_id)
+
+
+def stored_risk_score(farmer: dict) -> Optional[dict]:
+    """The persisted score for this exact profile and model version, if any."""
+    store = score_store
+    if store is None:
+        return None
+    return store.get_score(farmer["farmer_id"], content_hash(farmer), model_registry.active.version)
+
+
+def stored_product_match(farmer: dict) -> Optional[dict]:
+    """The persisted greedy product match for this profile, model and catalog, if any."""
+    store = score_store
+    if store is None:
+        return None
+    return store.get_match(
+        farmer["farmer_id"], content_hash(farmer), model_registry.active.version, get_catalog().version
+    )
+
+
+async def cached_off_loop(farmer: dict, part: str, compute: Callable[[], object]):
+    """
+    result_cache.get_or_compute() for async handlers: a hit is served on the
+    event loop, a miss (which may query the score store) runs in the thread pool.
+    """
+    value = result_cache.get(farmer, part)
+    if value is not None:
+        return value
+    return await run_in_threadpool(result_cache.get_or_compute, farmer, part, compute)
+
+
+def champion_risk_score(farmer: dict) -> tuple:
+    """
+    (score, source, seconds): the persisted score, or a freshly computed
+    one timed over the champion model alone.
+    """
+    started = time.perf_counter()
+    stored = stored_risk_score(farmer)
+    if stored is not None:
+        return stored, "store", time.perf_counter() - started
+    started = time.perf_counter()
+    return calculate_risk_score(farmer), "computed", time.perf_counter() - started
+
+
+def cached_risk_score(farmer: dict) -> dict:
+    return result_cache.get_or_compute(farmer, "risk_score", lambda: champion_risk_score(farmer)[0])
+
+
+def _cache_champion_score(farmer: dict) -> tuple:
+    """champion_risk_score() through the result cache; a concurrent fill counts as a cache hit."""
+    served = []
+
+    def compute() -> dict:
+        served.append(champion_risk_score(farmer))
+        return served[0][0]
+
+    started = time.perf_counter()
+    result = result_cache.get_or_compute(farmer, "risk_score", compute)
+    return served[0] if served else (result, "cache", time.perf_counter() - started)
+
+
+async def shadowed_risk_score(farmer: dict) -> dict:
+    """
+    The champion score as served from the result cache, the score store or
+    the model, queued for challenger scoring tagged with that source.
+    """
+    started = time.perf_counter()
+    result = result_cache.get(farmer, "risk_score")
+    if result is not None:
+        shadow_scorer.submit(farmer, result, time.perf_counter() - started, source="cache")
+        return result
+    result, source, seconds = await run_in_threadpool(_cache_champion_score, farmer)
+    shadow_scorer.submit(farmer, result, seconds, source=source)
+    return result
+
+
+async def current_portfolio() -> Portfolio:
+    """The portfolio rollups, first re-scoring farmers changed since the last sync."""
+    if not portfolio.is_current(farmer_repository.version, model_registry.active.version):
+        farmers, fingerprints = farmer_repository.all_with_fingerprints()
+        await run_in_threadpool(
+            portfolio.sync, farmers, farmer_repository.version, fingerprints=fingerprints
+        )
+    return portfolio
+
+
+def cached_product_match(farmer: dict, solver: str = "greedy") -> dict:
+    def compute() -> dict:
+        stored = stored_product_match(farmer) if solver == "greedy" else None
+        return stored or match_products(farmer, cached_risk_score(farmer)["bnpl_limit"], solver=solver)
+
+    return result_cache.get_or_compute(farmer, f"products:{solver}", compute)
+
+
+def cached_explanation(farmer: dict, detail: str = "full", locale: str = "en") -> dict:
+    return result_cache.get_or_compute(
+        farmer,
+        f"explanation:{detail}:{locale}",
+        lambda: generate_explanation(farmer, cached_risk_score(farmer), detail=detail, locale=locale),
+    )
+
+
+def request_locale(request: Request) -> str:
+    """The explanation locale negotiated from the Accept-Language header."""
+    return negotiate_locale(request.headers.get("accept-language"))
+
+
+def localized_headers(locale: str) -> dict:
+    return {"Content-Language": locale, "Vary": "Accept-Language"}
+
+
+def _encoder(build: Callable[[], object]) -> Callable[[], EncodedJSON]:
+    def encode() -> EncodedJSON:
+        content = build()
+        with stage("encode"):
+            return EncodedJSON.encode(content)
+
+    return encode
+
+
+def cached_encoded(farmer: dict, part: str, build: Callable[[], object]) -> EncodedJSON:
+    """The cached, pre-encoded JSON body of a per-farmer result."""
+    return result_cache.get_or_compute(farmer, f"{part}.json", _encoder(build))
+
+
+async def encoded_off_loop(farmer: dict, part: str, build: Callable[[], object]) -> EncodedJSON:
+    """cached_encoded() for async handlers, building a missing body in the thread pool."""
+    return await cached_off_loop(farmer, f"{part}.json", _encoder(build))
+
+
+def _dashboard_builder(farmer: dict, detail: str, locale: str) -> Callable[[], dict]:
+    return lambda: {
+        "farmer": farmer,
+        "risk_score": cached_risk_score(farmer),
+        "products": cached_product_match(farmer),
+        "explanation": cached_explanation(farmer, detail, locale),
+    }
+
+
+def encoded_dashboard(farmer: dict, detail: str, locale: str) -> EncodedJSON:
+    """The cached, pre-encoded dashboard body of one farmer."""
+    return cached_encoded(farmer, f"dashboard:{detail}:{locale}", _dashboard_builder(farmer, detail, locale))
+
+
+def prime_results(farmers: list, detail: str, locale: str) -> None:
+    """
+    Fill the result cache for several farmers at once: scores that are
+    neither cached nor stored come from one vectorized score_batch() pass,
+    and missing explanations from one generate_explanations() call.
+    """
+    unscored = []
+    scores = {}
+    missing = [farmer for farmer in farmers if "risk_score" not in result_cache.entry(farmer)]
+    for farmer in missing:
+        stored = stored_risk_score(farmer)
+        if stored is None:
+            unscored.append(farmer)
+        else:
+            scores[farmer["farmer_id"]] = stored
+    if unscored:
+        scores.update(zip((farmer["farmer_id"] for farmer in unscored), to_score_results(score_batch(unscored))))
+    for farmer in missing:
+        result_cache.get_or_compute(farmer, "risk_score", lambda farmer_id=farmer["farmer_id"]: scores[farmer_id])
+
+    part = f"explanation:{detail}:{locale}"
+    unexplained = [farmer for farmer in farmers if part not in result_cache.entry(farmer)]
+    if unexplained:
+        explanations = generate_explanations(
+            unexplained, [cached_risk_score(farmer) for farmer in unexplained], detail=detail, locale=locale
+        )
+        for farmer, explanation in zip(unexplained, explanations):
+            result_cache.get_or_compute(farmer, part, lambda explanation=explanation: explanation)
+
+
+def bulk_dashboards(farmer_ids: list, detail: str, locale: str) -> Iterator[tuple]:
+    """(farmer_id, encoded dashboard body or None if unknown) in order, computed chunk by chunk."""
+    for start in range(0, len(farmer_ids), BULK_CHUNK_SIZE):
+        chunk = farmer_ids[start:start + BULK_CHUNK_SIZE]
+        farmers = {farmer_id: get_farmer_by_id(farmer_id) for farmer_id in chunk}
+        prime_results([farmer for farmer in farmers.values() if farmer is not None], detail, locale)
+        for farmer_id in chunk:
+            farmer = farmers[farmer_id]
+            yield farmer_id, None if farmer is None else encoded_dashboard(farmer, detail, locale).body
+
+
+_catalog_body = None  # (catalog version, EncodedJSON)
+
+
+def encoded_catalog() -> EncodedJSON:
+    global _catalog_body
+    catalog = get_catalog()
+    if _catalog_body is None or _catalog_body[0] != catalog.version:
+        _catalog_body = (catalog.version, EncodedJSON.encode({
+            "products": catalog.products,
+            "total": len(catalog.products),
+            "version": catalog.version,
+        }))
+    return _catalog_body[1]
+
+
+# --- Listings ---
+
+LISTINGS = {
+    # name: (filter fields, sort fields, range field)
+    "farmers": (
+        ("region", "crop_type", "farm_type"),
+        ("farmer_id", "name", "years_experience", "farm_size_hectares", "average_monthly_revenue"),
+        None,
+    ),
+    "summaries": (
+        ("region", "farm_type", "crop_type", "decision", "risk_category"),
+        ("farmer_id", "name", "risk_score", "bnpl_limit"),
+        "risk_score",
+    ),
+}
+_listing_indexes = {}  # name -> (dataset version, ListingIndex)
+
+
+def query_listing(name: str, version, rows: Callable[[], list], filters: dict, fields=None, **query) -> dict:
+    """Query the `name` listing, (re)building its indexes when `version` changed."""
+    cached = _listing_indexes.get(name)
+    if cached is None or cached[0] != version:
+        cached = _listing_indexes[name] = (version, ListingIndex(rows(), *LISTINGS[name]))
+    index = cached[1]
+    try:
+        result = index.query(filters, fields=parse_fields(fields, index.fields), **query)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"farmers": result["items"], "total": result["total"], "next_cursor": result["next_cursor"]}
 
 
 # --- Pydantic Models ---
@@ -65,12 +411,63 @@ class RiskScoreRequest(BaseModel):
     requested_amount: float
 
 
+class ScenarioOverrides(BaseModel):
+    """Farmer fields to change in a what-if scenario; omitted fields keep their value."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    region: Optional[str] = None
+    farm_type: Optional[str] = None
+    crop_type: Optional[str] = None
+    farm_size_hectares: Optional[float] = None
+    years_experience: Optional[int] = None
+    previous_bnpl_count: Optional[int] = None
+    previous_bnpl_status: Optional[str] = None
+    average_monthly_revenue: Optional[float] = None
+    seasonal_revenue_volatility: Optional[str] = None
+    land_ownership: Optional[bool] = None
+    has_irrigation: Optional[bool] = None
+    has_bank_loan: Optional[bool] = None
+    requested_amount: Optional[float] = None
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _not_null(cls, value):
+        # Fields may be omitted, but an explicit null is not a value to score
+        if value is None:
+            raise ValueError("must not be null; omit the field to keep its value")
+        return value
+
+
+MAX_WHAT_IF_SCENARIOS = 1000
+
+
+class WhatIfRequest(BaseModel):
+    farmer_id: Optional[str] = None
+    farmer: Optional[RiskScoreRequest] = None
+    scenarios: list[ScenarioOverrides] = Field(..., max_length=MAX_WHAT_IF_SCENARIOS)
+
+
+# Uploaded bytes buffered per spool write of a streaming upload
+UPLOAD_WRITE_SIZE = 1024 * 1024
+
+MAX_INLINE_DASHBOARDS = 200
+MAX_BULK_DASHBOARDS = 5000
+BULK_CHUNK_SIZE = 100
+
+
+class BulkDashboardRequest(BaseModel):
+    farmer_ids: list[str] = Field(..., min_length=1, max_length=MAX_BULK_DASHBOARDS)
+    detail: Literal["compact", "full"] = "compact"
+
+
 class ProductMatchRequest(BaseModel):
     farmer_id: str
     crop_type: str
     farm_size_hectares: float
     budget: float
     requested_products: list[str]
+    solver: Literal["greedy", "optimal"] = "greedy"
 
 
 # --- Endpoints ---
@@ -79,7 +476,7 @@ FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fronten
 
 
 @app.get("/")
-def root():
+async def root():
     """Serve the frontend dashboard."""
     index_path = os.path.join(FRONTEND_DIR, "index.html")
     if os.path.exists(index_path):
@@ -92,14 +489,36 @@ def root():
 
 
 @app.get("/api/v1/farmers")
-def list_farmers():
-    """List all synthetic farmer profiles."""
-    farmers = load_farmers()
-    return {"farmers": farmers, "total": len(farmers)}
+async def list_farmers(
+    region: Optional[str] = None,
+    crop_type: Optional[str] = None,
+    farm_type: Optional[str] = None,
+    sort: str = "farmer_id",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+):
+    """
+    List farmer profiles. Supports filtering, sorting (`-field` for
+    descending), cursor pagination (`limit` + `next_cursor`) and field
+    projection (`fields=farmer_id,name`). Without `limit` every match is returned.
+    """
+    result = await run_in_threadpool(
+        query_listing,
+        "farmers",
+        farmer_repository.version,
+        load_farmers,
+        {"region": region, "crop_type": crop_type, "farm_type": farm_type},
+        sort=sort,
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+    )
+    return FastJSONResponse(result)
 
 
 @app.get("/api/v1/farmers/{farmer_id}")
-def get_farmer(farmer_id: str):
+async def get_farmer(farmer_id: str):
     """Get a specific farmer profile."""
     farmer = get_farmer_by_id(farmer_id)
     if not farmer:
@@ -108,25 +527,48 @@ def get_farmer(farmer_id: str):
 
 
 @app.post("/api/v1/risk-score")
-def compute_risk_score(request: RiskScoreRequest):
+async def compute_risk_score(request: RiskScoreRequest):
     """Calculate risk score for a farmer."""
     farmer_data = request.model_dump()
+    started = time.perf_counter()
     result = calculate_risk_score(farmer_data)
+    shadow_scorer.submit(farmer_data, result, time.perf_counter() - started)
     return result
 
 
 @app.get("/api/v1/risk-score/{farmer_id}")
-def get_risk_score_by_id(farmer_id: str):
+async def get_risk_score_by_id(farmer_id: str, request: Request):
     """Calculate risk score for an existing farmer by ID."""
     farmer = get_farmer_by_id(farmer_id)
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
-    result = calculate_risk_score(farmer)
-    return result
+    result = await shadowed_risk_score(farmer)
+    return encoded_response(request, await encoded_off_loop(farmer, "risk_score", lambda: result))
+
+
+@app.post("/api/v1/risk-score/what-if")
+async def what_if_scores(request: WhatIfRequest):
+    """
+    Score a grid of what-if scenarios for one farmer.
+
+    The base farmer is an existing `farmer_id` or an inline `farmer`
+    profile; each scenario lists only the fields it changes.
+    """
+    scenarios = [s.model_dump(exclude_unset=True) for s in request.scenarios]
+    # Up to MAX_WHAT_IF_SCENARIOS scorings; keep them off the event loop
+    if request.farmer is not None:
+        return await run_in_threadpool(run_scenarios, request.farmer.model_dump(), scenarios)
+    if request.farmer_id is None:
+        raise HTTPException(status_code=422, detail="Provide farmer_id or farmer")
+    farmer = get_farmer_by_id(request.farmer_id)
+    if not farmer:
+        raise HTTPException(status_code=404, detail="Farmer not found")
+    base = await cached_off_loop(farmer, "risk_score", lambda: cached_risk_score(farmer))
+    return await run_in_threadpool(run_scenarios, farmer, scenarios, base=base)
 
 
 @app.post("/api/v1/product-match")
-def compute_product_match(request: ProductMatchRequest):
+async def compute_product_match(request: ProductMatchRequest):
     """Get product recommendations for a farmer."""
     farmer = get_farmer_by_id(request.farmer_id)
     if not farmer:
@@ -134,83 +576,308 @@ def compute_product_match(request: ProductMatchRequest):
 
     # Merge request data with farmer data
     farmer_data = {**farmer, "requested_amount": request.budget, "requested_products": request.requested_products}
-    score_result = calculate_risk_score(farmer)
-    result = match_products(farmer_data, score_result["bnpl_limit"])
-    return result
+    score_result = await cached_off_loop(farmer, "risk_score", lambda: cached_risk_score(farmer))
+    if request.solver == "optimal":
+        # The basket DP takes milliseconds; keep it off the event loop
+        return await run_in_threadpool(match_products, farmer_data, score_result["bnpl_limit"], solver="optimal")
+    return match_products(farmer_data, score_result["bnpl_limit"], solver=request.solver)
 
 
 @app.get("/api/v1/product-match/{farmer_id}")
-def get_product_match_by_id(farmer_id: str):
+async def get_product_match_by_id(
+    farmer_id: str, request: Request, solver: Literal["greedy", "optimal"] = "greedy"
+):
     """Get product recommendations for an existing farmer by ID."""
     farmer = get_farmer_by_id(farmer_id)
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
-    score_result = calculate_risk_score(farmer)
-    result = match_products(farmer, score_result["bnpl_limit"])
-    return result
+    return encoded_response(
+        request, await encoded_off_loop(farmer, f"products:{solver}", lambda: cached_product_match(farmer, solver))
+    )
+
+
+@app.get("/api/v1/products")
+async def list_products(request: Request):
+    """The product catalog (pre-encoded, revalidated with ETag)."""
+    return encoded_response(request, encoded_catalog())
 
 
 @app.get("/api/v1/risk-score/{farmer_id}/explain")
-def get_explanation(farmer_id: str):
-    """Get detailed explainability report for a farmer's risk score."""
+async def get_explanation(
+    farmer_id: str, request: Request, detail: Literal["compact", "full"] = "full"
+):
+    """
+    Get detailed explainability report for a farmer's risk score.
+    `detail=compact` omits the factor descriptions and summary text.
+    """
     farmer = get_farmer_by_id(farmer_id)
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
-    score_result = calculate_risk_score(farmer)
-    explanation = generate_explanation(farmer, score_result)
-    return explanation
+    locale = request_locale(request)
+    encoded = await encoded_off_loop(
+        farmer, f"explanation:{detail}:{locale}", lambda: cached_explanation(farmer, detail, locale)
+    )
+    return encoded_response(request, encoded, localized_headers(locale))
+
+
+@app.get("/api/v1/locales")
+async def list_locales():
+    """Locales explanations can be requested in (via Accept-Language)."""
+    return {"locales": available_locales()}
 
 
 @app.post("/api/v1/risk-score/batch")
-def batch_risk_score():
+async def batch_risk_score():
     """Score all farmers in the dataset."""
-    farmers = load_farmers()
-    results = []
-    for farmer in farmers:
-        score = calculate_risk_score(farmer)
-        results.append(score)
-    return {"results": results, "total": len(results)}
+    # Encoded off the event loop too: the body covers the whole book
+    return Response(await run_in_threadpool(_score_all_farmers), media_type="application/json")
+
+
+def _score_all_farmers() -> bytes:
+    results = to_score_results(score_batch(load_farmers()))
+    return dumps({"results": results, "total": len(results)})
+
+
+@app.post("/api/v1/risk-score/stream")
+async def stream_risk_scores(request: Request):
+    """
+    Score an uploaded NDJSON or CSV stream of RiskScoreRequest rows.
+
+    Send `Content-Type: text/csv` for CSV, anything else is read as NDJSON.
+    Results are streamed back as NDJSON, one score per line.
+    """
+    # Spool the upload (to disk once it grows) so the response generator
+    # does not compete with the server for the request body. Writes are
+    # batched and run in the thread pool, since a spilled file is on disk.
+    upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    buffered = bytearray()
+    async for chunk in request.stream():
+        buffered += chunk
+        if len(buffered) >= UPLOAD_WRITE_SIZE:
+            await run_in_threadpool(upload.write, buffered)
+            buffered = bytearray()
+    await run_in_threadpool(upload.write, buffered)
+    await run_in_threadpool(upload.seek, 0)
+
+    if "csv" in request.headers.get("content-type", ""):
+        rows = iter_csv_rows(upload)
+    else:
+        rows = iter_ndjson_rows(upload)
+
+    def generate():
+        try:
+            yield from stream_scores(rows, RiskScoreRequest)
+        finally:
+            upload.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+def require_admin(request: Request) -> None:
+    """404 unless admin endpoints are enabled; 403 without the admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.get("/api/v1/model")
+async def get_scoring_model():
+    """The active scoring model version and definition."""
+    model = model_registry.active
+    return {"version": model.version, "definition": model.definition}
+
+
+@app.post("/api/v1/model/reload")
+async def reload_scoring_model(request: Request):
+    """Recompile the scoring model definition file and hot-swap it in (admin only)."""
+    require_admin(request)
+    previous = model_registry.active.version
+    try:
+        model = await asyncio.to_thread(model_registry.reload)
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(status_code=422, detail=f"Invalid scoring model definition: {exc!r}")
+    return {"previous_version": previous, "version": model.version}
+
+
+@app.get("/api/v1/store")
+async def get_store_status():
+    """Row counts and versions held by the persistent score store."""
+    store = score_store
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **(await run_in_threadpool(store.stats))}
+
+
+@app.get("/api/v1/admission")
+async def get_admission_status():
+    """Limits, in-flight and queued requests and shed counts per admission class."""
+    if admission is None:
+        return {"enabled": False}
+    return {"enabled": True, "classes": admission.stats()}
+
+
+@app.get("/api/v1/shadow/summary")
+async def get_shadow_summary():
+    """Champion/challenger comparison recorded by shadow scoring."""
+    return await asyncio.to_thread(shadow_scorer.summary)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, stage and cache metrics in the Prometheus text format."""
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/api/v1/admin/profile", include_in_schema=False)
+async def profile_server(
+    request: Request,
+    seconds: float = 10.0,
+    interval_ms: float = 5.0,
+    idle: bool = False,
+    format: Literal["collapsed", "json"] = "collapsed",
+):
+    """
+    Sample every thread's stack for `seconds` while the server keeps
+    serving, and return collapsed stacks (flamegraph.pl / speedscope
+    input) or a JSON summary of the hottest functions.
+    """
+    require_admin(request)
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}]")
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 1 and 1000")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    async with _profile_lock:
+        profiler = SamplingProfiler(interval_ms / 1000, idle)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(profiler.stop)
+
+    if format == "json":
+        return FastJSONResponse(profiler.summary())
+    return PlainTextResponse(profiler.collapsed())
+
+
+@app.get("/api/v1/portfolio")
+async def get_portfolio(group_by: Optional[Literal[DIMENSIONS]] = None):
+    """
+    Portfolio analytics: approval rate, exposure (sum of bnpl_limit), score
+    histogram and risk-category mix overall and per region / farm_type /
+    crop_type (or only the `group_by` dimension).
+    """
+    return (await current_portfolio()).aggregates(group_by)
 
 
 @app.get("/api/v1/dashboard/{farmer_id}")
-def get_dashboard_data(farmer_id: str):
-    """Get all dashboard data for a farmer in a single call."""
+async def get_dashboard_data(
+    farmer_id: str, request: Request, detail: Literal["compact", "full"] = "compact"
+):
+    """
+    Get all dashboard data for a farmer in a single call. The body is
+    encoded once per farmer version; clients revalidate with If-None-Match.
+    The explanation is compact unless `detail=full`; the narrative is
+    fetched from the explain endpoint when it is shown.
+    """
     farmer = get_farmer_by_id(farmer_id)
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
 
-    score_result = calculate_risk_score(farmer)
-    product_result = match_products(farmer, score_result["bnpl_limit"])
-    explanation = generate_explanation(farmer, score_result)
-
-    return {
-        "farmer": farmer,
-        "risk_score": score_result,
-        "products": product_result,
-        "explanation": explanation,
-    }
+    locale = request_locale(request)
+    encoded = await encoded_off_loop(
+        farmer, f"dashboard:{detail}:{locale}", _dashboard_builder(farmer, detail, locale)
+    )
+    return encoded_response(request, encoded, localized_headers(locale))
+
+
+@app.post("/api/v1/dashboard/bulk")
+async def get_bulk_dashboard_data(payload: BulkDashboardRequest, request: Request):
+    """
+    Dashboard data (farmer, risk score, products, explanation) for several
+    farmers in one call. Uncached farmers are scored and explained in
+    batches. Each dashboard is identical to /api/v1/dashboard/{farmer_id}.
+
+    Up to MAX_INLINE_DASHBOARDS ids are returned as one JSON document.
+    With `Accept: application/x-ndjson`, up to MAX_BULK_DASHBOARDS are
+    streamed back one dashboard per line as they are computed.
+    """
+    farmer_ids = list(dict.fromkeys(payload.farmer_ids))
+    locale = request_locale(request)
+    headers = localized_headers(locale)
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        def generate():
+            for farmer_id, body in bulk_dashboards(farmer_ids, payload.detail, locale):
+                if body is None:
+                    body = dumps({"farmer_id": farmer_id, "error": "Farmer not found"})
+                yield body + b"\n"
+
+        return StreamingResponse(generate(), media_type="application/x-ndjson", headers=headers)
+
+    if len(farmer_ids) > MAX_INLINE_DASHBOARDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"More than {MAX_INLINE_DASHBOARDS} farmers; send Accept: application/x-ndjson to stream them",
+        )
+    results = await run_in_threadpool(lambda: list(bulk_dashboards(farmer_ids, payload.detail, locale)))
+    found = [body for _, body in results if body is not None]
+    not_found = [farmer_id for farmer_id, body in results if body is None]
+    # The dashboards are spliced in pre-encoded
+    content = b"".join((
+        b'{"dashboards":[', b",".join(found), b'],"not_found":', dumps(not_found),
+        b',"total":', str(len(found)).encode(), b"}",
+    ))
+    return Response(content, media_type="application/json", headers=headers)
 
 
 @app.get("/api/v1/dashboard/all/summary")
-def get_all_farmers_summary():
-    """Get summary scoring data for all farmers."""
-    farmers = load_farmers()
-    summaries = []
-    for farmer in farmers:
-        score = calculate_risk_score(farmer)
-        summaries.append({
-            "farmer_id": farmer["farmer_id"],
-            "name": farmer["name"],
-            "region": farmer["region"],
-            "farm_type": farmer["farm_type"],
-            "crop_type": farmer["crop_type"],
-            "risk_score": score["risk_score"],
-            "risk_category": score["risk_category"],
-            "decision": score["decision"],
-            "bnpl_limit": score["bnpl_limit"],
-            "installment_months": score["recommended_installment_months"],
-        })
-    return {"summaries": summaries, "total": len(summaries)}
+async def get_all_farmers_summary(
+    region: Optional[str] = None,
+    farm_type: Optional[str] = None,
+    crop_type: Optional[str] = None,
+    decision: Optional[str] = None,
+    risk_category: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    sort: str = "farmer_id",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+):
+    """
+    Summary scoring data for all farmers, served from the portfolio rows
+    (farmers are only re-scored when they change). Same filtering, sorting,
+    pagination and projection parameters as /api/v1/farmers, plus
+    decision, risk_category and an inclusive risk score range.
+    """
+    book = await current_portfolio()
+    result = await run_in_threadpool(
+        query_listing,
+        "summaries",
+        (book.source_version, book.model_version),
+        book.rows,
+        {
+            "region": region,
+            "farm_type": farm_type,
+            "crop_type": crop_type,
+            "decision": decision,
+            "risk_category": risk_category,
+        },
+        min_value=min_score,
+        max_value=max_score,
+        sort=sort,
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+    )
+    return FastJSONResponse({"summaries": result.pop("farmers"), **result})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,285 @@
+"""
+Metrics
+Request and engine latency histograms, payload sizes and cache hit rates,
+exposed in the Prometheus text format and as a Server-Timing header.
+
+MetricsMiddleware (plain ASGI, outermost) times every HTTP request and
+records its latency and response size per route template and its status.
+Engine stages reported through engines.instrumentation land in
+per-stage histograms and are also summed per request, so a response's
+Server-Timing header shows where its time went (e.g. `lookup`, `scoring`,
+`matching`, `explanation`, `encode`, `app`). Collectors registered with
+add_collector() contribute values read at scrape time, such as cache
+counters. Nothing here is installed when metrics are disabled.
+"""
+
+import contextvars
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable
+
+# Seconds; the default Prometheus client buckets with finer sub-millisecond steps
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Stage -> [seconds, calls] for the request being handled
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, safe to observe from several threads."""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self) -> tuple:
+        """(cumulative counts per bucket incl. +Inf, sum, count)."""
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        cumulative = []
+        running = 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total, count
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class HistogramFamily:
+    """Histograms of one metric, one per label combination."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._children = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        child = self._children.get(labels)
+        if child is None:
+            child = self._children.setdefault(labels, Histogram(self.buckets))
+        child.observe(value)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bucket_names = self.label_names + ("le",)
+        for labels, child in sorted(self._children.items()):
+            cumulative, total, count = child.samples()
+            for bound, value in zip(self.buckets + ("+Inf",), cumulative):
+                le = bound if bound == "+Inf" else _number(float(bound))
+                lines.append(f"{self.name}_bucket{_labels(bucket_names, labels + (le,))} {value}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class CounterFamily:
+    """Monotonic counters of one metric, one per label combination."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Metrics:
+    """The application's metric families and scrape-time collectors."""
+
+    def __init__(self, prefix: str = "bnpl"):
+        self.requests = CounterFamily(
+            f"{prefix}_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+        )
+        self.request_duration = HistogramFamily(
+            f"{prefix}_http_request_duration_seconds", "HTTP request latency.", ("method", "route"),
+            LATENCY_BUCKETS,
+        )
+        self.response_size = HistogramFamily(
+            f"{prefix}_http_response_size_bytes", "HTTP response body size.", ("method", "route"), SIZE_BUCKETS
+        )
+        self.stage_duration = HistogramFamily(
+            f"{prefix}_stage_duration_seconds", "Latency of engine calls and request stages.", ("stage",),
+            LATENCY_BUCKETS,
+        )
+        self._collectors = []
+
+    def add_collector(self, collector: Callable[[], list]) -> None:
+        """
+        Register `collector() -> [(name, type, help, [(labels dict, value), ...])]`,
+        called on every scrape.
+        """
+        self._collectors.append(collector)
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        """Instrumentation observer: record a stage and add it to the current request's timing."""
+        self.stage_duration.observe((stage,), seconds)
+        stages = _request_stages.get()
+        if stages is not None:
+            entry = stages.get(stage)
+            if entry is None:
+                stages[stage] = [seconds, 1]
+            else:
+                entry[0] += seconds
+                entry[1] += 1
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        labels = (method, route)
+        self.requests.inc((method, route, str(status)))
+        self.request_duration.observe(labels, seconds)
+        self.response_size.observe(labels, size)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for family in (self.requests, self.request_duration, self.response_size, self.stage_duration):
+            lines.extend(family.render())
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def server_timing(stages: dict, total: float) -> str:
+    """Server-Timing header value (durations in ms) for a request's stages."""
+    parts = [
+        f'{stage};dur={seconds * 1000:.3f}' + (f';desc="x{calls}"' if calls > 1 else "")
+        for stage, (seconds, calls) in stages.items()
+    ]
+    parts.append(f"app;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request metrics and adding Server-Timing."""
+
+    def __init__(self, app, metrics: Metrics, timing_header: bool = True):
+        self.app = app
+        self.metrics = metrics
+        self.timing_header = timing_header
+        self._routes = None  # endpoint -> route template
+
+    def _route(self, scope: dict) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None or endpoint not in self._routes:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        stages = {}
+        token = _request_stages.set(stages)
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.timing_header:
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"server-timing", server_timing(stages, perf_counter() - started).encode()))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_stages.reset(token)
+            self.metrics.observe_request(scope["method"], self._route(scope), status, perf_counter() - started, size)
+
+
+def cache_collector(cache, prefix: str = "bnpl") -> Callable[[], list]:
+    """Collector of a ResultCache's per-part hit / miss counters and size."""
+
+    def collect() -> list:
+        hits, misses = [], []
+        for part, (part_hits, part_misses) in sorted(cache.part_stats().items()):
+            hits.append(({"part": part}, part_hits))
+            misses.append(({"part": part}, part_misses))
+        return [
+            (f"{prefix}_cache_hits_total", "counter", "Result cache hits by part.", hits),
+            (f"{prefix}_cache_misses_total", "counter", "Result cache misses by part.", misses),
+            (f"{prefix}_cache_entries", "gauge", "Farmers with cached results.", [({}, len(cache))]),
+        ]
+
+    return collect
+
+
+def admission_collector(controller, prefix: str = "bnpl") -> Callable[[], list]:
+    """Collector of an AdmissionController's queue depths, in-flight counts and outcomes."""
+
+    def collect() -> list:
+        in_flight, queued, admitted, rejected = [], [], [], []
+        for name, admission in sorted(controller.classes.items()):
+            labels = {"class": name}
+            in_flight.append((labels, admission.in_flight))
+            queued.append((labels, admission.queued))
+            admitted.append((labels, admission.admitted))
+            for reason, count in sorted(admission.rejected.items()):
+                rejected.append(({"class": name, "reason": reason}, count))
+        return [
+            (f"{prefix}_admission_in_flight", "gauge", "Requests running per admission class.", in_flight),
+            (f"{prefix}_admission_queue_depth", "gauge", "Requests waiting per admission class.", queued),
+            (f"{prefix}_admission_admitted_total", "counter", "Requests admitted per class.", admitted),
+            (f"{prefix}_admission_rejected_total", "counter", "Requests shed per class and reason.", rejected),
+        ]
+
+    return collect
@@ -0,0 +1,207 @@
+"""
+Portfolio Rollups
+Keeps one scored summary row per farmer in the book plus running
+aggregates (approval rate, exposure, score histogram, risk-category and
+decision mix) for the whole portfolio and per region / farm type / crop type.
+
+sync() compares the current dataset with the rows it already holds and
+re-scores only new or changed farmers (all of them after a model swap).
+Each re-scored or removed farmer is subtracted from and added back to the
+rollups it belongs to, so reading the aggregates never scans the book.
+Changed farmers are scored in chunks, which bounds the memory a full
+re-score needs.
+"""
+
+import threading
+from typing import Optional
+
+from engines.batch_scoring import score_batch, to_score_results
+from engines.model import ScoringModel, get_active_model
+
+DIMENSIONS = ("region", "farm_type", "crop_type")
+HISTOGRAM_BINS = 10  # risk score buckets of width 10 over 0-100
+SYNC_CHUNK_ROWS = 20000
+
+
+def summary_row(farmer: dict, score: dict) -> dict:
+    """The per-farmer summary row served by the dashboard listing."""
+    return {
+        "farmer_id": farmer["farmer_id"],
+        "name": farmer["name"],
+        "region": farmer["region"],
+        "farm_type": farmer["farm_type"],
+        "crop_type": farmer["crop_type"],
+        "risk_score": score["risk_score"],
+        "risk_category": score["risk_category"],
+        "decision": score["decision"],
+        "bnpl_limit": score["bnpl_limit"],
+        "installment_months": score["recommended_installment_months"],
+    }
+
+
+def _histogram_bin(risk_score: float) -> int:
+    return min(max(int(risk_score // 10), 0), HISTOGRAM_BINS - 1)
+
+
+class _Rollup:
+    """Additive aggregates over a set of summary rows."""
+
+    __slots__ = ("farmers", "approved", "exposure", "score_tenths", "histogram", "categories", "decisions")
+
+    def __init__(self):
+        self.farmers = 0
+        self.approved = 0
+        self.exposure = 0
+        self.score_tenths = 0  # scores are kept to 0.1, so sums stay exact under add/remove
+        self.histogram = [0] * HISTOGRAM_BINS
+        self.categories = {}
+        self.decisions = {}
+
+    def apply(self, row: dict, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one row."""
+        self.farmers += sign
+        if row["decision"] == "Approved":
+            self.approved += sign
+        self.exposure += sign * row["bnpl_limit"]
+        self.score_tenths += sign * round(row["risk_score"] * 10)
+        self.histogram[_histogram_bin(row["risk_score"])] += sign
+        category = row["risk_category"]
+        self.categories[category] = self.categories.get(category, 0) + sign
+        decision = row["decision"]
+        self.decisions[decision] = self.decisions.get(decision, 0) + sign
+
+    def to_dict(self) -> dict:
+        farmers = self.farmers
+        return {
+            "farmers": farmers,
+            "approved": self.approved,
+            "approval_rate": round(self.approved / farmers, 4) if farmers else 0.0,
+            "exposure": self.exposure,
+            "average_score": round(self.score_tenths / farmers / 10, 1) if farmers else 0.0,
+            "score_histogram": [
+                {"range": f"{i * 10}-{i * 10 + 10}", "count": count}
+                for i, count in enumerate(self.histogram)
+            ],
+            "risk_categories": {k: v for k, v in self.categories.items() if v},
+            "decisions": {k: v for k, v in self.decisions.items() if v},
+        }
+
+
+class Portfolio:
+    """Scored summary rows and incrementally maintained rollups for the farmer book."""
+
+    def __init__(self):
+        self.source_version = None
+        self.model_version = None
+        self.last_rescored = 0
+        self._inputs = {}  # farmer_id -> farmer dict (or its content hash) the row was scored from
+        self._rows = {}  # farmer_id -> summary row, in dataset order
+        self._total = _Rollup()
+        self._groups = {dimension: {} for dimension in DIMENSIONS}
+        self._lock = threading.Lock()
+
+    def is_current(self, source_version, model_version: str) -> bool:
+        return self.source_version == source_version and self.model_version == model_version
+
+    def sync(
+        self,
+        farmers: list,
+        source_version,
+        model: Optional[ScoringModel] = None,
+        fingerprints: Optional[list] = None,
+    ) -> int:
+        """
+        Bring the rows up to date with `farmers` (dataset `source_version`)
+        under `model`. Returns the number of farmers re-scored. With
+        `fingerprints` (content hashes aligned with `farmers`), changes are
+        detected by hash and the farmer dicts are not kept.
+        """
+        model = model or get_active_model()
+        with self._lock:
+            if self.is_current(source_version, model.version):
+                return 0
+
+            rescore_all = model.version != self.model_version
+            order = []
+            pending = []
+            rescored = 0
+            for farmer, current in zip(farmers, farmers if fingerprints is None else fingerprints):
+                farmer_id = farmer["farmer_id"]
+                order.append(farmer_id)
+                previous = self._inputs.get(farmer_id)
+                if rescore_all or previous is None or (previous is not current and previous != current):
+                    pending.append((farmer, current))
+                    if len(pending) >= SYNC_CHUNK_ROWS:
+                        rescored += self._rescore(pending, model)
+                        pending = []
+            rescored += self._rescore(pending, model)
+
+            seen = set(order)
+            for farmer_id in [fid for fid in self._rows if fid not in seen]:
+                self._remove(farmer_id)
+            if rescored:
+                # Keep rows in dataset order
+                self._rows = {farmer_id: self._rows[farmer_id] for farmer_id in order}
+
+            self.source_version = source_version
+            self.model_version = model.version
+            self.last_rescored = rescored
+            return rescored
+
+    def _rescore(self, pending: list, model: ScoringModel) -> int:
+        """Score (farmer, input) pairs and upsert their rows."""
+        if not pending:
+            return 0
+        scores = to_score_results(score_batch([farmer for farmer, _ in pending], model))
+        for (farmer, current), score in zip(pending, scores):
+            self._upsert(farmer, current, summary_row(farmer, score))
+        return len(pending)
+
+    def _apply(self, row: dict, sign: int) -> None:
+        self._total.apply(row, sign)
+        for dimension in DIMENSIONS:
+            groups = self._groups[dimension]
+            key = row[dimension]
+            rollup = groups.get(key)
+            if rollup is None:
+                rollup = groups[key] = _Rollup()
+            rollup.apply(row, sign)
+            if rollup.farmers == 0:
+                del groups[key]
+
+    def _remove(self, farmer_id: str) -> None:
+        del self._inputs[farmer_id]
+        self._apply(self._rows.pop(farmer_id), -1)
+
+    def _upsert(self, farmer: dict, current, row: dict) -> None:
+        farmer_id = farmer["farmer_id"]
+        old = self._rows.get(farmer_id)
+        if old is not None:
+            self._apply(old, -1)
+        self._rows[farmer_id] = row
+        self._inputs[farmer_id] = current
+        self._apply(row, 1)
+
+    def rows(self) -> list:
+        """All summary rows."""
+        with self._lock:
+            return list(self._rows.values())
+
+    def aggregates(self, group_by: Optional[str] = None) -> dict:
+        """Portfolio totals plus per-group rollups for one or all dimensions."""
+        dimensions = (group_by,) if group_by else DIMENSIONS
+        with self._lock:
+            return {
+                "model_version": self.model_version,
+                "total": self._total.to_dict(),
+                "groups": {
+                    dimension: {
+                        value: rollup.to_dict()
+                        for value, rollup in sorted(self._groups[dimension].items())
+                    }
+                    for dimension in dimensions
+                },
+            }
+
+    def __len__(self) -> int:
+        return len(self._rows)
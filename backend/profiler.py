@@ -0,0 +1,127 @@
+"""
+Sampling Profiler
+A stdlib-only statistical profiler for the running server process.
+
+A background thread wakes every `interval` seconds, reads the current
+stack of every other thread with sys._current_frames() and counts each
+distinct stack. Nothing is traced between samples, so the cost is one
+stack walk per thread per tick and the profiled code runs at full speed.
+The result is a set of collapsed stacks ("thread;outer;...;inner count"
+per line), the input format of flamegraph.pl, speedscope and similar
+viewers.
+
+Threads that are merely waiting (the event loop in select(), idle
+thread-pool workers, queue consumers) are dropped unless `idle=True`, so
+the profile shows where CPU time goes: JSON parsing, pydantic
+validation, scoring, explanation formatting and so on.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_SECONDS = 60.0
+MIN_INTERVAL = 0.001
+
+# (file name, function) of frames where a thread is blocked, not running
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def frame_label(code) -> str:
+    """`package/module.py:qualified_name` for a code object."""
+    parent, name = os.path.split(code.co_filename)
+    return f"{os.path.basename(parent)}/{name}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all other threads until stopped."""
+
+    def __init__(self, interval: float = 0.005, idle: bool = False):
+        self.interval = max(interval, MIN_INTERVAL)
+        self.idle = idle
+        self.stacks = Counter()
+        self.samples = 0
+        self.started = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("profiler already started")
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        labels = {}
+        while not self._stop.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if not self.idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = frame_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                stack.reverse()
+                self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """The samples as collapsed stacks, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, top: int = 25) -> dict:
+        """Sample counts plus the functions with the most self and total samples."""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        return {
+            "seconds": round(self.elapsed, 3),
+            "interval_ms": self.interval * 1000,
+            "ticks": self.samples,
+            "stack_samples": sum(self.stacks.values()),
+            "self": own.most_common(top),
+            "total": total.most_common(top),
+        }
+
+
+def profile(seconds: float, interval: float = 0.005, idle: bool = False) -> SamplingProfiler:
+    """Profile this process for `seconds` (blocking the calling thread)."""
+    profiler = SamplingProfiler(interval, idle)
+    profiler.start()
+    time.sleep(min(seconds, MAX_SECONDS))
+    profiler.stop()
+    return profiler
+
@@ -0,0 +1,185 @@
+"""
+Farmer Repository
+Keeps the farmer dataset in memory with a farmer_id hash index and
+secondary indexes by region, crop type and farm type.
+
+The file is parsed once and re-parsed only when its modification time
+changes. Inside the API the check runs in a background task (watch());
+elsewhere it runs inline, throttled so most lookups never stat the file.
+
+A compiled columnar file (see columnar.py) is memory-mapped instead of
+parsed: lookups go through its sorted farmer_id index and rows are decoded
+on access, so several worker processes share one copy of the data.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from columnar import COLUMNAR_SUFFIX, ColumnarTable
+
+
+class _Snapshot:
+    """Immutable view of one parsed version of the dataset."""
+
+    __slots__ = ("farmers", "by_id", "by_region", "by_crop_type", "by_farm_type", "mtime", "version")
+
+    def __init__(self, farmers: list, mtime: float, version: int):
+        self.farmers = farmers
+        self.by_id = {}
+        self.by_region = {}
+        self.by_crop_type = {}
+        self.by_farm_type = {}
+        self.mtime = mtime
+        self.version = version
+
+        for farmer in farmers:
+            self.by_id[farmer["farmer_id"]] = farmer
+            self.by_region.setdefault(farmer["region"], []).append(farmer)
+            self.by_crop_type.setdefault(farmer["crop_type"], []).append(farmer)
+            self.by_farm_type.setdefault(farmer["farm_type"], []).append(farmer)
+
+    def get(self, farmer_id: str) -> Optional[dict]:
+        return self.by_id.get(farmer_id)
+
+    def where(self, field: str, value: str) -> list:
+        return getattr(self, f"by_{field}").get(value, [])
+
+    def fingerprints(self) -> Optional[list]:
+        return None
+
+
+class _ColumnarSnapshot:
+    """View of one version of a memory-mapped columnar dataset file."""
+
+    __slots__ = ("table", "farmers", "mtime", "version")
+
+    def __init__(self, table: ColumnarTable, mtime: float, version: int):
+        self.table = table
+        self.farmers = table.rows()
+        self.mtime = mtime
+        self.version = version
+
+    def get(self, farmer_id: str) -> Optional[dict]:
+        return self.table.get(farmer_id)
+
+    def where(self, field: str, value: str):
+        return self.table.rows(self.table.where(field, value))
+
+    def fingerprints(self) -> Optional[list]:
+        return self.table.fingerprints()
+
+
+class FarmerRepository:
+    """Indexed access to the farmers file with mtime-based hot reload."""
+
+    def __init__(self, path: str, reload_interval: float = 2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._reload_listeners = []
+        self._watched = False
+
+    def add_reload_listener(self, callback: Callable[[], None]) -> None:
+        """Call `callback` after every successful (re)load of the file."""
+        self._reload_listeners.append(callback)
+
+    def load(self) -> None:
+        """Parse the file and atomically swap in the new indexes."""
+        with self._lock:
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        mtime = os.path.getmtime(self.path)
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        if self.path.endswith(COLUMNAR_SUFFIX):
+            self._snapshot = _ColumnarSnapshot(ColumnarTable(self.path), mtime, version)
+        else:
+            with open(self.path, "r", encoding="utf-8") as f:
+                farmers = json.load(f)
+            self._snapshot = _Snapshot(farmers, mtime, version)
+        self._last_check = time.monotonic()
+        for callback in self._reload_listeners:
+            callback()
+
+    def _current(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._load_locked()
+            return self._snapshot
+
+        if self._watched or time.monotonic() - self._last_check < self.reload_interval:
+            return snapshot
+
+        self.refresh_if_changed()
+        return self._snapshot
+
+    def refresh_if_changed(self) -> bool:
+        """Reload if the file's mtime changed. Returns True if it reloaded."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                if self._snapshot is None or os.path.getmtime(self.path) != self._snapshot.mtime:
+                    self._load_locked()
+                    return True
+            except (OSError, ValueError):
+                # Keep serving the last good copy if the file is mid-write
+                pass
+        return False
+
+    async def aload(self) -> None:
+        """Load the file without blocking the event loop."""
+        await asyncio.to_thread(self.load)
+
+    async def watch(self) -> None:
+        """
+        Poll for changes every `reload_interval` seconds off the event loop.
+        While this runs, lookups never touch the disk themselves.
+        """
+        self._watched = True
+        try:
+            while True:
+                await asyncio.sleep(self.reload_interval)
+                await asyncio.to_thread(self.refresh_if_changed)
+        finally:
+            self._watched = False
+
+    @property
+    def version(self) -> int:
+        """Monotonic counter bumped on every successful (re)load."""
+        return self._current().version
+
+    def all(self) -> list:
+        """Every farmer (a lazy sequence when backed by a columnar file)."""
+        return self._current().farmers
+
+    def all_with_fingerprints(self) -> tuple:
+        """
+        (all(), their content hashes in order) from the same version of the
+        file. The hashes come precomputed from compiled columnar files and
+        are None for JSON files.
+        """
+        snapshot = self._current()
+        return snapshot.farmers, snapshot.fingerprints()
+
+    def get(self, farmer_id: str) -> Optional[dict]:
+        return self._current().get(farmer_id)
+
+    def by_region(self, region: str) -> list:
+        return self._current().where("region", region)
+
+    def by_crop_type(self, crop_type: str) -> list:
+        return self._current().where("crop_type", crop_type)
+
+    def by_farm_type(self, farm_type: str) -> list:
+        return self._current().where("farm_type", farm_type)
+
+    def __len__(self) -> int:
+        return len(self._current().farmers)
@@ -0,0 +1,77 @@
+"""
+JSON Responses
+Fast JSON encoding and pre-encoded, ETag-validated responses.
+
+dumps() uses orjson when it is installed and falls back to the standard
+library with the same compact output Starlette produces. FastJSONResponse
+renders with it; returning one from a handler also skips FastAPI's
+jsonable_encoder pass over the payload.
+
+EncodedJSON holds a payload already encoded to bytes together with its
+ETag, so immutable or cached results (the product catalog, per-farmer
+scores and dashboards) are encoded once. encoded_response() answers a
+matching If-None-Match with 304 and no body.
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    """Encode `content` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class EncodedJSON:
+    """A JSON body encoded once, with a strong ETag derived from its bytes."""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+    @classmethod
+    def encode(cls, content) -> "EncodedJSON":
+        return cls(dumps(content))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches `etag` (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def encoded_response(
+    request: Request, encoded: EncodedJSON, headers: Optional[dict] = None
+) -> Response:
+    """200 with the pre-encoded body, or 304 if the client already has it."""
+    headers = {**(headers or {}), "ETag": encoded.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), encoded.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(encoded.body, media_type="application/json", headers=headers)
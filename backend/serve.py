@@ -0,0 +1,120 @@
+"""
+Production Launcher
+Runs the API in several uvicorn worker processes that share one
+memory-mapped copy of the farmer dataset.
+
+Before forking, the launcher compiles farmers.json into a columnar file
+(columnar.py) and brings the score store up to date once, so workers
+start by mapping the file instead of parsing JSON and find no stale rows
+to re-score. Workers open the file through BNPL_FARMERS_PATH; the pages
+live in the OS page cache once, however many workers read them. While
+serving, the launcher recompiles the file when farmers.json changes
+(written to a temporary file and renamed into place), and every worker's
+repository watcher picks up the new version by its modification time.
+
+The launcher is the only writer of the score store: it re-scores stale
+rows after each recompile or scoring model change, and starts the workers
+with BNPL_STORE_REFRESH=0 so they only read it.
+
+Per-worker state is unchanged: each worker keeps its own result cache,
+portfolio rollups, listing indexes, metrics and profiler, and parses the
+(small) product catalog itself.
+
+Usage (from the backend directory):
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import os
+import sys
+import threading
+from typing import Optional
+
+import uvicorn
+
+from columnar import COLUMNAR_SUFFIX, compile_if_stale
+from engines.model import registry as model_registry
+from repository import FarmerRepository
+from store import open_store
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+RECOMPILE_INTERVAL = 2.0
+
+
+def prepare(source: str, target: str) -> None:
+    """Compile the columnar file if needed and refresh the score store against it."""
+    if compile_if_stale(source, target):
+        print(f"compiled {source} -> {target}", file=sys.stderr)
+    refresh_store(target)
+
+
+def refresh_store(target: str) -> None:
+    """Re-score the score store rows that are stale against `target` and the active model."""
+    store = open_store()
+    if store is not None:
+        try:
+            farmers, fingerprints = FarmerRepository(target).all_with_fingerprints()
+            store.refresh(farmers, fingerprints=fingerprints)
+        finally:
+            store.close()
+
+
+def watch_source(source: str, target: str, interval: float = RECOMPILE_INTERVAL) -> threading.Event:
+    """
+    Recompile `target` whenever `source` changes, and refresh the score
+    store after a recompile or model change, in a daemon thread. Set the
+    event to stop.
+    """
+    stopped = threading.Event()
+
+    def run() -> None:
+        stale = False
+        while not stopped.wait(interval):
+            try:
+                if compile_if_stale(source, target):
+                    print(f"recompiled {target}", file=sys.stderr)
+                    stale = True
+            except (OSError, ValueError) as exc:
+                # Keep serving the last good file if the source is mid-write
+                print(f"recompile failed: {exc}", file=sys.stderr)
+            if model_registry.refresh_if_changed():
+                stale = True
+            if stale:
+                try:
+                    refresh_store(target)
+                    stale = False
+                except Exception as exc:
+                    # Workers compute missing rows on the fly; retry on the next poll
+                    print(f"score store refresh failed: {exc!r}", file=sys.stderr)
+
+    threading.Thread(target=run, name="columnar-recompile", daemon=True).start()
+    return stopped
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python serve.py")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--farmers", default=os.path.join(DATA_DIR, "farmers.json"), help="source dataset")
+    parser.add_argument(
+        "--columnar", default=None, help=f"compiled file (default: source with {COLUMNAR_SUFFIX})"
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    target = args.columnar or os.path.splitext(args.farmers)[0] + COLUMNAR_SUFFIX
+    prepare(args.farmers, target)
+    os.environ["BNPL_FARMERS_PATH"] = os.path.abspath(target)
+    os.environ["BNPL_STORE_REFRESH"] = "0"
+    stop = watch_source(args.farmers, target)
+    try:
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+    finally:
+        stop.set()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Shadow Scoring
+Runs challenger scoring models alongside the production (champion) model
+on live traffic without touching the request path.
+
+Handlers call ShadowScorer.submit() with the farmer profile and the
+champion result they served, and where it came from: computed, the result
+cache or the score store. That only appends to a bounded in-memory queue
+(and drops the sample when the queue is full). A single background thread
+drains the queue, scores each farmer with every challenger and writes
+decision diffs, limit deltas and per-model latency to a local SQLite
+store in batches. Champion latency is the time to serve the result from
+its source, so the summary reports the scoring latency over computed
+champions only.
+
+Challengers are model definition files listed in BNPL_CHALLENGER_MODELS
+(separated by os.pathsep); with none configured, shadow scoring is off.
+"""
+
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from engines.model import ScoringModel
+from engines.scoring import calculate_risk_score
+
+SHADOW_QUEUE_SIZE = 10000
+SHADOW_WRITE_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shadow_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    farmer_id TEXT NOT NULL,
+    champion_version TEXT NOT NULL,
+    challenger_version TEXT NOT NULL,
+    champion_decision TEXT NOT NULL,
+    challenger_decision TEXT NOT NULL,
+    decision_changed INTEGER NOT NULL,
+    champion_score REAL NOT NULL,
+    challenger_score REAL NOT NULL,
+    champion_limit INTEGER NOT NULL,
+    challenger_limit INTEGER NOT NULL,
+    limit_delta INTEGER NOT NULL,
+    champion_latency_ms REAL NOT NULL,
+    challenger_latency_ms REAL NOT NULL,
+    champion_source TEXT NOT NULL DEFAULT 'computed'
+);
+CREATE INDEX IF NOT EXISTS shadow_results_challenger ON shadow_results (challenger_version);
+"""
+
+_INSERT = """
+INSERT INTO shadow_results (
+    recorded_at, farmer_id, champion_version, challenger_version,
+    champion_decision, challenger_decision, decision_changed,
+    champion_score, challenger_score, champion_limit, challenger_limit, limit_delta,
+    champion_latency_ms, challenger_latency_ms, champion_source
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Where a submitted champion result was served from
+CHAMPION_SOURCES = ("computed", "cache", "store")
+
+_SUMMARY = """
+SELECT challenger_version, champion_version, COUNT(*),
+       SUM(decision_changed), AVG(challenger_score - champion_score),
+       AVG(limit_delta), MIN(limit_delta), MAX(limit_delta),
+       AVG(CASE WHEN champion_source = 'computed' THEN champion_latency_ms END),
+       AVG(challenger_latency_ms), MAX(challenger_latency_ms),
+       SUM(champion_source = 'computed'), SUM(champion_source = 'cache'), SUM(champion_source = 'store')
+FROM shadow_results
+GROUP BY challenger_version, champion_version
+ORDER BY challenger_version, champion_version
+"""
+
+
+def load_challengers(paths: Optional[str] = None) -> list:
+    """Compile the challenger models listed in `paths` (default: $BNPL_CHALLENGER_MODELS)."""
+    if paths is None:
+        paths = os.environ.get("BNPL_CHALLENGER_MODELS", "")
+    return [ScoringModel.from_file(path) for path in paths.split(os.pathsep) if path.strip()]
+
+
+class ShadowScorer:
+    """Background challenger scoring fed from a bounded queue."""
+
+    def __init__(
+        self,
+        db_path: str,
+        challengers: Optional[list] = None,
+        sample_rate: float = 1.0,
+        queue_size: int = SHADOW_QUEUE_SIZE,
+    ):
+        self.db_path = db_path
+        self.challengers = list(challengers or [])
+        self.sample_rate = sample_rate
+        self.submitted = 0
+        self.dropped = 0
+        self.processed = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.challengers)
+
+    def submit(self, farmer: dict, champion: dict, champion_latency: float, source: str = "computed") -> None:
+        """
+        Queue a farmer for challenger scoring; `source` is one of
+        CHAMPION_SOURCES. Never blocks: the sample is dropped if shadow
+        scoring is off, not sampled, or the queue is full.
+        """
+        if not self.challengers or self._thread is None:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait((farmer, champion, champion_latency, source))
+            self.submitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    # --- Worker ---
+
+    def start(self) -> None:
+        if not self.challengers or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush the queue and stop the worker."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(shadow_results)")}
+        if "champion_source" not in columns:
+            # Results recorded before sources were tracked were all computed
+            with conn:
+                conn.execute(
+                    "ALTER TABLE shadow_results ADD COLUMN champion_source TEXT NOT NULL DEFAULT 'computed'"
+                )
+        return conn
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                while len(batch) < SHADOW_WRITE_BATCH:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    stopping = True
+                    batch = [item for item in batch if item is not None]
+
+                rows = []
+                for farmer, champion, champion_latency, source in batch:
+                    try:
+                        rows.extend(self._compare(farmer, champion, champion_latency, source))
+                    except Exception:
+                        self.errors += 1
+                with conn:
+                    conn.executemany(_INSERT, rows)
+                self.processed += len(batch)
+        finally:
+            conn.close()
+
+    def _compare(self, farmer: dict, champion: dict, champion_latency: float, source: str) -> list:
+        rows = []
+        recorded_at = time.time()
+        for model in self.challengers:
+            started = time.perf_counter()
+            challenger = calculate_risk_score(farmer, model)
+            latency = time.perf_counter() - started
+            rows.append((
+                recorded_at,
+                farmer["farmer_id"],
+                champion["model_version"],
+                challenger["model_version"],
+                champion["decision"],
+                challenger["decision"],
+                int(challenger["decision"] != champion["decision"]),
+                champion["risk_score"],
+                challenger["risk_score"],
+                champion["bnpl_limit"],
+                challenger["bnpl_limit"],
+                challenger["bnpl_limit"] - champion["bnpl_limit"],
+                champion_latency * 1000,
+                latency * 1000,
+                source,
+            ))
+        return rows
+
+    # --- Reporting ---
+
+    def summary(self) -> dict:
+        """Per-challenger agreement, limit deltas and latency from the store."""
+        challengers = []
+        if os.path.exists(self.db_path):
+            conn = self._connect()
+            try:
+                rows = conn.execute(_SUMMARY).fetchall()
+            finally:
+                conn.close()
+            for row in rows:
+                count = row[2]
+                challengers.append({
+                    "challenger_version": row[0],
+                    "champion_version": row[1],
+                    "samples": count,
+                    "decision_changes": row[3],
+                    "decision_agreement": round(1 - row[3] / count, 4),
+                    "mean_score_delta": round(row[4], 2),
+                    "mean_limit_delta": round(row[5], 1),
+                    "min_limit_delta": row[6],
+                    "max_limit_delta": row[7],
+                    "champion_sources": dict(zip(CHAMPION_SOURCES, row[11:14])),
+                    # Over computed champions only; lookups are not scoring time
+                    "mean_champion_latency_ms": round(row[8], 4) if row[8] is not None else None,
+                    "mean_challenger_latency_ms": round(row[9], 4),
+                    "max_challenger_latency_ms": round(row[10], 4),
+                })
+        return {
+            "enabled": self.enabled,
+            "challengers": [model.version for model in self.challengers],
+            "sample_rate": self.sample_rate,
+            "queue": {
+                "depth": self._queue.qsize(),
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "processed": self.processed,
+                "errors": self.errors,
+            },
+            "results": challengers,
+        }
@@ -0,0 +1,351 @@
+"""
+Score Store
+Persists farmers, products and their latest risk score and product match
+results, so reads are served from stored results instead of being
+recomputed from farmers.json.
+
+Every stored score carries the hash of the farmer profile it was computed
+from and the scoring model version; every stored match also carries the
+product catalog version. refresh() re-scores only farmers whose inputs or
+model version changed (and re-matches those plus everyone when the catalog
+changed), then writes the changes in one transaction. A read only returns
+a stored result whose hashes and versions match the caller's current ones.
+
+ScoreStore is the storage interface; SQLiteScoreStore is the local
+implementation. Run `python -m store` to refresh a store offline, so batch
+scoring can run separately from the API processes that read it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from cache import content_hash
+from engines.batch_scoring import score_batch, to_score_results
+from engines.model import ScoringModel, get_active_model
+from engines.product_matching import ProductCatalog, get_catalog, match_products
+
+# Generated state lives in var/, apart from the input datasets in data/
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(__file__), "var", "scores.sqlite3")
+
+
+class ScoreStore(ABC):
+    """
+    Storage interface. Subclasses implement the primitive reads and the
+    transactional write; the incremental refresh logic lives here.
+    """
+
+    @abstractmethod
+    def score_fingerprints(self) -> dict:
+        """farmer_id -> (input_hash, model_version) of every stored score."""
+
+    @abstractmethod
+    def match_fingerprints(self) -> dict:
+        """farmer_id -> (input_hash, model_version, catalog_version) of every stored match."""
+
+    @abstractmethod
+    def catalog_version(self) -> Optional[str]:
+        """Version of the stored product catalog."""
+
+    @abstractmethod
+    def write(self, farmers: list, scores: list, matches: list, removed: list, catalog: Optional[ProductCatalog]) -> None:
+        """
+        Atomically upsert farmer rows (farmer, input_hash), score rows
+        (input_hash, model_version, result) and match rows (input_hash,
+        model_version, catalog_version, result), delete `removed` farmer ids
+        and, if given, replace the stored product catalog.
+        """
+
+    @abstractmethod
+    def get_score(self, farmer_id: str, input_hash: str, model_version: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def get_match(self, farmer_id: str, input_hash: str, model_version: str, catalog_version: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def refresh(
+        self,
+        farmers: list,
+        model: Optional[ScoringModel] = None,
+        catalog: Optional[ProductCatalog] = None,
+        fingerprints: Optional[list] = None,
+    ) -> dict:
+        """
+        Bring stored results up to date with `farmers`, re-scoring only stale
+        rows. `fingerprints` are precomputed content hashes aligned with `farmers`.
+        """
+        model = model or get_active_model()
+        catalog = catalog or get_catalog()
+        started = time.perf_counter()
+
+        if fingerprints is None:
+            hashes = {farmer["farmer_id"]: content_hash(farmer) for farmer in farmers}
+        else:
+            hashes = {farmer["farmer_id"]: fingerprint for farmer, fingerprint in zip(farmers, fingerprints)}
+        stored_scores = self.score_fingerprints()
+        stored_matches = self.match_fingerprints()
+
+        rescore = [
+            farmer for farmer in farmers
+            if stored_scores.get(farmer["farmer_id"]) != (hashes[farmer["farmer_id"]], model.version)
+        ]
+        rescore_ids = {farmer["farmer_id"] for farmer in rescore}
+        rematch = [
+            farmer for farmer in farmers
+            if farmer["farmer_id"] in rescore_ids
+            or stored_matches.get(farmer["farmer_id"])
+            != (hashes[farmer["farmer_id"]], model.version, catalog.version)
+        ]
+        removed = [farmer_id for farmer_id in stored_scores.keys() | stored_matches.keys() if farmer_id not in hashes]
+        catalog_changed = self.catalog_version() != catalog.version
+
+        limits = {}
+        score_rows = []
+        if rescore:
+            for farmer, score in zip(rescore, to_score_results(score_batch(rescore, model))):
+                limits[farmer["farmer_id"]] = score["bnpl_limit"]
+                score_rows.append((farmer["farmer_id"], hashes[farmer["farmer_id"]], model.version, score))
+
+        match_rows = []
+        if rematch:
+            missing = [f for f in rematch if f["farmer_id"] not in limits]
+            for farmer_id, limit in self._stored_limits(missing, hashes, model.version).items():
+                limits[farmer_id] = limit
+            for farmer in rematch:
+                farmer_id = farmer["farmer_id"]
+                match = match_products(farmer, limits[farmer_id], catalog)
+                match_rows.append((farmer_id, hashes[farmer_id], model.version, catalog.version, match))
+
+        farmer_rows = [(farmer, hashes[farmer["farmer_id"]]) for farmer in rescore]
+        if farmer_rows or match_rows or removed or catalog_changed:
+            self.write(farmer_rows, score_rows, match_rows, removed, catalog if catalog_changed else None)
+
+        return {
+            "farmers": len(farmers),
+            "scored": len(score_rows),
+            "matched": len(match_rows),
+            "removed": len(removed),
+            "model_version": model.version,
+            "catalog_version": catalog.version,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _stored_limits(self, farmers: list, hashes: dict, model_version: str) -> dict:
+        limits = {}
+        for farmer in farmers:
+            farmer_id = farmer["farmer_id"]
+            score = self.get_score(farmer_id, hashes[farmer_id], model_version)
+            limits[farmer_id] = score["bnpl_limit"]
+        return limits
+
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS farmers (
+    farmer_id TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    region TEXT,
+    farm_type TEXT,
+    crop_type TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS farmers_region ON farmers (region);
+CREATE INDEX IF NOT EXISTS farmers_crop_type ON farmers (crop_type);
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    category TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_category ON products (category);
+CREATE TABLE IF NOT EXISTS scores (
+    farmer_id TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    risk_score REAL NOT NULL,
+    decision TEXT NOT NULL,
+    risk_category TEXT NOT NULL,
+    bnpl_limit INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    scored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_decision ON scores (decision, risk_score);
+CREATE INDEX IF NOT EXISTS scores_risk_score ON scores (risk_score);
+CREATE INDEX IF NOT EXISTS scores_model_version ON scores (model_version);
+CREATE TABLE IF NOT EXISTS matches (
+    farmer_id TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    catalog_version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    matched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SQLiteScoreStore(ScoreStore):
+    """ScoreStore on a local SQLite file (one connection per thread, WAL mode)."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # Every thread's connection, so close() can reach them all
+        self._connections: list = []
+        self._connections_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def score_fingerprints(self) -> dict:
+        rows = self._connection().execute("SELECT farmer_id, input_hash, model_version FROM scores")
+        return {farmer_id: (input_hash, version) for farmer_id, input_hash, version in rows}
+
+    def match_fingerprints(self) -> dict:
+        rows = self._connection().execute(
+            "SELECT farmer_id, input_hash, model_version, catalog_version FROM matches"
+        )
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def catalog_version(self) -> Optional[str]:
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'catalog_version'").fetchone()
+        return row[0] if row else None
+
+    def write(self, farmers, scores, matches, removed, catalog) -> None:
+        now = time.time()
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("DELETE FROM farmers WHERE farmer_id = ?", [(f,) for f in removed])
+                conn.executemany("DELETE FROM scores WHERE farmer_id = ?", [(f,) for f in removed])
+                conn.executemany("DELETE FROM matches WHERE farmer_id = ?", [(f,) for f in removed])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO farmers VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (f["farmer_id"], h, f.get("region"), f.get("farm_type"), f.get("crop_type"), json.dumps(f))
+                        for f, h in farmers
+                    ],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            farmer_id, input_hash, version, score["risk_score"], score["decision"],
+                            score["risk_category"], score["bnpl_limit"], json.dumps(score), now,
+                        )
+                        for farmer_id, input_hash, version, score in scores
+                    ],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (farmer_id, input_hash, version, catalog_version, json.dumps(match), now)
+                        for farmer_id, input_hash, version, catalog_version, match in matches
+                    ],
+                )
+                if catalog is not None:
+                    conn.execute("DELETE FROM products")
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO products VALUES (?, ?, ?)",
+                        [(p["product_id"], p.get("category"), json.dumps(p)) for p in catalog.products],
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta VALUES ('catalog_version', ?)", (catalog.version,)
+                    )
+
+    def get_score(self, farmer_id: str, input_hash: str, model_version: str) -> Optional[dict]:
+        row = self._connection().execute(
+            "SELECT result FROM scores WHERE farmer_id = ? AND input_hash = ? AND model_version = ?",
+            (farmer_id, input_hash, model_version),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_match(self, farmer_id: str, input_hash: str, model_version: str, catalog_version: str) -> Optional[dict]:
+        row = self._connection().execute(
+            "SELECT result FROM matches WHERE farmer_id = ? AND input_hash = ? "
+            "AND model_version = ? AND catalog_version = ?",
+            (farmer_id, input_hash, model_version, catalog_version),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self) -> dict:
+        conn = self._connection()
+        versions = dict(conn.execute("SELECT model_version, COUNT(*) FROM scores GROUP BY model_version"))
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "farmers": conn.execute("SELECT COUNT(*) FROM farmers").fetchone()[0],
+            "products": conn.execute("SELECT COUNT(*) FROM products").fetchone()[0],
+            "scores_by_model_version": versions,
+            "matches": conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0],
+            "catalog_version": self.catalog_version(),
+        }
+
+    def close(self) -> None:
+        """Close the connections of every thread that used the store."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Thread-locals of other threads cannot be cleared from here; a fresh
+        # thread-local makes any later use reconnect instead of hitting a closed one
+        self._local = threading.local()
+
+
+def open_store(location: Optional[str] = None) -> Optional[ScoreStore]:
+    """
+    Open the store at `location` (default: $BNPL_SCORE_STORE or
+    var/scores.sqlite3). An empty location disables the store.
+    """
+    if location is None:
+        location = os.environ.get("BNPL_SCORE_STORE", DEFAULT_STORE_PATH)
+    if not location:
+        return None
+    if location.startswith("sqlite:///"):
+        location = location[len("sqlite:///"):]
+    return SQLiteScoreStore(location)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from repository import FarmerRepository
+
+    parser = argparse.ArgumentParser(description="Refresh the persistent score store")
+    parser.add_argument("--store", default=None, help="Store location (default: $BNPL_SCORE_STORE or var/scores.sqlite3)")
+    parser.add_argument(
+        "--farmers",
+        default=os.path.join(os.path.dirname(__file__), "data", "farmers.json"),
+        help="Farmers file to score",
+    )
+    args = parser.parse_args()
+
+    store = open_store(args.store)
+    if store is None:
+        raise SystemExit("Score store is disabled (empty BNPL_SCORE_STORE)")
+    farmers, fingerprints = FarmerRepository(args.farmers).all_with_fingerprints()
+    print(json.dumps(store.refresh(farmers, fingerprints=fingerprints)))
+    store.close()
@@ -0,0 +1,24 @@
+import json
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session")
+def farmers() -> list:
+    """The bundled farmer dataset."""
+    with open(os.path.join(BACKEND_DIR, "data", "farmers.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def synthetic() -> list:
+    """A deterministic synthetic book covering every scoring branch."""
+    from benchmarks.synthetic import synthetic_farmers
+    return list(synthetic_farmers(2000, seed=7))
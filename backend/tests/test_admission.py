@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionClass, AdmissionController, AdmissionMiddleware, Overloaded
+
+
+def test_admits_up_to_the_concurrency_limit_then_queues_in_order():
+    async def scenario():
+        admission = AdmissionClass("test", concurrency=2, queue_size=2, timeout=5.0)
+        await admission.acquire()
+        await admission.acquire()
+        order = []
+
+        async def waiter(name):
+            await admission.acquire()
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        assert (admission.in_flight, admission.queued) == (2, 2)
+        admission.release(0.1)
+        admission.release(0.1)
+        await asyncio.gather(*tasks)
+        assert order == ["first", "second"]
+        assert admission.admitted == 4
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_shed_with_429():
+    async def scenario():
+        admission = AdmissionClass("test", concurrency=1, queue_size=0, timeout=5.0)
+        await admission.acquire()
+        with pytest.raises(Overloaded) as shed:
+            await admission.acquire()
+        assert shed.value.status_code == 429
+        assert shed.value.retry_after >= 1
+        assert admission.rejected["queue_full"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_queue_deadline_is_shed_with_503():
+    async def scenario():
+        admission = AdmissionClass("test", concurrency=1, queue_size=4, timeout=0.01)
+        await admission.acquire()
+        with pytest.raises(Overloaded) as shed:
+            await admission.acquire()
+        assert shed.value.status_code == 503
+        assert admission.queued == 0
+        assert admission.rejected["deadline"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError):
+        AdmissionClass("test", concurrency=0, queue_size=1, timeout=1.0)
+
+
+def test_routes_take_precedence_over_prefixes():
+    interactive = AdmissionClass("interactive", 4, 4, 1.0)
+    batch = AdmissionClass("batch", 1, 1, 1.0)
+    controller = AdmissionController(
+        [interactive, batch],
+        {("POST", "/api/v1/risk-score/batch"): "batch", ("GET", "/api/v1/admission"): None},
+        prefixes=[("/api/v1/", "interactive")],
+    )
+    assert controller.classify("POST", "/api/v1/risk-score/batch") is batch
+    assert controller.classify("GET", "/api/v1/risk-score/F001") is interactive
+    assert controller.classify("GET", "/api/v1/admission") is None
+    assert controller.classify("GET", "/") is None
+
+
+def test_middleware_rejects_with_retry_after():
+    async def scenario():
+        admission = AdmissionClass("batch", concurrency=1, queue_size=0, timeout=1.0)
+        controller = AdmissionController([admission], {}, prefixes=[("/", "batch")])
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        middleware = AdmissionMiddleware(app, controller)
+
+        async def request():
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+
+            await middleware({"type": "http", "method": "GET", "path": "/"}, None, send)
+            return sent
+
+        slow = asyncio.create_task(request())
+        await asyncio.sleep(0)
+        shed = await request()
+        release.set()
+        ok = await slow
+        assert shed[0]["status"] == 429
+        assert (b"retry-after", b"1") in shed[0]["headers"]
+        assert ok[0]["status"] == 200
+        assert admission.in_flight == 0
+
+    asyncio.run(scenario())
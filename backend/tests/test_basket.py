@@ -0,0 +1,40 @@
+from engines.basket import solve_greedy, solve_optimal
+
+
+def rec(name: str, price: float, priority: str = "high", score: float = 1.0) -> dict:
+    return {
+        "name": name,
+        "estimated_price": price,
+        "estimated_quantity": "1 unit",
+        "priority": priority,
+        "match_score": score,
+    }
+
+
+def test_optimal_tops_up_with_whole_items_below_100():
+    # The DP rounds the 4 AZN item up to a whole 10 AZN step, so it only
+    # gets in through the top-up with 5 AZN left
+    selected, total = solve_optimal([rec("A", 995), rec("B", 4, "low", 0.1)], 1000)
+    assert [r["name"] for r in selected] == ["A", "B"]
+    assert total == 999
+
+
+def test_optimal_does_not_pro_rate_below_100():
+    selected, total = solve_optimal([rec("A", 950), rec("B", 500, "low", 0.1)], 1000)
+    assert [r["name"] for r in selected] == ["A"]
+    assert total == 950
+
+
+def test_optimal_pro_rates_like_greedy():
+    recommendations = [rec("A", 600), rec("B", 900, "low", 0.1)]
+    selected, total = solve_optimal([dict(r) for r in recommendations], 1000)
+    assert total == 1000
+    assert selected[-1]["estimated_price"] == 400
+    assert solve_greedy([dict(r) for r in recommendations], 1000)[1] == total
+
+
+def test_optimal_never_exceeds_budget():
+    recommendations = [rec(str(i), 37 + 13 * i, ("high", "medium", "low")[i % 3], 0.5) for i in range(30)]
+    for budget in (0, 50, 99, 250, 1000, 4321):
+        _, total = solve_optimal([dict(r) for r in recommendations], budget)
+        assert total <= budget
@@ -0,0 +1,85 @@
+import io
+import json
+
+from pydantic import BaseModel
+
+from bulk import iter_csv_rows, iter_ndjson_rows, stream_scores
+from engines.scoring import calculate_risk_score
+
+
+class Row(BaseModel):
+    farmer_id: str
+    region: str
+    farm_type: str
+    crop_type: str
+    farm_size_hectares: float
+    years_experience: int
+    previous_bnpl_count: int
+    previous_bnpl_status: str
+    average_monthly_revenue: float
+    seasonal_revenue_volatility: str
+    land_ownership: bool = False
+    has_irrigation: bool = False
+    has_bank_loan: bool = False
+    requested_amount: float
+
+
+def records(chunks) -> list:
+    return [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+
+
+def ndjson(*lines) -> io.BytesIO:
+    return io.BytesIO(b"".join(line + b"\n" for line in lines))
+
+
+def encode(farmer: dict) -> bytes:
+    return json.dumps(farmer).encode("utf-8")
+
+
+def test_ndjson_errors_are_reported_in_place(farmers):
+    upload = ndjson(
+        encode(farmers[0]),
+        b"{not json",
+        b'{"farmer_id": "\xff\xfe"}',
+        b"",
+        encode({"farmer_id": "F999"}),
+        encode(farmers[1]),
+    )
+    out = records(stream_scores(iter_ndjson_rows(upload), Row, chunk_size=2))
+    assert [r["line"] for r in out] == [1, 2, 3, 5, 6]
+    assert out[1]["error"].startswith("Invalid JSON")
+    assert out[2]["error"].startswith("Invalid UTF-8")
+    assert "region" in out[3]["error"]
+    assert out[0]["risk_score"] == calculate_risk_score(farmers[0])["risk_score"]
+    assert out[4]["farmer_id"] == farmers[1]["farmer_id"]
+
+
+def test_results_keep_input_order_across_chunks(farmers):
+    lines = []
+    for i, farmer in enumerate(farmers):
+        lines.append(encode(farmer) if i % 3 else b"[]")
+    out = records(stream_scores(iter_ndjson_rows(ndjson(*lines)), Row, chunk_size=4))
+    assert [r["line"] for r in out] == list(range(1, len(farmers) + 1))
+    for i, record in enumerate(out):
+        assert ("error" in record) == (i % 3 == 0)
+
+
+def test_csv_line_numbers_follow_the_file(farmers):
+    header = list(Row.model_fields)
+    text = io.StringIO()
+    text.write(",".join(header) + "\n")
+    for farmer, gap in ((farmers[0], "\n"), ({**farmers[1], "region": "Multi\nLine"}, ""), (farmers[2], "")):
+        row = []
+        for name in header:
+            value = farmer[name]
+            row.append(f'"{value}"' if isinstance(value, str) and "\n" in value else str(value))
+        text.write(",".join(row) + "\n" + gap)
+    upload = io.BytesIO(text.getvalue().encode("utf-8") + b"\xff,broken\n")
+    out = records(stream_scores(iter_csv_rows(upload), Row))
+    assert [r["line"] for r in out] == [2, 5, 6, 7]
+    assert "error" not in out[0] and "error" not in out[1]
+    assert "error" in out[3]
+
+
+def test_empty_upload_yields_nothing():
+    assert list(stream_scores(iter_ndjson_rows(io.BytesIO(b"")), Row)) == []
@@ -0,0 +1,84 @@
+import threading
+
+from cache import ResultCache, content_hash, profile_fingerprint
+from engines.records import FarmerRecord
+
+
+def test_record_hashes_like_its_dict(farmers):
+    for farmer in farmers:
+        record = FarmerRecord.from_dict(farmer)
+        assert content_hash(record) == content_hash(farmer)
+        assert profile_fingerprint(record) == profile_fingerprint(farmer)
+
+
+def test_hash_changes_with_content(farmers):
+    farmer = farmers[0]
+    changed = {**farmer, "years_experience": farmer["years_experience"] + 1}
+    assert content_hash(changed) != content_hash(farmer)
+
+
+def test_hit_and_miss_counts(farmers):
+    cache = ResultCache()
+    calls = []
+    for _ in range(3):
+        cache.get_or_compute(farmers[0], "part", lambda: calls.append(1) or "value")
+    assert calls == [1]
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.part_stats()["part"] == (2, 1)
+
+
+def test_counts_are_exact_under_concurrency(farmers):
+    cache = ResultCache()
+    rounds = 200
+
+    def lookups():
+        for _ in range(rounds):
+            for farmer in farmers:
+                cache.get_or_compute(farmer, "risk_score", lambda: 1)
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.hits + cache.misses == 8 * rounds * len(farmers)
+    assert cache.part_stats()["risk_score"] == (cache.hits, cache.misses)
+
+
+def test_changed_profile_is_a_miss(farmers):
+    cache = ResultCache()
+    cache.get_or_compute(farmers[0], "part", lambda: "old")
+    changed = {**farmers[0], "has_irrigation": not farmers[0]["has_irrigation"]}
+    assert cache.get(changed, "part") is None
+    assert cache.get_or_compute(changed, "part", lambda: "new") == "new"
+
+
+def test_entries_expire_after_ttl(farmers, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = ResultCache(ttl=10.0)
+    cache.get_or_compute(farmers[0], "part", lambda: "value")
+    now[0] += 9.0
+    assert cache.get(farmers[0], "part") == "value"
+    now[0] += 2.0
+    assert cache.get(farmers[0], "part") is None
+
+
+def test_lru_eviction(farmers):
+    cache = ResultCache(maxsize=2)
+    for farmer in farmers[:3]:
+        cache.get_or_compute(farmer, "part", lambda: "value")
+    assert len(cache) == 2
+    assert cache.get(farmers[2], "part") == "value"
+    assert cache.get(farmers[0], "part") is None
+
+
+def test_invalidation(farmers):
+    cache = ResultCache()
+    for farmer in farmers[:3]:
+        cache.get_or_compute(farmer, "part", lambda: "value")
+    cache.invalidate(farmers[2]["farmer_id"])
+    assert cache.get(farmers[2], "part") is None
+    assert cache.get(farmers[1], "part") == "value"
+    cache.invalidate()
+    assert len(cache) == 0
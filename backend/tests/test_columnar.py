@@ -0,0 +1,35 @@
+from cache import content_hash
+from columnar import ColumnarTable, compile_if_stale, write_table
+from repository import FarmerRepository
+
+
+def test_round_trip(tmp_path, farmers, synthetic):
+    rows = farmers + synthetic[:500]
+    # Optional fields may be missing from some rows
+    rows[3] = {key: value for key, value in rows[3].items() if key != "requested_products"}
+    path = str(tmp_path / "book.bnplcol")
+    write_table(rows, path, fingerprint=content_hash)
+
+    table = ColumnarTable(path)
+    assert len(table) == len(rows)
+    assert [table.row(i) for i in range(len(rows))] == rows
+    assert list(table.rows()) == rows
+    assert table.get(rows[42]["farmer_id"]) == rows[42]
+    assert table.get("missing") is None
+    assert table.fingerprints() == [content_hash(row) for row in rows]
+    region = rows[0]["region"]
+    assert [table.row(p) for p in table.where("region", region)] == [r for r in rows if r["region"] == region]
+
+
+def test_repository_serves_a_compiled_file(tmp_path, farmers):
+    source = tmp_path / "farmers.json"
+    source.write_text(__import__("json").dumps(farmers), encoding="utf-8")
+    target = str(tmp_path / "farmers.bnplcol")
+    assert compile_if_stale(str(source), target)
+    assert not compile_if_stale(str(source), target)
+
+    repository = FarmerRepository(target)
+    assert list(repository.all()) == farmers
+    assert repository.get(farmers[5]["farmer_id"]) == farmers[5]
+    rows, fingerprints = repository.all_with_fingerprints()
+    assert fingerprints == [content_hash(farmer) for farmer in farmers]
@@ -0,0 +1,60 @@
+import pytest
+
+from listing import ListingIndex
+
+FILTERS = ("region", "crop_type")
+SORTS = ("farmer_id", "years_experience", "average_monthly_revenue")
+
+
+def walk(index: ListingIndex, **query) -> list:
+    """Every item of a query, following next_cursor page by page."""
+    items, cursor = [], None
+    while True:
+        page = index.query(cursor=cursor, **query)
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("sort", ["farmer_id", "years_experience", "-years_experience", "-average_monthly_revenue"])
+def test_pages_cover_the_sorted_rows_once(synthetic, sort):
+    index = ListingIndex(synthetic, FILTERS, SORTS, range_field="average_monthly_revenue")
+    field, descending = sort.lstrip("-"), sort.startswith("-")
+    expected = sorted(synthetic, key=lambda r: (r[field], r["farmer_id"]), reverse=descending)
+    assert walk(index, sort=sort, limit=137) == expected
+
+
+def test_filters_and_range(synthetic):
+    index = ListingIndex(synthetic, FILTERS, SORTS, range_field="average_monthly_revenue")
+    region = synthetic[0]["region"]
+    query = {"filters": {"region": region}, "min_value": 2000, "max_value": 6000}
+    expected = [
+        r for r in sorted(synthetic, key=lambda r: (r["average_monthly_revenue"], r["farmer_id"]))
+        if r["region"] == region and 2000 <= r["average_monthly_revenue"] <= 6000
+    ]
+    first = index.query(sort="average_monthly_revenue", limit=25, **query)
+    assert first["total"] == len(expected)
+    assert walk(index, sort="average_monthly_revenue", limit=25, **query) == expected
+
+
+def test_cursor_survives_rows_added_before_it(synthetic):
+    rows = sorted(synthetic, key=lambda r: r["farmer_id"])
+    page = ListingIndex(rows[:1000], FILTERS, SORTS).query(limit=100)
+    grown = ListingIndex([{**rows[0], "farmer_id": "A-new"}] + rows[:1000], FILTERS, SORTS)
+    next_page = grown.query(cursor=page["next_cursor"], limit=100)
+    assert next_page["items"] == rows[100:200]
+
+
+def test_projection_and_invalid_queries(synthetic):
+    index = ListingIndex(synthetic, FILTERS, SORTS)
+    page = index.query(limit=2, fields=["farmer_id", "region"])
+    assert all(set(item) == {"farmer_id", "region"} for item in page["items"])
+    with pytest.raises(ValueError):
+        index.query(sort="name")
+    with pytest.raises(ValueError):
+        index.query(cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        index.query(filters={"name": "x"})
+    with pytest.raises(ValueError):
+        index.query(limit=0)
@@ -0,0 +1,88 @@
+"""Vectorized, incremental and compiled scoring paths against the scalar one."""
+
+import pytest
+
+from engines.batch_scoring import RESULT_COLUMNS, score_batch, to_score_results
+from engines.bnpl_history import parse_status
+from engines.scoring import calculate_bnpl_history_score, calculate_risk_score
+from engines.what_if import run_scenarios
+
+STATUSES = [
+    "all_on_time", "no_history", "on_time", "late", "1_late", "3_on_time", "late_on_time",
+    "2_late_3_on_time", "4_on_time_1_late", "1_late_1_on_time", "1_late_9_on_time",
+    "10_late_2_on_time", "on_time_late", "weird", "",
+]
+
+
+def legacy_history_score(count: int, status: str) -> float:
+    """The original split-based parser and history score, kept as the reference."""
+    if count == 0:
+        return 40
+    if status == "all_on_time":
+        base = 90
+    elif "late" in status:
+        parts = status.split("_")
+        late_count = 0
+        on_time_count = 0
+        for i, part in enumerate(parts):
+            if part == "late":
+                late_count += int(parts[i - 1]) if i > 0 and parts[i - 1].isdigit() else 1
+            elif part == "on" and i + 1 < len(parts) and parts[i + 1] == "time":
+                on_time_count += int(parts[i - 1]) if i > 0 and parts[i - 1].isdigit() else 1
+        total = late_count + on_time_count
+        late_ratio = late_count / total if total > 0 else 0.5
+        if late_ratio >= 0.5:
+            base = 25
+        elif late_ratio >= 0.3:
+            base = 45
+        else:
+            base = 65
+    elif "on_time" in status:
+        base = 80
+    else:
+        base = 40
+    return min(base + min(count * 2, 10), 100)
+
+
+@pytest.mark.parametrize("status", STATUSES)
+def test_history_score_matches_legacy_parser(status):
+    for count in range(0, 8):
+        assert calculate_bnpl_history_score(count, status) == legacy_history_score(count, status)
+
+
+def test_parsed_counts():
+    assert parse_status("2_late_3_on_time")[:2] == (2, 3)
+    assert parse_status("4_on_time_1_late")[:2] == (1, 4)
+    assert parse_status("all_on_time").kind == "all_on_time"
+    assert parse_status("weird").kind == "unknown"
+
+
+def test_batch_matches_scalar(farmers, synthetic):
+    rows = farmers + synthetic
+    assert to_score_results(score_batch(rows)) == [calculate_risk_score(farmer) for farmer in rows]
+
+
+def test_batch_of_no_farmers():
+    scored = score_batch([])
+    assert tuple(scored.columns) == RESULT_COLUMNS
+    assert to_score_results(scored) == []
+
+
+SCENARIOS = [
+    {},
+    {"has_irrigation": True},
+    {"has_bank_loan": False, "land_ownership": True},
+    {"years_experience": 25, "average_monthly_revenue": 4000},
+    {"previous_bnpl_count": 5, "previous_bnpl_status": "1_late_4_on_time"},
+    {"region": "Ganja", "farm_type": "livestock", "seasonal_revenue_volatility": "high"},
+]
+
+
+def test_what_if_matches_full_score(synthetic):
+    fields = ("risk_score", "risk_category", "decision", "bnpl_limit",
+              "recommended_installment_months", "late_payment_probability", "confidence_level")
+    for farmer in synthetic[:300]:
+        result = run_scenarios(farmer, SCENARIOS)
+        for overrides, scenario in zip(SCENARIOS, result["scenarios"]):
+            full = calculate_risk_score({**farmer, **overrides})
+            assert {field: scenario[field] for field in fields} == {field: full[field] for field in fields}
@@ -0,0 +1,44 @@
+import json
+import os
+
+from engines.model import DEFAULT_MODEL_PATH, ScoringModel
+from engines.scoring import calculate_risk_score
+from shadow import ShadowScorer
+
+
+def challenger(tmp_path) -> ScoringModel:
+    with open(DEFAULT_MODEL_PATH, "r", encoding="utf-8") as f:
+        definition = json.load(f)
+    # The champion definition under another version: every decision agrees
+    definition["version"] = "challenger"
+    path = tmp_path / "challenger.json"
+    path.write_text(json.dumps(definition), encoding="utf-8")
+    return ScoringModel.from_file(str(path))
+
+
+def test_worker_records_every_submitted_farmer(tmp_path, farmers):
+    scorer = ShadowScorer(str(tmp_path / "shadow.sqlite3"), [challenger(tmp_path)])
+    scorer.start()
+    for i, farmer in enumerate(farmers):
+        source = ("computed", "cache", "store")[i % 3]
+        scorer.submit(farmer, calculate_risk_score(farmer), 0.001, source=source)
+    scorer.stop()
+
+    summary = scorer.summary()
+    assert summary["queue"]["processed"] == len(farmers)
+    assert summary["queue"]["errors"] == 0
+    [result] = summary["results"]
+    assert result["challenger_version"] == "challenger"
+    assert result["samples"] == len(farmers)
+    assert result["decision_agreement"] == 1.0
+    assert sum(result["champion_sources"].values()) == len(farmers)
+    assert result["mean_champion_latency_ms"] == 1.0
+
+
+def test_disabled_without_challengers(tmp_path, farmers):
+    scorer = ShadowScorer(str(tmp_path / "shadow.sqlite3"), [])
+    scorer.start()
+    scorer.submit(farmers[0], calculate_risk_score(farmers[0]), 0.001)
+    scorer.stop()
+    assert scorer.summary()["queue"]["submitted"] == 0
+    assert not os.path.exists(tmp_path / "shadow.sqlite3")
@@ -0,0 +1,49 @@
+import sqlite3
+import threading
+
+import pytest
+
+from cache import content_hash
+from engines.model import get_active_model
+from store import SQLiteScoreStore, open_store
+
+
+def test_refresh_then_read(tmp_path, farmers):
+    store = SQLiteScoreStore(str(tmp_path / "nested" / "scores.sqlite3"))
+    summary = store.refresh(farmers)
+    assert summary["scored"] == len(farmers)
+    assert store.refresh(farmers)["scored"] == 0
+
+    farmer = farmers[0]
+    version = get_active_model().version
+    assert store.get_score(farmer["farmer_id"], content_hash(farmer), version) is not None
+    assert store.get_score(farmer["farmer_id"], "stale", version) is None
+    store.close()
+
+
+def test_close_closes_every_thread_connection(tmp_path):
+    store = SQLiteScoreStore(str(tmp_path / "scores.sqlite3"))
+    opened = []
+
+    def use():
+        store.stats()
+        opened.append(store._local.conn)
+
+    threads = [threading.Thread(target=use) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    opened.append(store._connection())
+
+    store.close()
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    # Still usable afterwards: the calling thread reconnects
+    assert store.stats()["farmers"] == 0
+    store.close()
+
+
+def test_empty_location_disables_the_store():
+    assert open_store("") is None